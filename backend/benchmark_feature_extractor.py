@@ -0,0 +1,81 @@
+"""
+Benchmark: FeatureExtractor batch throughput.
+
+Times the columnar extract_features_batch against the previous
+per-network loop (extract_features(network, networks) for every network,
+O(N^2)) on synthetic scans. The per-network loop is skipped above
+LEGACY_LIMIT networks.
+
+Usage:
+    python benchmark_feature_extractor.py [sizes...]     (default: 10000 100000)
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from services.feature_extractor import FeatureExtractor
+
+LEGACY_LIMIT = 10000
+ENCRYPTIONS = ['Open', 'WEP', 'WPA', 'WPA2', 'WPA3', 'WPA/WPA2']
+VENDORS = ['Apple', 'Cisco', 'TP-Link', 'Netgear', 'Unknown']
+CHANNELS = [1, 6, 11, 36, 40, 44, 48, 149, 153, 157, 161]
+
+
+def make_networks(count: int, seed: int = 42):
+    """Synthetic scan: ~4 BSSIDs per SSID, realistic channel mix"""
+    rng = random.Random(seed)
+    return [
+        {
+            'ssid': f"Net{rng.randrange(max(count // 4, 1))}",
+            'bssid': f"02:00:00:{(i >> 16) & 0xff:02x}:{(i >> 8) & 0xff:02x}:{i & 0xff:02x}",
+            'signal_strength': rng.randint(-95, -30),
+            'channel': rng.choice(CHANNELS),
+            'frequency': 2437 if rng.random() < 0.5 else 5180,
+            'encryption': rng.choice(ENCRYPTIONS),
+            'vendor': rng.choice(VENDORS),
+            'is_hidden': rng.random() < 0.05
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_batch(extractor: FeatureExtractor, networks):
+    return np.array([extractor.extract_features(network, networks) for network in networks])
+
+
+def _time(parse, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = parse()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    extractor = FeatureExtractor()
+
+    print("=" * 72)
+    print("FEATURE EXTRACTOR BENCHMARK")
+    print("=" * 72)
+    for size in sizes:
+        networks = make_networks(size)
+        batch_time, batch = _time(lambda: extractor.extract_features_batch(networks), 3)
+        line = f"{size:>8,} networks  batch {batch_time * 1000:>9.1f} ms"
+
+        if size <= LEGACY_LIMIT:
+            legacy_time, legacy = _time(lambda: legacy_batch(extractor, networks), 1)
+            assert np.array_equal(batch, legacy), "batch output differs from per-network output"
+            line += f"  per-network {legacy_time * 1000:>10.1f} ms  ({legacy_time / batch_time:,.0f}x)"
+        else:
+            line += "  per-network skipped (O(N^2))"
+        print(line)
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
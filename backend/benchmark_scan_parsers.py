@@ -0,0 +1,190 @@
+"""
+Benchmark: scan output parsing throughput.
+
+Builds large scan outputs from the recorded fixtures in
+fixtures/scan_outputs (unique BSSIDs per copy) and times each parser.
+The legacy line-by-line parsers (nmcli column split, netsh startswith
+chain, iwlist substring checks) are included for comparison; WiFiScanner
+still parses iwlist with substring checks.
+
+Usage:
+    python benchmark_scan_parsers.py [lines] [bssids]
+"""
+
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from services.oui_lookup import lookup_vendor
+from services.scan_backends import IwBackend, NetshBackend, NmcliBackend, split_terse
+from services.scan_parser import parse_iw, parse_iwlist, parse_netsh
+from services.wifi_scanner import WiFiScanner
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "scan_outputs")
+REPEATS = 5
+
+
+def _fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+def _scale(text: str, copies: int, escaped: bool = False) -> str:
+    """Repeat a recorded output, giving every copy its own BSSID prefix"""
+    separator = "\\:" if escaped else ":"
+    chunks = []
+    for i in range(copies):
+        prefix = f"{(i >> 8) & 0xff:02X}{separator}{i & 0xff:02X}{separator}"
+        chunk = text.replace(f"AA{separator}BB{separator}", prefix)
+        chunk = chunk.replace(f"aa{separator}bb{separator}", prefix.lower())
+        chunks.append(chunk)
+    return "".join(chunks)
+
+
+def _to_pretty(terse: str) -> str:
+    """Column-formatted nmcli output equivalent to the terse fixture lines"""
+    lines = ["SSID  BSSID  CHAN  FREQ  SIGNAL  SECURITY"]
+    for line in terse.splitlines():
+        ssid, bssid, chan, freq, signal, security = split_terse(line)
+        lines.append(f"{ssid or '--'}  {bssid}  {chan}  {freq}  {signal}  {security or '--'}")
+    return "\n".join(lines)
+
+
+def legacy_nmcli_parse(output: str):
+    """Previous WiFiScanner parser: whitespace split of human-formatted columns"""
+    networks = []
+    for line in output.strip().split('\n')[1:]:
+        parts = line.split()
+        if len(parts) < 6:
+            continue
+        try:
+            networks.append({
+                'ssid': parts[0],
+                'bssid': parts[1],
+                'channel': int(parts[2]),
+                'frequency': int(parts[3]),
+                'signal_strength': int(parts[4]),
+                'encryption': ' '.join(parts[5:]),
+                'vendor': lookup_vendor(parts[1]),
+                'timestamp': datetime.utcnow().isoformat(),
+            })
+        except (ValueError, IndexError):
+            continue
+    return networks
+
+
+def legacy_netsh_parse(output: str):
+    """Previous NetshBackend parser: strip + startswith chain per line"""
+    records = []
+    current_ssid = None
+    timestamp = datetime.utcnow().isoformat()
+    prefixes = (
+        ("Signal", "signal"), ("Channel Utilization", "channel_utilization"),
+        ("Channel", "channel"), ("Band", "band"), ("Authentication", "authentication"),
+        ("Encryption", "encryption"), ("Radio type", "radio_type"),
+        ("Connected Stations", "connected_stations"),
+    )
+    for line in output.splitlines():
+        line = line.strip()
+        if line.startswith("SSID"):
+            parts = line.split(":", 1)
+            current_ssid = parts[1].strip() if len(parts) > 1 else ""
+        elif line.startswith("BSSID"):
+            records.append({"ssid": current_ssid, "bssid": line.split(":", 1)[1].strip(),
+                            "timestamp": timestamp})
+        elif records:
+            for prefix, field in prefixes:
+                if line.startswith(prefix):
+                    records[-1][field] = line.split(":", 1)[1].strip()
+                    break
+    return records
+
+
+def legacy_iwlist_parse(output: str):
+    """Previous WiFiScanner iwlist parser: substring checks per line"""
+    networks = []
+    current = {}
+    for line in output.split('\n'):
+        line = line.strip()
+        if 'Cell' in line and 'Address:' in line:
+            if current:
+                networks.append(current)
+            current = {'bssid': line.split('Address: ')[1].strip(),
+                       'timestamp': datetime.utcnow().isoformat()}
+        elif 'ESSID:' in line:
+            current['ssid'] = line.split('ESSID:')[1].strip().strip('"')
+        elif 'Channel:' in line:
+            try:
+                current['channel'] = int(line.split('Channel:')[1].strip())
+            except ValueError:
+                current['channel'] = 0
+        elif 'Signal level=' in line:
+            signal = re.search(r'Signal level=(-?\d+)', line)
+            if signal:
+                current['signal_strength'] = int(signal.group(1))
+        elif 'Encryption key:' in line:
+            current['encryption'] = 'WPA/WPA2' if 'on' in line.lower() else 'Open'
+    if current:
+        networks.append(current)
+    return networks
+
+
+def _time(label: str, parse, output: str):
+    lines = output.count("\n") + 1
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        records = parse(output)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<28} {lines:>8} lines {len(records):>7} records "
+          f"{best * 1000:>9.1f} ms {lines / best:>12,.0f} lines/s")
+
+
+def main():
+    target_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    nmcli = _fixture("nmcli_terse.txt")
+    nmcli_big = _scale(nmcli, max(target_lines // nmcli.count("\n"), 1), escaped=True)
+    iw = _fixture("iw_scan_dump.txt")
+    iw_big = _scale(iw, max(target_lines // iw.count("\n"), 1))
+    netsh = _fixture("netsh_networks.txt")
+    netsh_big = _scale(netsh, max(target_lines // netsh.count("\n"), 1))
+
+    scanner = WiFiScanner.__new__(WiFiScanner)
+
+    print("=" * 78)
+    print("SCAN PARSER BENCHMARK")
+    print("=" * 78)
+    _time("WiFiScanner nmcli (terse)", scanner.parse_nmcli, nmcli_big)
+    _time("WiFiScanner nmcli (legacy)", legacy_nmcli_parse, _to_pretty(nmcli_big))
+    _time("Phase1 nmcli backend", NmcliBackend().parse, nmcli_big)
+    _time("Phase1 iw backend", IwBackend("wlan0").parse, iw_big)
+    _time("Phase1 netsh backend", NetshBackend().parse, netsh_big)
+    print("=" * 78)
+
+    # Microbenchmark: tokenizer vs legacy line parsers at a fixed BSSID count
+    bssids = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    print(f"SINGLE-PASS TOKENIZER ({bssids:,} BSSIDs)")
+    print("=" * 78)
+    iwlist = _fixture("iwlist_scan.txt")
+    for label, legacy, parse, text, scanner_parse in (
+        ("netsh", legacy_netsh_parse, parse_netsh, netsh, None),
+        ("iwlist", legacy_iwlist_parse, parse_iwlist, iwlist, scanner.parse_iwlist),
+        ("iw", None, parse_iw, iw, None),
+    ):
+        per_copy = len(parse(text))
+        big = _scale(text, -(-bssids // per_copy))
+        if legacy is not None:
+            _time(f"{label} legacy", legacy, big)
+        _time(f"{label} tokenizer", parse, big)
+        if scanner_parse is not None:
+            _time(f"{label} WiFiScanner", scanner_parse, big)
+    print("=" * 78)
+    print("Note: the legacy parser splits 'FREQ' ('2437 MHz') and SSIDs with spaces")
+    print("      across columns, so most of its lines are rejected or mis-assigned")
+
+
+if __name__ == "__main__":
+    main()
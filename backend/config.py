@@ -19,6 +19,7 @@ class Config:
     # Models
     MODELS_DIR = os.path.join(os.path.dirname(__file__), 'models')
     DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+    OUI_REGISTRY_DIR = os.getenv('OUI_REGISTRY_DIR', os.path.join(DATA_DIR, 'oui'))  # IEEE oui.csv / mam.csv / oui36.csv
     
     # Detection thresholds
     EVIL_TWIN_THRESHOLD = 0.60  # 60% confidence to flag as evil twin
@@ -27,6 +28,48 @@ class Config:
     # Scanning
     DEFAULT_SCAN_DURATION = 10  # seconds
     MAX_SCAN_DURATION = 60
+    MAX_CONCURRENT_SCANS_PER_INTERFACE = int(os.getenv('MAX_CONCURRENT_SCANS_PER_INTERFACE', 1))
+    WIFI_SCAN_CACHE_TTL = float(os.getenv('WIFI_SCAN_CACHE_TTL', 10))  # seconds a WiFiScanner result is reused
+    LIVE_SCAN_FLUSH_MS = int(os.getenv('LIVE_SCAN_FLUSH_MS', 500))  # batching period for live scan updates
+
+    # Client tracking (per-BSSID station counts)
+    CLIENT_TRACKING_APPROXIMATE = os.getenv('CLIENT_TRACKING_APPROXIMATE', 'False').lower() == 'true'
+    MAX_TRACKED_BSSIDS = int(os.getenv('MAX_TRACKED_BSSIDS', 2048))
+    CLIENT_EXACT_LIMIT = 64  # stations kept exactly before switching to HyperLogLog
+    CLIENT_HLL_PRECISION = 10  # 1024 registers, ~3.3% standard error
+
+    # Phase 1 raw_scans ingestion
+    PHASE1_SCAN_BACKEND = os.getenv('PHASE1_SCAN_BACKEND')  # netsh | iw | nmcli; auto-detected if unset
+    PHASE1_ADAPTIVE_INTERVAL = os.getenv('PHASE1_ADAPTIVE_INTERVAL', 'False').lower() == 'true'
+    PHASE1_MIN_INTERVAL = float(os.getenv('PHASE1_MIN_INTERVAL', 5))  # seconds
+    PHASE1_MAX_INTERVAL = float(os.getenv('PHASE1_MAX_INTERVAL', 120))  # seconds
+    RAW_SCAN_STORAGE_MODE = os.getenv('RAW_SCAN_STORAGE_MODE', 'full')  # full (raw_scans) | delta (raw_scan_buckets)
+    PHASE1_QUEUE_SIZE = int(os.getenv('PHASE1_QUEUE_SIZE', 8))  # parsed scans waiting for persistence
+    INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', 500))  # records per insert_many
+    INGEST_MAX_AGE = float(os.getenv('INGEST_MAX_AGE', 2.0))  # seconds before a partial batch is flushed
+    INGEST_MAX_PENDING = int(os.getenv('INGEST_MAX_PENDING', 10000))  # records held in memory
+    INGEST_BACKPRESSURE = os.getenv('INGEST_BACKPRESSURE', 'drop_oldest')  # block | drop_oldest | drop_newest
+
+    # Feature pipeline
+    BASELINE_WINDOWS = os.getenv('BASELINE_WINDOWS', '1h,24h,7d').split(',')  # recent-behavior windows (m/h/d)
+    BASELINE_PARTIAL_MINUTES = int(os.getenv('BASELINE_PARTIAL_MINUTES', 60))  # features_partials bucket size
+    BASELINE_DECAY_HALF_LIFE = float(os.getenv('BASELINE_DECAY_HALF_LIFE', 24))  # hours
+    BASELINE_WATERMARK_LAG = float(os.getenv('BASELINE_WATERMARK_LAG', 60))  # seconds left for late raw records
+    BASELINE_SKETCH_COMPRESSION = float(os.getenv('BASELINE_SKETCH_COMPRESSION', 100))  # t-digest size (~compression/2 centroids)
+    PHASE2_WORKERS = int(os.getenv('PHASE2_WORKERS', 1))  # >1 runs Phase 2 sharded across a process pool
+    PHASE2_SHARDS = int(os.getenv('PHASE2_SHARDS', 0))  # (ssid, bssid) hash partitions; 0 = one per worker
+    PHASE2_WRITE_BATCH = int(os.getenv('PHASE2_WRITE_BATCH', 1000))  # features_baseline upserts per bulk_write
+    PHASE3_CHUNK_SIZE = int(os.getenv('PHASE3_CHUNK_SIZE', 0))  # >0 streams baselines in chunks of ~N (whole SSIDs); 0 = load all
+    PHASE3_SAMPLE_SIZE = int(os.getenv('PHASE3_SAMPLE_SIZE', 100000))  # reservoir sample the chunked Isolation Forest is fitted on
+    PHASE3_WORKERS = int(os.getenv('PHASE3_WORKERS', 4))  # threads scoring chunks in parallel
+    ANOMALY_SIGNAL_FORMAT = os.getenv('ANOMALY_SIGNAL_FORMAT', 'layered')  # layered (3 docs per network) | compact (1 doc)
+    FEATURE_CACHE_DIR = os.getenv('FEATURE_CACHE_DIR', os.path.join(DATA_DIR, 'feature_cache'))  # memory-mapped .npy matrices
+
+    # Multi-interface capture
+    CAPTURE_QUEUE_SIZE = 1024  # record batches buffered between workers and aggregator
+    CAPTURE_BATCH_SIZE = 256  # records per batch sent by a capture worker
+    CAPTURE_BATCH_INTERVAL = 0.2  # seconds before a partial batch is sent
+    CHANNEL_HOP_INTERVAL = 0.5  # seconds spent on each channel of a group
     
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://localhost:3001').split(',')
\ No newline at end of file
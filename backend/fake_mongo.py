@@ -0,0 +1,289 @@
+"""
+In-memory stand-in for the pymongo collections used by the tests
+
+Covers the subset of the query, update, projection and aggregation
+language the services issue; anything else raises instead of being
+silently ignored. Documents are plain dicts in insertion order.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReplaceOne, UpdateMany, UpdateOne
+
+MISSING = object()
+
+
+def get_path(doc: Dict, path: str, default=None):
+    """doc['a']['b'] for 'a.b'"""
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return default
+        doc = doc[part]
+    return doc
+
+
+def _compare(value, operator: str, operand) -> bool:
+    if operator == "$exists":
+        return (value is not MISSING) == bool(operand)
+    # Otherwise a missing field behaves like null
+    value = None if value is MISSING else value
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if operator == "$ne":
+        return value != operand
+    # Range operators never match null
+    if value is None:
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    if operator == "$lte":
+        return value <= operand
+    raise NotImplementedError(f"query operator {operator}")
+
+
+def _is_operator(condition) -> bool:
+    return isinstance(condition, dict) and bool(condition) and all(key.startswith("$") for key in condition)
+
+
+def matches(doc: Dict, query: Optional[Dict]) -> bool:
+    """True if the document satisfies a MongoDB filter"""
+    for path, condition in (query or {}).items():
+        value = get_path(doc, path, MISSING)
+        if _is_operator(condition):
+            if not all(_compare(value, operator, operand) for operator, operand in condition.items()):
+                return False
+        elif (None if value is MISSING else value) != condition:
+            return False
+    return True
+
+
+def project(doc: Dict, projection: Optional[Dict]) -> Dict:
+    """Copy of the document with an inclusion or exclusion projection applied"""
+    if not projection:
+        return dict(doc)
+    included = [path for path, flag in projection.items() if flag and path != "_id"]
+    if not included:
+        return {field: value for field, value in doc.items() if projection.get(field, 1)}
+
+    result = {}
+    if projection.get("_id", 1) and "_id" in doc:
+        result["_id"] = doc["_id"]
+    for path in included:
+        value = get_path(doc, path, MISSING)
+        if value is MISSING:
+            continue
+        *parents, field = path.split(".")
+        target = result
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[field] = value
+    return result
+
+
+def _sort_value(value):
+    # MongoDB orders null (and missing) before any value
+    return (value is not None, value)
+
+
+def _operation(op) -> Tuple[Dict, Dict, bool, bool, bool]:
+    """
+    (filter, update or replacement, upsert, multi, replace) of a bulk write model.
+
+    pymongo has no public accessors for these, so this is the only place
+    that reads the models' private attributes.
+    """
+    if not isinstance(op, (UpdateOne, UpdateMany, ReplaceOne)):
+        raise NotImplementedError(f"bulk operation {type(op).__name__}")
+    return op._filter, op._doc, bool(op._upsert), isinstance(op, UpdateMany), isinstance(op, ReplaceOne)
+
+
+class FakeCursor:
+    """Result of find(): iterable, with the chained sort() / batch_size()"""
+
+    def __init__(self, docs: List[Dict], projection: Optional[Dict]):
+        self.docs = docs
+        self.projection = projection
+
+    def sort(self, keys, direction: int = 1):
+        keys = [(keys, direction)] if isinstance(keys, str) else list(keys)
+        for path, order in reversed(keys):
+            self.docs.sort(key=lambda doc: _sort_value(get_path(doc, path)), reverse=order < 0)
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    def limit(self, count: int):
+        if count:
+            self.docs = self.docs[:count]
+        return self
+
+    def __iter__(self):
+        for doc in self.docs:
+            yield project(doc, self.projection)
+
+
+class FakeCollection:
+    """pymongo Collection over a list of documents"""
+
+    def __init__(self, docs: Iterable[Dict] = ()):
+        self.docs = [dict(doc) for doc in docs]
+        self.bulk_writes = 0
+        self.inserts = 0
+
+    # -------------------------
+    # Reads
+    # -------------------------
+
+    def find(self, query: Dict = None, projection: Dict = None) -> FakeCursor:
+        return FakeCursor([doc for doc in self.docs if matches(doc, query)], projection)
+
+    def find_one(self, query: Dict = None, projection: Dict = None) -> Optional[Dict]:
+        return next(iter(self.find(query, projection)), None)
+
+    def count_documents(self, query: Dict) -> int:
+        return sum(1 for doc in self.docs if matches(doc, query))
+
+    def aggregate(self, pipeline: List[Dict], allowDiskUse: bool = False):
+        docs = self.docs
+        for stage in pipeline:
+            (name, spec), = stage.items()
+            if name == "$match":
+                docs = [doc for doc in docs if matches(doc, spec)]
+            elif name == "$group":
+                docs = _group(docs, spec)
+            else:
+                raise NotImplementedError(f"aggregation stage {name}")
+        return iter([dict(doc) for doc in docs])
+
+    # -------------------------
+    # Writes
+    # -------------------------
+
+    def insert_many(self, docs: Iterable[Dict], ordered: bool = True):
+        self.inserts += 1
+        self.docs.extend(docs)
+
+    def update_one(self, query: Dict, update: Dict, upsert: bool = False):
+        self._update(query, update, upsert)
+
+    def update_many(self, query: Dict, update: Dict, upsert: bool = False):
+        self._update(query, update, upsert, multi=True)
+
+    def replace_one(self, query: Dict, replacement: Dict, upsert: bool = False):
+        self._replace(query, replacement, upsert)
+
+    def find_one_and_update(self, query: Dict, update: Dict, upsert: bool = False, return_document=False):
+        before = self.find_one(query)
+        self._update(query, update, upsert)
+        return self.find_one(query) if return_document else before
+
+    def bulk_write(self, operations: List, ordered: bool = True):
+        self.bulk_writes += 1
+        for op in operations:
+            query, doc, upsert, multi, replace = _operation(op)
+            if replace:
+                self._replace(query, doc, upsert)
+            else:
+                self._update(query, doc, upsert, multi)
+
+    def delete_many(self, query: Dict):
+        self.docs = [doc for doc in self.docs if not matches(doc, query)]
+
+    def _update(self, query: Dict, update: Dict, upsert: bool, multi: bool = False):
+        targets = [doc for doc in self.docs if matches(doc, query)]
+        if not targets and upsert:
+            doc = {path: value for path, value in query.items() if not _is_operator(value)}
+            _apply(doc, update.get("$setOnInsert", {}), "$set")
+            self.docs.append(doc)
+            targets = [doc]
+        for doc in targets if multi else targets[:1]:
+            for operator, fields in update.items():
+                if operator != "$setOnInsert":
+                    _apply(doc, fields, operator)
+
+    def _replace(self, query: Dict, replacement: Dict, upsert: bool):
+        for index, doc in enumerate(self.docs):
+            if matches(doc, query):
+                self.docs[index] = dict(replacement)
+                return
+        if upsert:
+            self.docs.append(dict(replacement))
+
+
+def _apply(doc: Dict, fields: Dict, operator: str):
+    for path, value in fields.items():
+        *parents, field = path.split(".")
+        target = doc
+        for parent in parents:
+            target = target.setdefault(parent, {})
+
+        if operator == "$set":
+            target[field] = value
+        elif operator == "$inc":
+            target[field] = target.get(field, 0) + value
+        elif operator == "$min":
+            target[field] = min(target.get(field, value), value)
+        elif operator == "$max":
+            target[field] = max(target.get(field, value), value)
+        elif operator == "$push":
+            values = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+            target.setdefault(field, []).extend(values)
+        else:
+            raise NotImplementedError(f"update operator {operator}")
+
+
+def _expression(doc: Dict, expression):
+    """Value of "$field", {"$ifNull": [...]} or a literal"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return get_path(doc, expression[1:], MISSING)
+    if isinstance(expression, dict) and "$ifNull" in expression:
+        value, fallback = expression["$ifNull"]
+        value = _expression(doc, value)
+        return fallback if value is MISSING or value is None else value
+    return expression
+
+
+def _group(docs: List[Dict], spec: Dict) -> List[Dict]:
+    key_spec = spec["_id"]
+    groups: "OrderedDict[object, List[Dict]]" = OrderedDict()
+    keys = {}
+    for doc in docs:
+        if isinstance(key_spec, dict):
+            # Missing fields are left out of a compound _id
+            key = {name: value for name, value in
+                   ((name, _expression(doc, path)) for name, path in key_spec.items()) if value is not MISSING}
+            hashable = tuple(sorted(key.items(), key=lambda item: item[0]))
+        else:
+            key = _expression(doc, key_spec)
+            key = None if key is MISSING else key
+            hashable = key
+        keys.setdefault(hashable, key)
+        groups.setdefault(hashable, []).append(doc)
+
+    results = []
+    for hashable, members in groups.items():
+        result = {"_id": keys[hashable]}
+        for name, accumulator in spec.items():
+            if name == "_id":
+                continue
+            (operator, expression), = accumulator.items()
+            values = [_expression(doc, expression) for doc in members]
+            values = [value for value in values if value is not MISSING and value is not None]
+            if operator == "$sum":
+                result[name] = sum(values)
+            elif operator == "$min":
+                result[name] = min(values) if values else None
+            elif operator == "$max":
+                result[name] = max(values) if values else None
+            else:
+                raise NotImplementedError(f"accumulator {operator}")
+        results.append(result)
+    return results
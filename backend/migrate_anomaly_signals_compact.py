@@ -0,0 +1,75 @@
+"""
+One-off migration: fold layered anomaly_signals into compact documents.
+
+Every network's signature / behavior / ml documents become one compact
+document (run_id "migrated", see services.anomaly_signals). Layered
+documents are only deleted with --delete, after the compact ones are
+written; networks that already have a migrated document are skipped,
+so the script can be re-run safely.
+
+Usage: python migrate_anomaly_signals_compact.py [--delete]
+"""
+
+import sys
+from itertools import groupby
+
+from dotenv import load_dotenv
+
+from models.database import Database
+from services.anomaly_signals import COMPAT_RUN_ID, compact_from_layered
+
+BATCH_SIZE = 1000
+
+delete_layered = "--delete" in sys.argv[1:]
+
+# Load environment
+load_dotenv()
+
+# Connect DB
+Database.connect()
+db = Database.get_db()
+anomaly_signals = db["anomaly_signals"]
+anomaly_signals.create_index([("ssid", 1), ("bssid", 1)])
+anomaly_signals.create_index("run_id", sparse=True)
+anomaly_signals.create_index("ts", sparse=True)
+
+query = {"layer": {"$exists": True}}
+pending = anomaly_signals.count_documents(query)
+print(f"Layered signals to migrate: {pending}")
+
+migrated = {
+    (doc["ssid"], doc["bssid"])
+    for doc in anomaly_signals.find({"run_id": COMPAT_RUN_ID}, {"_id": 0, "ssid": 1, "bssid": 1})
+}
+
+cursor = anomaly_signals.find(query).sort([("ssid", 1), ("bssid", 1), ("_id", 1)]).batch_size(BATCH_SIZE)
+
+batch = []
+written = 0
+last_id = None
+for key, docs in groupby(cursor, key=lambda doc: (doc.get("ssid"), doc.get("bssid"))):
+    docs = list(docs)
+    newest = max(doc["_id"] for doc in docs)
+    last_id = newest if last_id is None else max(last_id, newest)
+    if key in migrated:
+        continue
+    batch.extend(compact_from_layered(docs))
+
+    if len(batch) >= BATCH_SIZE:
+        anomaly_signals.insert_many(batch, ordered=False)
+        written += len(batch)
+        batch = []
+        print(f"Migrated {written} networks")
+
+if batch:
+    anomaly_signals.insert_many(batch, ordered=False)
+    written += len(batch)
+
+print(f"Migration complete: {written} compact documents written")
+
+if delete_layered and last_id is not None:
+    # Only what was read; a layered Phase 3 run meanwhile keeps its documents
+    deleted = anomaly_signals.delete_many(dict(query, _id={"$lte": last_id})).deleted_count
+    print(f"Deleted {deleted} layered documents")
+else:
+    print("Layered documents kept; re-run with --delete to remove them")
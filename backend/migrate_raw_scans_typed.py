@@ -0,0 +1,56 @@
+"""
+One-off backfill: add typed numeric fields to existing raw_scans.
+
+Documents that already have `observed_at` are skipped, so the script
+can be re-run safely. Raw text fields are never modified.
+"""
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from models.database import Database
+from services.scan_normalizer import normalize_record
+
+BATCH_SIZE = 1000
+
+# Load environment
+load_dotenv()
+
+# Connect DB
+Database.connect()
+db = Database.get_db()
+raw_scans = db["raw_scans"]
+
+query = {"observed_at": {"$exists": False}}
+pending = raw_scans.count_documents(query)
+print(f"Raw scans to backfill: {pending}")
+
+cursor = raw_scans.find(
+    query,
+    {"signal": 1, "signal_dbm": 1, "channel": 1, "band": 1, "connected_stations": 1, "timestamp": 1}
+).batch_size(BATCH_SIZE)
+
+operations = []
+updated = 0
+for doc in cursor:
+    normalized = normalize_record(doc)
+    typed = {key: value for key, value in normalized.items() if key not in doc}
+    if not typed:
+        continue
+    operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": typed}))
+
+    if len(operations) >= BATCH_SIZE:
+        updated += raw_scans.bulk_write(operations, ordered=False).modified_count
+        operations = []
+        print(f"Backfilled {updated}/{pending}")
+
+if operations:
+    updated += raw_scans.bulk_write(operations, ordered=False).modified_count
+
+print(f"Backfill complete: {updated} documents updated")
+
+# Windowed baselines (Phase 2) read raw_scans by observed_at
+raw_scans.create_index("observed_at")
+
+# Sharded Phase 2 reads raw_scans by (ssid, bssid)
+raw_scans.create_index([("ssid", 1), ("bssid", 1)])
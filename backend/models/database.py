@@ -89,14 +89,39 @@ class Database:
         if 'raw_scans' not in db.list_collection_names():
             db.create_collection('raw_scans')
             db['raw_scans'].create_index('timestamp')
+            db['raw_scans'].create_index('observed_at')
+            db['raw_scans'].create_index([('ssid', 1), ('bssid', 1)])
             print("Created 'raw_scans' collection")
 
+        # Phase 1: Delta-encoded raw scan buckets (one per ssid/bssid/hour)
+        if 'raw_scan_buckets' not in db.list_collection_names():
+            db.create_collection('raw_scan_buckets')
+            db['raw_scan_buckets'].create_index([('ssid', 1), ('bssid', 1), ('hour', 1)], unique=True)
+            db['raw_scan_buckets'].create_index('hour')
+            print("Created 'raw_scan_buckets' collection")
+
         # Phase 2: Features Baseline collection
         if 'features_baseline' not in db.list_collection_names():
             db.create_collection('features_baseline')
             db['features_baseline'].create_index([('ssid', 1), ('bssid', 1)], unique=True)
             print("Created 'features_baseline' collection")
 
+        # Phase 2: Time-bucketed partial aggregates (windowed / decayed baselines)
+        if 'features_partials' not in db.list_collection_names():
+            db.create_collection('features_partials')
+            db['features_partials'].create_index([('ssid', 1), ('bssid', 1), ('bucket', 1)], unique=True)
+            db['features_partials'].create_index('bucket')
+            print("Created 'features_partials' collection")
+
+        # Phase 3: Anomaly signals (Phase 4 groups compact documents per network by ts;
+        # run_id finds the migrated ones, see migrate_anomaly_signals_compact.py)
+        if 'anomaly_signals' not in db.list_collection_names():
+            db.create_collection('anomaly_signals')
+            db['anomaly_signals'].create_index([('ssid', 1), ('bssid', 1)])
+            db['anomaly_signals'].create_index('run_id', sparse=True)
+            db['anomaly_signals'].create_index('ts', sparse=True)
+            print("Created 'anomaly_signals' collection")
+
 # Schema definitions
 NETWORK_SCHEMA = {
     "bssid": str,  # MAC address
@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
 from services.network_scanner import NetworkScanner
+from services.scan_session import ScanSessionManager
+from services.live_scan_buffer import LiveScanBuffer, parse_flush_interval
+from config import Config
 from models.database import Database
 from datetime import datetime
 import threading
@@ -8,9 +11,11 @@ from socket_server import socketio
 
 scan_bp = Blueprint('scan', __name__, url_prefix='/api/scan')
 
-# Global scanner instance
+# Scanner used for interface discovery only; each scan gets its own session
 scanner = None
-current_scan = None
+
+# Queued and running scans, keyed by scan_id
+scan_sessions = ScanSessionManager()
 
 def get_scanner():
     """Get or create scanner instance"""
@@ -36,20 +41,42 @@ def get_interfaces():
 @scan_bp.route('/start', methods=['POST'])
 def start_scan():
     """Start network scan"""
-    global current_scan
-    
+    session = scan_thread = None
     try:
         data = request.get_json()
         interface = data.get('interface')
+        interfaces = data.get('interfaces')  # names or {"interface", "channels"} dicts
         duration = data.get('duration', 30)
         scan_type = data.get('scan_type', 'passive')  # passive or active
         
+        if interfaces:
+            if scan_type == 'active':
+                return jsonify({"error": "Active scans support a single interface only"}), 400
+            interface = ",".join(
+                spec["interface"] if isinstance(spec, dict) else spec for spec in interfaces
+            )
+        
         if not interface:
             return jsonify({"error": "Interface not specified"}), 400
         
-        # Create scan ID
+        try:
+            live_flush_ms = parse_flush_interval(data.get('live_flush_ms', Config.LIVE_SCAN_FLUSH_MS))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        # Create scan ID and its session
         scan_id = str(uuid.uuid4())
         
+        # Live deltas go to the scan's Socket.IO room (clients emit 'join_scan')
+        live_buffer = LiveScanBuffer(
+            emit=lambda payload: socketio.emit('scan_update', payload, to=scan_id),
+            scan_id=scan_id,
+            flush_interval_ms=live_flush_ms
+        )
+        session = scan_sessions.create(scan_id, interface, duration, scan_type, interfaces, live_buffer)
+        acquired = scan_sessions.try_acquire(session)
+        status = "in_progress" if acquired else "queued"
+        
         # Save scan to database
         db = Database.get_db()
         scan_doc = {
@@ -57,7 +84,7 @@ def start_scan():
             "interface": interface,
             "scan_type": scan_type,
             "duration": duration,
-            "status": "in_progress",
+            "status": status,
             "started_at": datetime.utcnow().isoformat(),
             "networks_found": 0,
             "threats_detected": 0
@@ -67,7 +94,7 @@ def start_scan():
             'scan_status',
             {
                 "scan_id": scan_id,
-                "status": "in_progress",
+                "status": status,
                 "interface": interface,
                 "scan_type": scan_type,
                 "duration": duration,
@@ -79,22 +106,36 @@ def start_scan():
         # Run scan in background thread
         def run_scan():
             try:
-                scanner = get_scanner()
-                scanner.interface = interface
+                # Wait for a free slot on the interface(s)
+                if not acquired and not scan_sessions.acquire(session):
+                    return
                 
-                if scan_type == 'active':
-                    results = scanner.start_active_scan(interface, duration)
-                else:
-                    results = scanner.start_scan(interface, duration)
+                try:
+                    if status == "queued":
+                        started_at = datetime.utcnow().isoformat()
+                        db['scans'].update_one(
+                            {"scan_id": scan_id},
+                            {"$set": {"status": "in_progress", "started_at": started_at}}
+                        )
+                        socketio.emit(
+                            'scan_status',
+                            {"scan_id": scan_id, "status": "in_progress", "started_at": started_at},
+                            broadcast=True
+                        )
+                    
+                    results = session.run()
+                finally:
+                    scan_sessions.release(session)
                 
                 # Analyze for threats
-                threats = scanner.analyze_for_threats(results.get('networks', []))
+                threats = session.scanner.analyze_for_threats(results.get('networks', []))
+                final_status = "cancelled" if session.cancelled else "completed"
                 
-                # Save results
+                # Save results (partial results are kept for cancelled scans)
                 db['scans'].update_one(
                     {"scan_id": scan_id},
                     {"$set": {
-                        "status": "completed",
+                        "status": final_status,
                         "completed_at": datetime.utcnow().isoformat(),
                         "networks_found": len(results.get('networks', [])),
                         "threats_detected": len(threats),
@@ -106,7 +147,7 @@ def start_scan():
                     'scan_status',
                     {
                         "scan_id": scan_id,
-                        "status": "completed",
+                        "status": final_status,
                         "networks_found": len(results.get('networks', [])),
                         "threats_detected": len(threats),
                         "completed_at": datetime.utcnow().isoformat()
@@ -134,18 +175,23 @@ def start_scan():
                     },
                     broadcast=True
                 )
+            finally:
+                scan_sessions.remove(scan_id)
         
         scan_thread = threading.Thread(target=run_scan, daemon=True)
         scan_thread.start()
         
         return jsonify({
             "scan_id": scan_id,
-            "status": "started",
-            "message": f"Scan started on {interface} for {duration} seconds",
+            "status": "started" if status == "in_progress" else "queued",
+            "message": f"Scan {'started' if status == 'in_progress' else 'queued'} on {interface} for {duration} seconds",
             "timestamp": datetime.utcnow().isoformat()
         }), 200
     
     except Exception as e:
+        if session is not None and scan_thread is None:
+            # Never reached run_scan: free its slot / queue place
+            scan_sessions.discard(session)
         return jsonify({"error": str(e)}), 500
 
 @scan_bp.route('/status/<scan_id>', methods=['GET'])
@@ -166,6 +212,29 @@ def get_scan_status(scan_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@scan_bp.route('/workers/<scan_id>', methods=['GET'])
+def get_scan_workers(scan_id):
+    """Get per-worker capture counters for a multi-interface scan"""
+    try:
+        session = scan_sessions.get(scan_id)
+        if session is not None and session.supervisor is not None:
+            workers = session.supervisor.get_worker_stats()
+        else:
+            db = Database.get_db()
+            scan = db['scans'].find_one({"scan_id": scan_id})
+            if not scan:
+                return jsonify({"error": "Scan not found"}), 404
+            workers = scan.get('results', {}).get('workers', [])
+        
+        return jsonify({
+            "scan_id": scan_id,
+            "workers": workers,
+            "timestamp": datetime.utcnow().isoformat()
+        }), 200
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @scan_bp.route('/results/<scan_id>', methods=['GET'])
 def get_scan_results(scan_id):
     """Get scan results"""
@@ -223,12 +292,12 @@ def get_scan_history():
 
 @scan_bp.route('/cancel/<scan_id>', methods=['POST'])
 def cancel_scan(scan_id):
-    """Cancel an ongoing scan"""
+    """Cancel a queued or ongoing scan"""
     try:
         db = Database.get_db()
         
         result = db['scans'].update_one(
-            {"scan_id": scan_id, "status": "in_progress"},
+            {"scan_id": scan_id, "status": {"$in": ["queued", "in_progress"]}},
             {"$set": {
                 "status": "cancelled",
                 "cancelled_at": datetime.utcnow().isoformat()
@@ -238,6 +307,9 @@ def cancel_scan(scan_id):
         if result.matched_count == 0:
             return jsonify({"error": "Scan not found or already completed"}), 404
         
+        # Stop the capture itself, not just the DB record
+        scan_sessions.cancel(scan_id)
+        
         return jsonify({
             "message": "Scan cancelled",
             "scan_id": scan_id,
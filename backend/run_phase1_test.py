@@ -22,6 +22,7 @@ try:
 finally:
     scanner.stop()
     print("Scanner stopped.")
+    print(f"Ingestion metrics: {scanner.get_metrics()}")
 
 # Check count
 db = Database.get_db()
@@ -0,0 +1,126 @@
+"""
+Adaptive Scan Interval
+Moves the Phase 1 scan interval between configured bounds based on how
+much the RF environment changed between consecutive scans.
+
+- A new BSSID advertising an SSID already seen on another BSSID
+  (possible twin) drops straight to the minimum interval.
+- BSSID churn or large RSSI swings halve the interval.
+- A stable environment backs the interval off towards the maximum.
+- An empty scan (usually a failed one) carries no information and leaves
+  the interval and the comparison baseline unchanged.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from services.scan_normalizer import parse_int
+
+
+class AdaptiveIntervalController:
+    """Chooses the next scan interval from consecutive scan results"""
+
+    def __init__(self, min_interval: float, max_interval: float, initial: float = None,
+                 churn_threshold: float = 0.1, rssi_threshold: float = 10.0,
+                 backoff: float = 1.5):
+        """
+        :param min_interval: Fastest allowed scan interval (seconds)
+        :param max_interval: Slowest allowed scan interval (seconds)
+        :param initial: Starting interval; clamped to the bounds
+        :param churn_threshold: (new + vanished) / visible BSSIDs that counts as busy
+        :param rssi_threshold: Mean absolute signal change (percent) that counts as busy
+        :param backoff: Growth factor applied while the environment is stable
+        """
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Invalid interval bounds")
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.churn_threshold = churn_threshold
+        self.rssi_threshold = rssi_threshold
+        self.backoff = backoff
+
+        self.interval = self._clamp(initial if initial is not None else min_interval)
+        self.reason = "initial"
+        self.history: deque = deque(maxlen=50)
+
+        # bssid -> (ssid, signal percent)
+        self._previous: Optional[Dict[str, Tuple[str, Optional[int]]]] = None
+
+    def _clamp(self, interval: float) -> float:
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    @staticmethod
+    def _snapshot(records: List[Dict]) -> Dict[str, Tuple[str, Optional[int]]]:
+        snapshot = {}
+        for record in records:
+            bssid = record.get("bssid")
+            if bssid:
+                snapshot[bssid.lower()] = (record.get("ssid") or "", parse_int(record.get("signal")))
+        return snapshot
+
+    def compare(self, previous: Dict, current: Dict) -> Dict:
+        """Change summary between two scan snapshots"""
+        new = current.keys() - previous.keys()
+        vanished = previous.keys() - current.keys()
+
+        deltas = []
+        for bssid in current.keys() & previous.keys():
+            before, after = previous[bssid][1], current[bssid][1]
+            if before is not None and after is not None:
+                deltas.append(abs(after - before))
+
+        # SSIDs already known on some other BSSID
+        known_ssids = {ssid for ssid, _ in previous.values() if ssid}
+        duplicate_ssids = sorted({current[bssid][0] for bssid in new if current[bssid][0] in known_ssids})
+
+        return {
+            "new": len(new),
+            "vanished": len(vanished),
+            "churn": (len(new) + len(vanished)) / max(len(current), len(previous), 1),
+            "rssi_delta": sum(deltas) / len(deltas) if deltas else 0.0,
+            "duplicate_ssids": duplicate_ssids
+        }
+
+    def update(self, records: List[Dict]) -> float:
+        """Feed one parsed scan; returns the interval to use next"""
+        current = self._snapshot(records)
+        if not current:
+            # A failed scan is not every BSSID vanishing; compare the next one with the last good scan
+            return self.interval
+        previous, self._previous = self._previous, current
+        if previous is None:
+            return self.interval
+
+        change = self.compare(previous, current)
+
+        if change["duplicate_ssids"]:
+            interval = self.min_interval
+            reason = f"new BSSID for known SSID {', '.join(change['duplicate_ssids'])}"
+        elif change["churn"] >= self.churn_threshold:
+            interval = self.interval / 2
+            reason = f"BSSID churn {change['new']} new / {change['vanished']} vanished"
+        elif change["rssi_delta"] >= self.rssi_threshold:
+            interval = self.interval / 2
+            reason = f"mean RSSI change {change['rssi_delta']:.1f}%"
+        else:
+            interval = self.interval * self.backoff
+            reason = "stable environment"
+
+        interval = self._clamp(interval)
+        if interval != self.interval or reason != self.reason:
+            print(f"[AdaptiveInterval] Next scan in {interval:.1f}s ({reason})")
+
+        self.interval = interval
+        self.reason = reason
+        self.history.append({"interval": interval, "reason": reason, **change})
+        return interval
+
+    def get_stats(self) -> Dict:
+        return {
+            "interval": self.interval,
+            "reason": self.reason,
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+            "recent": list(self.history)[-5:]
+        }
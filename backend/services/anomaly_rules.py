@@ -0,0 +1,270 @@
+"""
+Anomaly Rules
+Declarative registry of the Phase 3 signature and behavior rules.
+
+Each rule is a vectorized predicate over a FeatureFrame of baselines
+(one boolean per baseline); cross-network rules group the frame by SSID
+with bincount instead of comparing baselines pairwise, counting summary
+rows (services.ssid_context) as MEMBERS_FIELD BSSIDs. All rules are
+evaluated in one pass and packed into an int64 bitmask per network:
+
+    bit i  <->  RULES[i]
+
+Bits are registry positions: append new rules at the end, never reorder
+or remove (stored masks would change meaning). At most 63 rules.
+
+Each rule also carries the evidence weight Phase 4 adds to its layer
+score when it fires (capped at 1.0). The original rules split a layer
+evenly (1/4 signature, 1/3 behavior); rules that corroborate one of them
+(a sibling AP with stronger security or another channel, a wide signal
+spread) weigh half as much, so they raise a score without saturating it.
+"""
+
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from services.feature_registry import FeatureFrame, factorize, lookup
+from services.quantile_sketch import baseline_quantile, quantile_field
+from services.ssid_context import MEMBERS_FIELD, MIN_CHANNEL_SIBLINGS, security_rank, vendor_key
+
+# Thresholds (to be tuned later)
+SSID_REUSE_THRESHOLD = 2
+WEAK_ENCRYPTIONS = {"Open", "None", "WEP"}
+CHANNEL_VARIANCE_THRESHOLD = 10
+SIGNAL_VARIANCE_THRESHOLD = 15
+SIGNAL_SPREAD_THRESHOLD = 40
+MIN_OBSERVATIONS = 5
+
+MAX_RULES = 63
+
+
+class Rule(NamedTuple):
+    name: str
+    layer: str  # "signature" | "behavior"
+    evaluate: Callable[[FeatureFrame], np.ndarray]
+    description: str = ""
+    weight: float = 0.0  # Share of the layer score when fired
+
+
+# -------------------------
+# Group helpers
+# -------------------------
+
+
+def _ssid_groups(frame: FeatureFrame):
+    """(SSID code per row, rows with ssid and bssid, group count, BSSIDs per row)"""
+    codes, ssids = factorize(frame.column('ssid'))
+    valid = np.array([bool(ssid) and bool(bssid) for ssid, bssid in
+                      zip(frame.column('ssid'), frame.column('bssid'))], dtype=bool)
+    return codes, valid, len(ssids), frame.numeric(MEMBERS_FIELD, 1, none=1)
+
+
+def _dominant(pair_ssid: np.ndarray, groups: int, *keys: np.ndarray) -> np.ndarray:
+    """
+    Per SSID, the pair sorting first by `keys` (most significant first);
+    -1 for SSIDs without pairs.
+    """
+    order = np.lexsort(tuple(reversed(keys)) + (pair_ssid,))
+    dominant = np.full(groups, -1, dtype=np.intp)
+    # Reversed assignment: the first pair of each SSID is written last
+    dominant[pair_ssid[order][::-1]] = order[::-1]
+    return dominant
+
+
+def _pairs(codes: np.ndarray, values: Sequence, rows: np.ndarray):
+    """
+    Factorize (ssid, value) over `rows`; returns (pair per row or -1,
+    pair ssid, pair value).
+    """
+    pair_codes, pairs = factorize([(codes[i], values[i]) for i in np.flatnonzero(rows)])
+    row_pairs = np.full(len(codes), -1, dtype=np.intp)
+    row_pairs[rows] = pair_codes
+    return row_pairs, np.array([ssid for ssid, _ in pairs], dtype=np.intp), [value for _, value in pairs]
+
+
+# -------------------------
+# Rule functions
+# -------------------------
+
+
+def vendor_mismatch(frame: FeatureFrame) -> np.ndarray:
+    """
+    Vendor is not the SSID's dominant one (most BSSIDs, then earliest
+    first_seen, then vendor name, so row order never matters)
+    """
+    codes, valid, groups, weights = _ssid_groups(frame)
+    vendors = [vendor_key(record) for record in frame.records]
+    rows = valid & np.array([bool(vendor) for vendor in vendors], dtype=bool)
+    row_pairs, pair_ssid, pair_vendors = _pairs(codes, vendors, rows)
+    if not len(pair_ssid):
+        return np.zeros(len(frame), dtype=bool)
+
+    counts = np.bincount(row_pairs[rows], weights=weights[rows], minlength=len(pair_ssid))
+    _, first_seen = np.unique(np.array([value or "" for value in frame.column('first_seen')], dtype=str),
+                              return_inverse=True)
+    earliest = np.full(len(pair_ssid), np.iinfo(np.intp).max, dtype=np.intp)
+    np.minimum.at(earliest, row_pairs[rows], first_seen[rows])
+
+    _, names = np.unique(np.array(pair_vendors, dtype=str), return_inverse=True)
+    dominant = _dominant(pair_ssid, groups, -counts, earliest, names)
+    vendor_count = np.bincount(pair_ssid, minlength=groups)
+    return rows & (vendor_count[codes] >= 2) & (row_pairs != dominant[codes])
+
+
+def encryption_downgrade(frame: FeatureFrame) -> np.ndarray:
+    """A sibling BSSID of the SSID offers stronger security"""
+    codes, valid, groups, weights = _ssid_groups(frame)
+    modes = list(zip(frame.column('authentication'), frame.column('encryption')))
+    table = {mode: security_rank(*mode) for mode in set(modes)}
+    ranks = lookup(modes, {mode: np.nan if rank is None else rank for mode, rank in table.items()}, np.nan)
+
+    rows = valid & ~np.isnan(ranks)
+    strongest = np.full(groups, -np.inf)
+    np.maximum.at(strongest, codes[rows], ranks[rows])
+    members = np.bincount(codes[valid], weights=weights[valid], minlength=groups)
+    return rows & (members[codes] >= 2) & (ranks < strongest[codes])
+
+
+def channel_disagreement(frame: FeatureFrame) -> np.ndarray:
+    """Every other BSSID of the SSID (at least two) shares one channel, this one does not"""
+    codes, valid, groups, weights = _ssid_groups(frame)
+    channels = frame.column('avg_channel')
+    rows = valid & np.array([channel is not None for channel in channels], dtype=bool)
+    row_pairs, pair_ssid, _ = _pairs(codes, channels, rows)
+    if not len(pair_ssid):
+        return np.zeros(len(frame), dtype=bool)
+
+    # A tie for the most common channel never fires the rule, so pair order is fine
+    counts = np.bincount(row_pairs[rows], weights=weights[rows], minlength=len(pair_ssid))
+    dominant = _dominant(pair_ssid, groups, -counts, np.arange(len(pair_ssid)))
+    siblings = np.bincount(codes[valid], weights=weights[valid], minlength=groups)[codes] - 1
+    dominant_count = np.append(counts, 0)[dominant[codes]]
+    return (rows & (row_pairs != dominant[codes]) & (siblings >= MIN_CHANNEL_SIBLINGS)
+            & (dominant_count == siblings))
+
+
+def _signal_variance(frame: FeatureFrame) -> np.ndarray:
+    return frame.numeric('signal_variance', np.nan, none=np.nan)
+
+
+def _observations(frame: FeatureFrame) -> np.ndarray:
+    return frame.numeric('observation_count', 0, none=0)
+
+
+def client_spike(frame: FeatureFrame) -> np.ndarray:
+    average = frame.numeric('client_count_avg', np.nan, none=np.nan)
+    peak = frame.numeric('client_count_max', np.nan, none=np.nan)
+    return (average > 0) & (peak > average * 2)
+
+
+def signal_spread_wide(frame: FeatureFrame) -> np.ndarray:
+    """p95 - p5 of the signal sketch; a second transmitter on the BSSID fills the tails"""
+    def quantiles(q):
+        # Phase 2 stores the percentiles; only older baselines need the sketch
+        values = frame.numeric(quantile_field("signal", q), np.nan, none=np.nan)
+        for row in np.flatnonzero(np.isnan(values)):
+            value = baseline_quantile(frame.records[row], "signal", q)
+            values[row] = np.nan if value is None else value
+        return values
+
+    return (quantiles(0.95) - quantiles(0.05) > SIGNAL_SPREAD_THRESHOLD) & (_observations(frame) >= MIN_OBSERVATIONS)
+
+
+# -------------------------
+# Registry
+# -------------------------
+
+RULES: List[Rule] = [
+    # Layer 1 - Signature
+    Rule('ssid_reuse', 'signature',
+         lambda f: f.numeric('ssid_bssid_count', 1, none=1) > SSID_REUSE_THRESHOLD, weight=1 / 4),
+    Rule('encryption_weak', 'signature',
+         lambda f: np.array([value in WEAK_ENCRYPTIONS for value in f.column('encryption', 'Unknown')], dtype=bool),
+         weight=1 / 4),
+    Rule('vendor_mismatch', 'signature', vendor_mismatch, "cross-network", weight=1 / 4),
+    Rule('encryption_downgrade', 'signature', encryption_downgrade, "cross-network", weight=1 / 8),
+    Rule('channel_disagreement', 'signature', channel_disagreement, "cross-network", weight=1 / 8),
+    Rule('channel_instability', 'signature',
+         lambda f: f.numeric('channel_variance', 0, none=0) > CHANNEL_VARIANCE_THRESHOLD, weight=1 / 4),
+
+    # Layer 2 - Behavior
+    Rule('signal_variance_high', 'behavior', lambda f: _signal_variance(f) > SIGNAL_VARIANCE_THRESHOLD,
+         weight=1 / 3),
+    Rule('client_spike', 'behavior', client_spike, weight=1 / 3),
+    Rule('unstable_presence', 'behavior',
+         lambda f: (_observations(f) < MIN_OBSERVATIONS) & (_signal_variance(f) > SIGNAL_VARIANCE_THRESHOLD),
+         weight=1 / 3),
+    Rule('signal_spread_wide', 'behavior', signal_spread_wide, weight=1 / 6),
+]
+
+RULE_BITS: Dict[str, int] = {rule.name: 1 << bit for bit, rule in enumerate(RULES)}
+RULE_WEIGHTS: Dict[str, float] = {rule.name: rule.weight for rule in RULES}
+
+# features_baseline fields the registry reads (projection for streamed baselines)
+RULE_FIELDS: List[str] = [
+    'ssid', 'bssid', 'vendor', 'vendor_oui', 'first_seen', 'authentication', 'encryption',
+    'avg_channel', 'ssid_bssid_count', 'channel_variance', 'signal_variance',
+    'client_count_avg', 'client_count_max', 'observation_count',
+    quantile_field('signal', 0.05), quantile_field('signal', 0.95),
+]
+
+if len(RULES) > MAX_RULES:
+    raise ValueError(f"{len(RULES)} rules do not fit an int64 mask")
+if any(rule.weight <= 0 for rule in RULES):
+    raise ValueError("every rule needs a positive weight")
+
+
+def layer_mask(layer: str) -> int:
+    """Bits of every rule in one layer"""
+    return sum(RULE_BITS[rule.name] for rule in RULES if rule.layer == layer)
+
+
+def layer_score(fired: Iterable[str]) -> float:
+    """Summed weights of the fired rules (one layer), capped at 1.0; unknown names add nothing"""
+    return min(sum(RULE_WEIGHTS.get(name, 0.0) for name in fired), 1.0)
+
+
+# -------------------------
+# Evaluation
+# -------------------------
+
+
+def evaluate_rules(baselines: Sequence[Dict], summaries: Sequence[Dict] = None) -> np.ndarray:
+    """
+    (len(baselines), len(RULES)) boolean matrix in registry order.
+
+    :param summaries: Summary rows for SSID members outside `baselines`
+                      (services.ssid_context.summary_rows); no output rows
+    """
+    records = list(baselines) + list(summaries or [])
+    frame = FeatureFrame(records)
+    matrix = np.zeros((len(records), len(RULES)), dtype=bool)
+    if len(records):
+        for column, rule in enumerate(RULES):
+            matrix[:, column] = rule.evaluate(frame)
+    return matrix[:len(baselines)]
+
+
+def pack(matrix: np.ndarray) -> np.ndarray:
+    """Boolean rule matrix -> int64 mask per row"""
+    weights = np.left_shift(np.int64(1), np.arange(matrix.shape[1], dtype=np.int64))
+    return matrix.astype(np.int64) @ weights
+
+
+def unpack(masks: np.ndarray) -> np.ndarray:
+    """int64 masks -> boolean rule matrix"""
+    masks = np.asarray(masks, dtype=np.int64)
+    return (masks[:, None] >> np.arange(len(RULES), dtype=np.int64)) & 1 == 1
+
+
+def evaluate_masks(baselines: Sequence[Dict], summaries: Sequence[Dict] = None) -> np.ndarray:
+    return pack(evaluate_rules(baselines, summaries))
+
+
+def decode(mask: int, layer: Optional[str] = None) -> Dict[str, bool]:
+    """{rule name: fired} for one mask, optionally one layer only"""
+    return {
+        rule.name: bool(mask & RULE_BITS[rule.name])
+        for rule in RULES if layer is None or rule.layer == layer
+    }
@@ -0,0 +1,88 @@
+"""
+Anomaly Signal Storage
+Compact anomaly_signals documents and the reader for the layered format.
+
+Layered format (Config.ANOMALY_SIGNAL_FORMAT = "layered", the original):
+three documents per network per run, {"layer": "signature" | "behavior",
+"signals": {rule: bool}} and {"layer": "ml", "anomaly_score", "is_outlier"}.
+
+Compact format ("compact"): one document per network per run
+
+    {"ssid", "bssid",
+     "mask":          int64 rule bitmask (services.anomaly_rules),
+     "ml_score":      Isolation Forest decision_function, float32 precision
+                      (None when ML did not score the network),
+     "model_version", "run_id" (ObjectId per Phase 3 run), "ts"}
+
+is_outlier is not stored: IsolationForest.predict flags exactly the
+networks with decision_function < 0.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from services.anomaly_rules import RULE_BITS, layer_mask
+
+COMPAT_RUN_ID = "migrated"
+
+
+def compact_signal(ssid: str, bssid: str, mask: int, ml_score: Optional[float],
+                   model_version: str, run_id, ts: datetime) -> Dict:
+    return {
+        "ssid": ssid,
+        "bssid": bssid,
+        "mask": int(mask),
+        # BSON has no float32 type; the score is rounded to float32 precision
+        "ml_score": None if ml_score is None else float(np.float32(ml_score)),
+        "model_version": model_version,
+        "run_id": run_id,
+        "ts": ts
+    }
+
+
+def created_at(doc: Dict) -> Optional[datetime]:
+    """Insertion time of a document from its ObjectId (naive UTC, like ts)"""
+    created = getattr(doc.get("_id"), "generation_time", None)
+    return created.replace(tzinfo=None) if created is not None else None
+
+
+def is_outlier(signal: Dict) -> bool:
+    score = signal.get("ml_score")
+    return score is not None and score < 0
+
+
+def mask_from_signals(signals: Dict[str, bool]) -> int:
+    """Rule dict (layered format) -> bitmask; unknown rule names are dropped"""
+    return sum(RULE_BITS[name] for name, fired in signals.items() if fired is True and name in RULE_BITS)
+
+
+def compact_from_layered(docs: Iterable[Dict], model_version: str = "legacy") -> List[Dict]:
+    """
+    Compat reader: fold layered documents into one compact record per network.
+
+    Later documents of a layer replace earlier ones (insertion order), as
+    in Phase 4's layered scoring. ts is the newest ObjectId time, if any.
+    """
+    networks: Dict = {}
+    for doc in docs:
+        ssid, bssid, layer = doc.get("ssid"), doc.get("bssid"), doc.get("layer")
+        if not ssid or not bssid or layer is None:
+            continue
+
+        record = networks.setdefault((ssid, bssid), {"masks": {}, "ml_score": None, "ts": None})
+        if layer == "ml":
+            record["ml_score"] = doc.get("anomaly_score")
+        else:
+            record["masks"][layer] = mask_from_signals(doc.get("signals", {})) & layer_mask(layer)
+
+        created = created_at(doc)
+        if created is not None:
+            record["ts"] = created if record["ts"] is None else max(record["ts"], created)
+
+    return [
+        compact_signal(ssid, bssid, sum(record["masks"].values()), record["ml_score"],
+                       model_version, COMPAT_RUN_ID, record["ts"] or datetime.utcnow())
+        for (ssid, bssid), record in networks.items()
+    ]
@@ -0,0 +1,134 @@
+"""
+Async Scan Commands
+asyncio subprocess layer for the scan backends.
+
+Scan tools (netsh, iw, nmcli, iwlist, iwconfig) run through
+asyncio.create_subprocess_exec on one shared background event loop, so
+scans of several interfaces run concurrently instead of one blocking
+subprocess.run per thread.
+
+- run_command:        coroutine with a timeout; the process is killed on
+                      timeout or cancellation
+- run_commands:       several commands concurrently in one loop
+- run_command_sync /
+  run_sync:           blocking wrappers for existing (Flask, thread) callers
+
+Timeouts raise subprocess.TimeoutExpired, so callers that handled
+subprocess.run timeouts keep working unchanged.
+"""
+
+import asyncio
+import concurrent.futures
+import subprocess
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+
+class CommandResult(NamedTuple):
+    """Completed process output"""
+    command: List[str]
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+async def run_command(command: Sequence[str], timeout: float = 30) -> CommandResult:
+    """
+    Run a command without blocking the event loop.
+
+    :raises subprocess.TimeoutExpired: the command ran longer than `timeout`
+    :raises OSError: the executable could not be started
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _kill(process)
+        raise subprocess.TimeoutExpired(list(command), timeout)
+    except asyncio.CancelledError:
+        await _kill(process)
+        raise
+
+    return CommandResult(
+        list(command),
+        process.returncode,
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace")
+    )
+
+
+async def _kill(process):
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        # Reap the child even if we are being cancelled
+        await asyncio.shield(process.wait())
+
+
+async def run_commands(commands: Dict[str, Sequence[str]],
+                       timeout: float = 30) -> Dict[str, Union[CommandResult, Exception]]:
+    """
+    Run several commands concurrently (e.g. one scan per interface).
+
+    Returns {key: CommandResult or the exception that command raised}.
+    """
+    keys = list(commands)
+    results = await asyncio.gather(
+        *(run_command(commands[key], timeout) for key in keys),
+        return_exceptions=True
+    )
+    return dict(zip(keys, results))
+
+
+# -------------------------
+# Shared event loop + sync wrappers
+# -------------------------
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_scan_loop() -> asyncio.AbstractEventLoop:
+    """Background event loop that runs every scan subprocess"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="scan-loop", daemon=True)
+                thread.start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coroutine, timeout: float = None):
+    """
+    Run a coroutine on the scan loop and wait for its result.
+
+    If the wait times out the coroutine is cancelled (killing its
+    subprocesses) and subprocess.TimeoutExpired is raised.
+    """
+    future = asyncio.run_coroutine_threadsafe(coroutine, get_scan_loop())
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise subprocess.TimeoutExpired("scan", timeout)
+
+
+def run_command_sync(command: Sequence[str], timeout: float = 30) -> CommandResult:
+    """Blocking wrapper around run_command"""
+    return run_sync(run_command(command, timeout))
+
+
+def run_commands_sync(commands: Dict[str, Sequence[str]],
+                      timeout: float = 30) -> Dict[str, Union[CommandResult, Exception]]:
+    """Blocking wrapper around run_commands"""
+    return run_sync(run_commands(commands, timeout))
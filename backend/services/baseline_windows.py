@@ -0,0 +1,342 @@
+"""
+Windowed & Decayed Baselines
+Recent-behavior statistics for Phase 2, maintained from time-bucketed
+partial aggregates.
+
+Every (ssid, bssid) gets one `features_partials` document per time bucket
+(Config.BASELINE_PARTIAL_MINUTES) holding mergeable accumulators:
+
+    count                             observations
+    signal / channel: {n, sum, sumsq} mean + standard deviation
+    clients: {n, sum, max}
+    channels / encryptions / authentications: {value: count}   (modes)
+    first_seen, last_seen
+
+- Incremental: each run rebuilds only the buckets from the watermark's
+  bucket up to now - Config.BASELINE_WATERMARK_LAG, and replaces them
+  wholesale (idempotent, late records inside an open bucket are picked
+  up by the next run).
+- Window queries (Config.BASELINE_WINDOWS, e.g. 1h/24h/7d) merge the
+  O(buckets) partials overlapping the window; windows are aligned to
+  bucket boundaries, so they may span up to one extra bucket.
+- Decayed statistics weight each bucket by 0.5 ** (age / half-life)
+  over the retained partials (longest window + one bucket).
+
+Statistics use the same field names as the all-time baseline.
+"""
+
+import math
+from itertools import repeat
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from pymongo import ReplaceOne
+
+from config import Config
+from services.feature_cache import META_COLLECTION
+from services.scan_buckets import STATE_FIELDS, expand_bucket
+from services.scan_normalizer import TYPED_FIELDS
+
+WATERMARK_ID = "features_partials"
+KEY_CHUNK = 1000  # (ssid, bssid) keys per $in query
+
+_UNITS = {"m": 1, "h": 60, "d": 1440}
+
+
+def parse_window(window: str) -> timedelta:
+    """'30m', '1h', '24h', '7d' -> timedelta"""
+    window = window.strip().lower()
+    if len(window) < 2 or window[-1] not in _UNITS or not window[:-1].isdigit():
+        raise ValueError(f"Invalid baseline window: {window!r}")
+    return timedelta(minutes=int(window[:-1]) * _UNITS[window[-1]])
+
+
+def key_queries(keys: Iterable[Tuple[str, str]], **conditions) -> List[Tuple[Dict, Set[Tuple[str, str]]]]:
+    """
+    (query, chunk keys) pairs covering `keys`, KEY_CHUNK keys each.
+
+    The ssid x bssid $in product also matches keys of other chunks (and
+    keys not asked for): callers keep only documents of the chunk's own
+    keys, so every key is read exactly once.
+    """
+    ordered = sorted(keys)
+    return [
+        (dict(conditions,
+              ssid={"$in": sorted({ssid for ssid, _ in chunk})},
+              bssid={"$in": sorted({bssid for _, bssid in chunk})}),
+         set(chunk))
+        for chunk in (ordered[i:i + KEY_CHUNK] for i in range(0, len(ordered), KEY_CHUNK))
+    ]
+
+
+def _escape(value) -> str:
+    # Category values become document keys
+    return str(value).replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def _mode(counts: Dict[str, float], numeric: bool = False):
+    if not counts:
+        return None
+    value = unquote(max(counts.items(), key=lambda item: item[1])[0])
+    return int(value) if numeric else value
+
+
+def _moments() -> Dict:
+    return {"n": 0, "sum": 0.0, "sumsq": 0.0}
+
+
+def new_partial() -> Dict:
+    return {
+        "count": 0,
+        "signal": _moments(),
+        "channel": _moments(),
+        "clients": {"n": 0, "sum": 0.0, "max": None},
+        "channels": {},
+        "encryptions": {},
+        "authentications": {},
+        "first_seen": None,
+        "last_seen": None
+    }
+
+
+def add_observation(partial: Dict, obs: Dict):
+    """Accumulate one typed observation (see scan_normalizer)"""
+    partial["count"] += 1
+
+    for field, moments in (("signal_percent", partial["signal"]), ("channel_number", partial["channel"])):
+        value = obs.get(field)
+        if value is not None:
+            moments["n"] += 1
+            moments["sum"] += value
+            moments["sumsq"] += value * value
+
+    channel = obs.get("channel_number")
+    if channel is not None:
+        key = _escape(channel)
+        partial["channels"][key] = partial["channels"].get(key, 0) + 1
+
+    clients = obs.get("stations_count")
+    if clients is not None:
+        acc = partial["clients"]
+        acc["n"] += 1
+        acc["sum"] += clients
+        acc["max"] = clients if acc["max"] is None else max(acc["max"], clients)
+
+    for field, counts in (("encryption", partial["encryptions"]), ("authentication", partial["authentications"])):
+        value = obs.get(field)
+        if value is not None:
+            key = _escape(value)
+            counts[key] = counts.get(key, 0) + 1
+
+    observed_at = obs.get("observed_at")
+    if observed_at is not None:
+        if partial["first_seen"] is None or observed_at < partial["first_seen"]:
+            partial["first_seen"] = observed_at
+        if partial["last_seen"] is None or observed_at > partial["last_seen"]:
+            partial["last_seen"] = observed_at
+
+
+def merge_partials(partials: Iterable[Dict], weights: Iterable[float] = None) -> Dict:
+    """Combine partials; with weights, every sum and count is scaled"""
+    merged = new_partial()
+    weights = repeat(1.0) if weights is None else weights
+
+    for partial, weight in zip(partials, weights):
+        merged["count"] += weight * partial["count"]
+        for field in ("signal", "channel"):
+            for key in ("n", "sum", "sumsq"):
+                merged[field][key] += weight * partial[field][key]
+
+        clients = partial["clients"]
+        merged["clients"]["n"] += weight * clients["n"]
+        merged["clients"]["sum"] += weight * clients["sum"]
+        if clients["max"] is not None:
+            current = merged["clients"]["max"]
+            merged["clients"]["max"] = clients["max"] if current is None else max(current, clients["max"])
+
+        for field in ("channels", "encryptions", "authentications"):
+            for value, count in partial[field].items():
+                merged[field][value] = merged[field].get(value, 0) + weight * count
+
+        for field, pick in (("first_seen", min), ("last_seen", max)):
+            if partial[field] is not None:
+                merged[field] = partial[field] if merged[field] is None else pick(merged[field], partial[field])
+
+    return merged
+
+
+def _mean_std(moments: Dict) -> Tuple[Optional[float], Optional[float]]:
+    if not moments["n"]:
+        return None, None
+    mean = moments["sum"] / moments["n"]
+    return mean, math.sqrt(max(moments["sumsq"] / moments["n"] - mean * mean, 0.0))
+
+
+def partial_stats(merged: Dict) -> Optional[Dict]:
+    """Baseline statistics (all-time field names) of merged partials"""
+    if not merged["count"]:
+        return None
+
+    avg_signal, signal_std = _mean_std(merged["signal"])
+    _, channel_std = _mean_std(merged["channel"])
+    clients = merged["clients"]
+
+    return {
+        "avg_signal": avg_signal,
+        "signal_variance": signal_std,
+        "avg_channel": _mode(merged["channels"], numeric=True),
+        "channel_variance": channel_std or 0,
+        "client_count_avg": clients["sum"] / clients["n"] if clients["n"] else None,
+        "client_count_max": clients["max"],
+        "encryption": _mode(merged["encryptions"]),
+        "authentication": _mode(merged["authentications"]),
+        "first_seen": merged["first_seen"].isoformat() if merged["first_seen"] else None,
+        "last_seen": merged["last_seen"].isoformat() if merged["last_seen"] else None,
+        "observation_count": merged["count"]
+    }
+
+
+class BaselineWindows:
+    """Maintains features_partials and answers window / decay queries"""
+
+    def __init__(self, db, windows: List[str] = None, bucket_minutes: int = None,
+                 half_life_hours: float = None, lag_seconds: float = None):
+        """
+        :param windows: Window names ('1h', '24h', '7d'); Config.BASELINE_WINDOWS
+        :param bucket_minutes: Partial bucket size; Config.BASELINE_PARTIAL_MINUTES
+        :param half_life_hours: Decay half-life; Config.BASELINE_DECAY_HALF_LIFE
+        :param lag_seconds: Watermark lag behind now; Config.BASELINE_WATERMARK_LAG
+        """
+        names = windows or Config.BASELINE_WINDOWS
+        self.windows = {name: parse_window(name) for name in names}
+        self.bucket = timedelta(minutes=bucket_minutes or Config.BASELINE_PARTIAL_MINUTES)
+        self.half_life = timedelta(hours=half_life_hours or Config.BASELINE_DECAY_HALF_LIFE)
+        self.lag = timedelta(seconds=Config.BASELINE_WATERMARK_LAG if lag_seconds is None else lag_seconds)
+        self.retention = max(self.windows.values()) + self.bucket
+
+        self.raw_collection = db["raw_scans"]
+        self.bucket_collection = db["raw_scan_buckets"]
+        self.partials_collection = db["features_partials"]
+        self.meta_collection = db[META_COLLECTION]
+
+    def bucket_start(self, moment: datetime) -> datetime:
+        epoch = datetime(1970, 1, 1)
+        return moment - (moment - epoch) % self.bucket
+
+    # -------------------------
+    # Incremental maintenance
+    # -------------------------
+
+    def get_watermark(self) -> Optional[datetime]:
+        doc = self.meta_collection.find_one({"_id": WATERMARK_ID}, {"watermark": 1})
+        return doc.get("watermark") if doc else None
+
+    def update_partials(self, now: datetime = None) -> int:
+        """
+        Rebuild the partials of every bucket touched since the watermark.
+
+        Returns the number of partial documents written.
+        """
+        now = now or datetime.utcnow()
+        end = now - self.lag
+        watermark = self.get_watermark()
+        start = self.bucket_start(max(watermark, end - self.retention) if watermark else end - self.retention)
+        if start >= end:
+            return 0
+
+        partials: Dict[Tuple, Dict] = defaultdict(new_partial)
+        for obs in self.observations(start, end):
+            ssid, bssid = obs.get("ssid"), obs.get("bssid")
+            if not ssid or not bssid:
+                continue
+            add_observation(partials[(ssid, bssid, self.bucket_start(obs["observed_at"]))], obs)
+
+        operations = [
+            ReplaceOne(
+                {"ssid": ssid, "bssid": bssid, "bucket": bucket},
+                dict(partial, ssid=ssid, bssid=bssid, bucket=bucket),
+                upsert=True
+            )
+            for (ssid, bssid, bucket), partial in partials.items()
+        ]
+        if operations:
+            self.partials_collection.bulk_write(operations, ordered=False)
+
+        # Only advance once the partials are written; a failed run is redone
+        self.meta_collection.update_one(
+            {"_id": WATERMARK_ID}, {"$set": {"watermark": end}}, upsert=True
+        )
+        self.partials_collection.delete_many({"bucket": {"$lt": self.bucket_start(now - self.retention)}})
+        return len(operations)
+
+    def observations(self, start: Optional[datetime], end: datetime, query: Dict = None):
+        """
+        Typed observations with start <= observed_at < end from both raw stores.
+
+        :param start: None for all history
+        :param query: Extra conditions, e.g. a key_queries query
+        """
+        projection = {field: 1 for field in TYPED_FIELDS}
+        projection["_id"] = 0
+        observed = {"$lt": end} if start is None else {"$gte": start, "$lt": end}
+        yield from self.raw_collection.find(dict(query or {}, observed_at=observed), projection)
+
+        bucket_projection = {"_id": 0, "ssid": 1, "bssid": 1, "hour": 1, "t": 1, "s": 1, "changes": 1}
+        bucket_projection.update({f"keyframe.{field}": 1 for field in STATE_FIELDS})
+        bucket_query = dict(query or {}, hour={"$lt": end})
+        if start is not None:
+            bucket_query["last_seen"] = {"$gte": start}
+        for bucket in self.bucket_collection.find(bucket_query, bucket_projection):
+            for record in expand_bucket(bucket):
+                if (start is None or start <= record["observed_at"]) and record["observed_at"] < end:
+                    yield record
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def load_partials(self, since: datetime, keys: Set[Tuple[str, str]] = None) -> Dict[Tuple[str, str], List[Dict]]:
+        """
+        Partials since `since`, grouped by (ssid, bssid).
+
+        :param keys: Only load these keys (one Phase 2 shard)
+        """
+        if keys is None:
+            queries = [({"bucket": {"$gte": since}}, None)]
+        else:
+            queries = key_queries(keys, bucket={"$gte": since})
+
+        grouped = defaultdict(list)
+        for query, owned in queries:
+            for partial in self.partials_collection.find(query, {"_id": 0}):
+                key = (partial["ssid"], partial["bssid"])
+                if owned is None or key in owned:
+                    grouped[key].append(partial)
+        return grouped
+
+    def window_stats(self, partials: List[Dict], now: datetime) -> Dict:
+        """{"windows": {name: stats}, "decayed": stats} for one key's partials"""
+        windows = {}
+        for name, length in self.windows.items():
+            # Buckets overlapping (now - length, now]
+            cutoff = now - length - self.bucket
+            windows[name] = partial_stats(merge_partials(p for p in partials if p["bucket"] > cutoff))
+
+        half_life = self.half_life.total_seconds()
+        weights = [
+            0.5 ** (max((now - (p["bucket"] + self.bucket / 2)).total_seconds(), 0.0) / half_life)
+            for p in partials
+        ]
+        return {"windows": windows, "decayed": partial_stats(merge_partials(partials, weights))}
+
+    def empty_stats(self) -> Dict:
+        """Stats of a key without recent observations"""
+        return {"windows": {name: None for name in self.windows}, "decayed": None}
+
+    def compute(self, now: datetime = None, keys: Set[Tuple[str, str]] = None) -> Dict[Tuple[str, str], Dict]:
+        """Window and decayed statistics for every (ssid, bssid) with recent partials"""
+        now = now or datetime.utcnow()
+        grouped = self.load_partials(self.bucket_start(now - self.retention), keys)
+        return {key: self.window_stats(partials, now) for key, partials in grouped.items()}
@@ -0,0 +1,271 @@
+"""
+Capture Supervisor
+Runs one capture process per interface (or channel group) and merges
+their output into a single network view.
+
+Each worker process sniffs with Scapy, parses frames into compact
+tuples and ships them in batches over a multiprocessing queue. An
+aggregator thread in the parent merges the batches into a
+NetworkScanner, which owns the network/client state. Per-worker packet,
+record and drop counters live in shared memory so they can be read
+while capture is running.
+
+Record batches go over a multiprocessing.Queue (pickled, one pipe write
+per batch) rather than a shared-memory ring. Records carry
+variable-length strings, so a ring would need its own serialization
+anyway; pickling a 256-record batch costs about 0.6 us and 75 bytes per
+record, while Scapy spends tens of microseconds dissecting each frame.
+The queue also gives a bounded size (CAPTURE_QUEUE_SIZE, overflow is
+counted as dropped) and blocking gets for the aggregator.
+"""
+
+import multiprocessing
+import queue
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+from config import Config
+from services.network_scanner import NetworkScanner
+
+# Compact record kinds sent from workers to the aggregator
+BEACON_RECORD = 0
+CLIENT_RECORD = 1
+
+# Shared counter layout (per worker)
+PACKETS = 0
+RECORDS = 1
+DROPPED = 2
+COUNTER_FIELDS = 3
+
+
+def _hop_channels(interface: str, channels: List[int], interval: float, stop_event):
+    """Cycle the interface through a channel group until stopped"""
+    while not stop_event.is_set():
+        for channel in channels:
+            if stop_event.is_set():
+                return
+            subprocess.run(
+                ["iw", "dev", interface, "set", "channel", str(channel)],
+                capture_output=True
+            )
+            stop_event.wait(interval)
+
+
+def _capture_worker(worker_id: int, interface: str, channels: Optional[List[int]], duration: int,
+                    record_queue, counters, stop_event,
+                    batch_size: int, batch_interval: float, hop_interval: float):
+    """
+    Capture process entry point.
+
+    Counters are accumulated locally and published to the shared array on
+    every batch, so the hot path never touches shared memory.
+    """
+    from scapy.layers.dot11 import Dot11, Dot11Beacon
+
+    parser = NetworkScanner(interface)
+    base = worker_id * COUNTER_FIELDS
+    state = {"packets": 0, "records": 0, "dropped": 0, "last_flush": time.monotonic()}
+    batch = []
+
+    def flush():
+        if batch:
+            try:
+                record_queue.put_nowait(list(batch))
+                state["records"] += len(batch)
+            except queue.Full:
+                state["dropped"] += len(batch)
+            batch.clear()
+
+        counters[base + PACKETS] = state["packets"]
+        counters[base + RECORDS] = state["records"]
+        counters[base + DROPPED] = state["dropped"]
+        state["last_flush"] = time.monotonic()
+
+    def handle(packet):
+        if not packet.haslayer(Dot11):
+            return
+        state["packets"] += 1
+
+        if packet.haslayer(Dot11Beacon):
+            info = parser.parse_beacon(packet)
+            if info:
+                batch.append((
+                    BEACON_RECORD,
+                    info["bssid"],
+                    info["ssid"],
+                    info["channel"],
+                    info["signal_strength"],
+                    info["encryption"],
+                    info["is_hidden"],
+                    info["vendor"],
+                    info["timestamp"]
+                ))
+        elif packet[Dot11].type == 2:
+            batch.append((CLIENT_RECORD, packet[Dot11].addr3, packet[Dot11].addr2))
+
+        if len(batch) >= batch_size or time.monotonic() - state["last_flush"] >= batch_interval:
+            flush()
+
+    if channels:
+        hopper = threading.Thread(
+            target=_hop_channels,
+            args=(interface, channels, hop_interval, stop_event),
+            daemon=True
+        )
+        hopper.start()
+
+    try:
+        parser.capture(interface, duration, stop_event, prn=handle)
+    except Exception as e:
+        print(f"[CaptureWorker {worker_id}] Capture error on {interface}: {e}")
+    finally:
+        flush()
+        stop_event.set()
+
+
+class CaptureSupervisor:
+    """Multi-process capture across several interfaces or channel groups"""
+
+    def __init__(self, workers: List[Union[str, Dict]], duration: int = 30,
+                 scanner: NetworkScanner = None):
+        """
+        :param workers: Interface names, or dicts of {"interface": ..., "channels": [...]}
+        :param duration: Capture duration in seconds
+        :param scanner: NetworkScanner that receives the merged state
+        """
+        self.worker_specs = [
+            spec if isinstance(spec, dict) else {"interface": spec, "channels": None}
+            for spec in workers
+        ]
+        if not self.worker_specs:
+            raise ValueError("No capture workers specified")
+
+        self.duration = duration
+        self.scanner = scanner or NetworkScanner()
+        self.scanning = False
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._record_queue = None
+        self._counters = None
+        self._stop_events = []
+        self._processes = []
+        self._aggregator: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Spawn capture processes and the aggregator thread"""
+        self._record_queue = self._ctx.Queue(maxsize=Config.CAPTURE_QUEUE_SIZE)
+        # Each worker writes only its own slots, so no lock is needed
+        self._counters = self._ctx.Array("q", len(self.worker_specs) * COUNTER_FIELDS, lock=False)
+        self._stop_events = []
+        self._processes = []
+
+        self.scanner.networks = {}
+        self.scanner.clients.clear()
+        self.scanner.packets_captured = 0
+        self.scanning = True
+
+        for worker_id, spec in enumerate(self.worker_specs):
+            stop_event = self._ctx.Event()
+            process = self._ctx.Process(
+                target=_capture_worker,
+                args=(
+                    worker_id,
+                    spec["interface"],
+                    spec.get("channels"),
+                    self.duration,
+                    self._record_queue,
+                    self._counters,
+                    stop_event,
+                    Config.CAPTURE_BATCH_SIZE,
+                    Config.CAPTURE_BATCH_INTERVAL,
+                    Config.CHANNEL_HOP_INTERVAL
+                ),
+                daemon=True
+            )
+            process.start()
+            self._stop_events.append(stop_event)
+            self._processes.append(process)
+
+        print(f"[CaptureSupervisor] Started {len(self._processes)} capture workers")
+
+        self._aggregator = threading.Thread(target=self._aggregate, daemon=True)
+        self._aggregator.start()
+
+    def stop(self):
+        """Ask every worker to stop capturing"""
+        for stop_event in self._stop_events:
+            stop_event.set()
+
+    def join(self, timeout: float = None):
+        """Wait for workers to finish and the aggregator to drain"""
+        for process in self._processes:
+            process.join(timeout)
+        if self._aggregator:
+            self._aggregator.join(timeout)
+        self.scanning = False
+
+    def run(self) -> Dict:
+        """Capture for the configured duration and return merged results"""
+        self.start()
+        self.join()
+        return self.get_results()
+
+    def _aggregate(self):
+        """Merge record batches from all workers until every worker has exited"""
+        while True:
+            try:
+                batch = self._record_queue.get(timeout=0.2)
+            except queue.Empty:
+                if not any(process.is_alive() for process in self._processes):
+                    break
+                continue
+
+            with self._lock:
+                self._merge_batch(batch)
+
+    def _merge_batch(self, batch: List[tuple]):
+        for record in batch:
+            if record[0] == BEACON_RECORD:
+                _, bssid, ssid, channel, signal, encryption, is_hidden, vendor, timestamp = record
+                self.scanner.update_network({
+                    "bssid": bssid,
+                    "ssid": ssid,
+                    "channel": channel,
+                    "signal_strength": signal,
+                    "encryption": encryption,
+                    "is_hidden": is_hidden,
+                    "timestamp": timestamp,
+                    "vendor": vendor
+                })
+            elif record[0] == CLIENT_RECORD:
+                self.scanner.track_client(record[1], record[2])
+
+    def get_worker_stats(self) -> List[Dict]:
+        """Per-worker packet, record and drop counters"""
+        stats = []
+        for worker_id, spec in enumerate(self.worker_specs):
+            base = worker_id * COUNTER_FIELDS
+            process = self._processes[worker_id] if worker_id < len(self._processes) else None
+            stats.append({
+                "worker_id": worker_id,
+                "interface": spec["interface"],
+                "channels": spec.get("channels"),
+                "packets": self._counters[base + PACKETS] if self._counters else 0,
+                "records": self._counters[base + RECORDS] if self._counters else 0,
+                "dropped": self._counters[base + DROPPED] if self._counters else 0,
+                "alive": bool(process and process.is_alive())
+            })
+        return stats
+
+    def get_results(self) -> Dict:
+        """Merged scan results plus worker counters"""
+        with self._lock:
+            workers = self.get_worker_stats()
+            self.scanner.packets_captured = sum(w["packets"] for w in workers)
+            results = self.scanner.get_results()
+
+        results["workers"] = workers
+        return results
@@ -0,0 +1,204 @@
+"""
+Client Tracker
+Memory-bounded tracking of stations (clients) seen per BSSID.
+
+Each BSSID keeps a small exact set of station MACs. In approximate mode
+the set is promoted to a HyperLogLog sketch once it grows past a limit,
+so memory per BSSID stays constant no matter how long the scan runs.
+The number of tracked BSSIDs is capped with an LRU policy.
+"""
+
+import hashlib
+import math
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class HyperLogLog:
+    """Fixed-size HyperLogLog distinct-count sketch"""
+
+    def __init__(self, precision: int = 10):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.registers = bytearray(self.num_registers)
+
+        if self.num_registers == 16:
+            self.alpha = 0.673
+        elif self.num_registers == 32:
+            self.alpha = 0.697
+        elif self.num_registers == 64:
+            self.alpha = 0.709
+        else:
+            self.alpha = 0.7213 / (1 + 1.079 / self.num_registers)
+
+    def add(self, value: str) -> bool:
+        """Add a value to the sketch; True if any register changed"""
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+
+        remaining_bits = 64 - self.precision
+        index = hashed >> remaining_bits
+        remainder = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remainder.bit_length() + 1
+
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other: "HyperLogLog"):
+        """Merge another sketch of the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+
+        for i, value in enumerate(other.registers):
+            if value > self.registers[i]:
+                self.registers[i] = value
+
+    def estimate(self) -> float:
+        """Estimated number of distinct values added"""
+        m = self.num_registers
+        raw = self.alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # Small-range correction (linear counting)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros > 0:
+            return m * math.log(m / zeros)
+
+        return raw
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of the estimate as a fraction of the count"""
+        return 1.04 / math.sqrt(self.num_registers)
+
+
+class StationCounter:
+    """
+    Distinct station counter for a single BSSID.
+
+    Exact while small; promoted to a HyperLogLog sketch once more than
+    `exact_limit` stations have been seen. `exact_limit=None` keeps it
+    exact forever.
+    """
+
+    def __init__(self, exact_limit: Optional[int] = None, precision: int = 10):
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self._stations: Optional[set] = set()
+        self._sketch: Optional[HyperLogLog] = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self._sketch is None
+
+    def add(self, station: str) -> bool:
+        """Add a station; True if the count may have changed"""
+        if self._sketch is not None:
+            return self._sketch.add(station)
+
+        if station in self._stations:
+            return False
+        self._stations.add(station)
+
+        if self.exact_limit is not None and len(self._stations) > self.exact_limit:
+            self._sketch = HyperLogLog(self.precision)
+            for known in self._stations:
+                self._sketch.add(known)
+            self._stations = None
+
+        return True
+
+    def count(self) -> int:
+        if self._sketch is None:
+            return len(self._stations)
+        return int(round(self._sketch.estimate()))
+
+    def error_bound(self) -> float:
+        """Absolute standard error of `count()` (0 while exact)"""
+        if self._sketch is None:
+            return 0.0
+        return round(self._sketch.estimate() * self._sketch.relative_error, 2)
+
+    def stations(self) -> List[str]:
+        """Station MACs, only available while the counter is exact"""
+        if self._sketch is not None:
+            return []
+        return list(self._stations)
+
+
+class ClientTracker:
+    """
+    Per-BSSID station counters with a global LRU cap on tracked BSSIDs.
+    """
+
+    def __init__(self, max_bssids: int = 2048, approximate: bool = False,
+                 exact_limit: int = 64, precision: int = 10):
+        """
+        :param max_bssids: Maximum number of BSSIDs tracked at once
+        :param approximate: Promote large station sets to HyperLogLog sketches
+        :param exact_limit: Stations kept exactly before promotion
+        :param precision: HyperLogLog precision (2**precision registers)
+        """
+        self.max_bssids = max_bssids
+        self.approximate = approximate
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self.evicted_bssids = 0
+        self._counters: "OrderedDict[str, StationCounter]" = OrderedDict()
+
+    def add(self, bssid: str, station: str) -> bool:
+        """Record that `station` was seen talking to `bssid`; True if its count may have changed"""
+        counter = self._counters.get(bssid)
+
+        if counter is None:
+            counter = StationCounter(
+                exact_limit=self.exact_limit if self.approximate else None,
+                precision=self.precision
+            )
+            self._counters[bssid] = counter
+
+            if len(self._counters) > self.max_bssids:
+                self._counters.popitem(last=False)
+                self.evicted_bssids += 1
+        else:
+            self._counters.move_to_end(bssid)
+
+        return counter.add(station)
+
+    def count(self, bssid: str) -> int:
+        counter = self._counters.get(bssid)
+        return counter.count() if counter else 0
+
+    def error_bound(self, bssid: str) -> float:
+        counter = self._counters.get(bssid)
+        return counter.error_bound() if counter else 0.0
+
+    def is_exact(self, bssid: str) -> bool:
+        counter = self._counters.get(bssid)
+        return counter.is_exact if counter else True
+
+    def stations(self, bssid: str) -> List[str]:
+        counter = self._counters.get(bssid)
+        return counter.stations() if counter else []
+
+    def clear(self):
+        self._counters.clear()
+        self.evicted_bssids = 0
+
+    def get_stats(self) -> dict:
+        return {
+            "tracked_bssids": len(self._counters),
+            "max_bssids": self.max_bssids,
+            "evicted_bssids": self.evicted_bssids,
+            "approximate": self.approximate
+        }
+
+    def __contains__(self, bssid: str) -> bool:
+        return bssid in self._counters
+
+    def __len__(self) -> int:
+        return len(self._counters)
@@ -0,0 +1,169 @@
+"""
+Feature Matrix Cache
+Memory-mapped float32 feature matrices shared between pipeline stages.
+
+A cached entry is two .npy files in Config.FEATURE_CACHE_DIR:
+
+    <schema>-<key>.npy        float32 matrix in schema order
+    <schema>-<key>.keys.npy   (ssid, bssid) per row
+
+`key` is the features_baseline revision ("rev<N>"). Phase 2 bumps the
+revision in `pipeline_meta` after every run, so a matrix built from
+older baselines is never reused; writing a new revision of a schema
+deletes the older ones.
+
+Per-scan inference matrices are not cached: hashing a scan's readings
+for the key costs more than rebuilding its features.
+
+Consumers get np.load(..., mmap_mode="r") views instead of rebuilding
+dicts -> lists -> arrays.
+"""
+
+import glob
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pymongo import ReturnDocument
+
+from config import Config
+from services.feature_registry import FeatureSchema
+
+META_COLLECTION = "pipeline_meta"
+BASELINE_REVISION_ID = "features_baseline"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def get_baseline_revision(db) -> int:
+    """Current features_baseline revision (0 before the first Phase 2 run)"""
+    doc = db[META_COLLECTION].find_one({"_id": BASELINE_REVISION_ID}, {"revision": 1})
+    return doc.get("revision", 0) if doc else 0
+
+
+def bump_baseline_revision(db) -> int:
+    """Mark features_baseline as changed; returns the new revision"""
+    doc = db[META_COLLECTION].find_one_and_update(
+        {"_id": BASELINE_REVISION_ID},
+        {"$inc": {"revision": 1}, "$set": {"updated_at": datetime.utcnow().isoformat()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["revision"]
+
+
+def baseline_key(revision: int) -> str:
+    return f"rev{revision}"
+
+
+class FeatureMatrixCache:
+    """On-disk cache of (matrix, keys) per schema and revision"""
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir or Config.FEATURE_CACHE_DIR
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, schema: FeatureSchema, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, f"{schema.name}-{_UNSAFE.sub('_', str(key))}")
+        return base + ".npy", base + ".keys.npy"
+
+    def get(self, schema: FeatureSchema, key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Memory-mapped (matrix, keys) or None if not cached"""
+        matrix_path, keys_path = self._paths(schema, key)
+        try:
+            matrix = np.load(matrix_path, mmap_mode="r")
+            keys = np.load(keys_path, mmap_mode="r")
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if matrix.ndim != 2 or matrix.shape != (len(keys), len(schema)) or matrix.dtype != schema.dtype:
+            # Written with another schema version
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return matrix, keys
+
+    def put(self, schema: FeatureSchema, key: str, matrix: np.ndarray,
+            keys: Sequence[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Store a matrix and its row keys; returns the memory-mapped copies.
+        Other cached entries of the schema are deleted.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        matrix_path, keys_path = self._paths(schema, key)
+        key_array = np.array([[str(ssid), str(bssid)] for ssid, bssid in keys], dtype=str).reshape(len(keys), 2)
+
+        with self._lock:
+            # Keys first: a matrix file is only ever visible with its index
+            for path, array in ((keys_path, key_array), (matrix_path, np.ascontiguousarray(matrix, dtype=schema.dtype))):
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, array)
+                os.replace(tmp_path, path)
+
+            for path in glob.glob(os.path.join(self.cache_dir, f"{schema.name}-*.npy")):
+                if path not in (matrix_path, keys_path):
+                    self._remove(path)
+
+        return np.load(matrix_path, mmap_mode="r"), np.load(keys_path, mmap_mode="r")
+
+    def get_or_build(self, schema: FeatureSchema, key: str, load_records: Callable[[], List[Dict]],
+                     context: Sequence[Dict] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cached (matrix, keys) for `key`, building it from `load_records()` on a miss.
+
+        :param context: Context records for schema.build (see FeatureFrame)
+        """
+        cached = self.get(schema, key)
+        if cached is not None:
+            return cached
+
+        records = load_records()
+        matrix = schema.build(records, context)
+        keys = [(record.get("ssid"), record.get("bssid")) for record in records]
+        print(f"[FeatureCache] Built {schema.name} matrix {matrix.shape} for {key}")
+        return self.put(schema, key, matrix, keys)
+
+    def invalidate(self, schema: FeatureSchema = None):
+        """Drop cached entries of one schema (or all)"""
+        pattern = f"{schema.name}-*.npy" if schema else "*.npy"
+        with self._lock:
+            for path in glob.glob(os.path.join(self.cache_dir, pattern)):
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            # Still mapped by a reader on some platforms; retried on the next write
+            pass
+
+    def get_stats(self) -> Dict:
+        return {
+            "cache_dir": self.cache_dir,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(glob.glob(os.path.join(self.cache_dir, "*.keys.npy")))
+        }
+
+
+_cache_instance: Optional[FeatureMatrixCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_feature_cache() -> FeatureMatrixCache:
+    """Process-wide feature matrix cache"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = FeatureMatrixCache()
+    return _cache_instance
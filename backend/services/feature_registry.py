@@ -0,0 +1,317 @@
+"""
+Feature Registry
+Single declarative definition of every ML feature schema.
+
+A schema is an ordered list of named features. Each feature is a
+vectorized function over a FeatureFrame (column view of a list of
+records); categorical lookups go through small lookup arrays built once
+per distinct value instead of per record.
+
+- NETWORK_FEATURES:   FeatureExtractor (live scan, 10 features)
+- INFERENCE_FEATURES: MLInference RF/GB classifiers (8 features)
+- BASELINE_FEATURES:  Phase 3 Isolation Forest (features_baseline, 6 features)
+
+schema.build(records, context) returns a C-contiguous float32 matrix in
+schema order; schema.validate(model) checks a fitted model against it.
+"""
+
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.oui_lookup import lookup_vendor
+
+# -------------------------
+# Lookup tables
+# -------------------------
+
+# FeatureExtractor
+NETWORK_ENCRYPTION_TYPES = {'Open': 0, 'WEP': 1, 'WPA': 2, 'WPA2': 3, 'WPA3': 4, 'WPA/WPA2': 2.5}
+NETWORK_ENCRYPTION_STRENGTH = {'Open': 0.0, 'WEP': 0.2, 'WPA': 0.5, 'WPA2': 0.8, 'WPA3': 1.0, 'WPA/WPA2': 0.7}
+NETWORK_VENDOR_TRUST = {
+    'Apple': 0.95, 'Cisco': 0.95, 'Linksys': 0.85, 'TP-Link': 0.85, 'Netgear': 0.85,
+    'Asus': 0.85, 'D-Link': 0.80, 'Belkin': 0.80, 'Ubiquiti': 0.90, 'Unknown': 0.30,
+    'VMware': 0.50, 'VirtualBox': 0.50
+}
+
+# MLInference (the saved classifiers were trained on these encodings)
+INFERENCE_ENCRYPTION_TYPES = {'Open': 0, 'WEP': 1, 'WPA': 2, 'WPA2': 3}
+INFERENCE_VENDOR_TRUST = {'Apple': 0.95, 'Linksys': 0.85, 'TP-Link': 0.80, 'Unknown': 0.40}
+
+
+# -------------------------
+# Frame
+# -------------------------
+
+
+class FeatureFrame:
+    """
+    Column view over a list of record dicts.
+
+    Every (field, default) column is pulled out of the records once and
+    shared by all features that use it. `context` is the record set that
+    context features (duplicate counts, congestion, similarity) compare
+    against; it defaults to the records themselves.
+    """
+
+    def __init__(self, records: Sequence[Dict], context: Sequence[Dict] = None):
+        self.records = records
+        self._columns: Dict[Tuple, List] = {}
+        self._context = None if context is None else FeatureFrame(context)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def context(self) -> "FeatureFrame":
+        return self if self._context is None else self._context
+
+    def column(self, field: str, default=None) -> List:
+        """record.get(field, default) for every record"""
+        key = (field, default)
+        values = self._columns.get(key)
+        if values is None:
+            values = self._columns[key] = [record.get(field, default) for record in self.records]
+        return values
+
+    def numeric(self, field: str, default: float = 0, none: float = None) -> np.ndarray:
+        """Numeric column; `none` replaces explicit None values"""
+        values = self.column(field, default)
+        if none is not None:
+            values = [none if value is None else value for value in values]
+        return np.array(values, dtype=np.float64)
+
+
+def factorize(values: Sequence[Hashable]) -> Tuple[np.ndarray, List]:
+    """Integer code per value and the distinct values in first-seen order"""
+    codes: Dict = {}
+    indices = np.fromiter((codes.setdefault(value, len(codes)) for value in values),
+                          dtype=np.intp, count=len(values))
+    return indices, list(codes)
+
+
+def lookup(values: Sequence[Hashable], table: Dict, default: float) -> np.ndarray:
+    """table.get(value, default) per value, mapping each distinct value once"""
+    indices, uniques = factorize(values)
+    return np.array([table.get(value, default) for value in uniques], dtype=np.float64)[indices]
+
+
+def group_by(members: Sequence[Hashable], keys: Sequence[Hashable]) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Factorize a group-by.
+
+    Returns (group code per member, group code per lookup key, group count).
+    Keys matching no member get code == group count, so callers index
+    per-group arrays padded with one trailing default.
+    """
+    codes: Dict = {}
+    member_codes = np.fromiter((codes.setdefault(value, len(codes)) for value in members),
+                               dtype=np.intp, count=len(members))
+    missing = len(codes)
+    key_codes = np.fromiter((codes.get(key, missing) for key in keys), dtype=np.intp, count=len(keys))
+    return member_codes, key_codes, missing
+
+
+def group_variance(values: np.ndarray, codes: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    np.var of each group's values (in input order); 0.0 for groups of one.
+
+    Groups of equal size are stacked and reduced row-wise in one np.var
+    call, so every group is summed exactly like np.var(group) would.
+    """
+    variance = np.zeros(len(counts))
+    order = np.argsort(codes, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sorted_values = values[order]
+
+    for size in np.unique(counts[counts > 1]):
+        groups = np.flatnonzero(counts == size)
+        rows = starts[groups][:, None] + np.arange(size)
+        variance[groups] = np.var(sorted_values[rows], axis=1)
+
+    return variance
+
+
+# -------------------------
+# Schema
+# -------------------------
+
+
+class Feature(NamedTuple):
+    name: str
+    compute: Callable[[FeatureFrame], np.ndarray]
+    description: str = ""
+
+
+class FeatureSchema:
+    """Ordered feature definitions for one model family"""
+
+    def __init__(self, name: str, features: Sequence[Feature], dtype=np.float32):
+        self.name = name
+        self.features = list(features)
+        self.dtype = np.dtype(dtype)
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    @property
+    def names(self) -> List[str]:
+        return [feature.name for feature in self.features]
+
+    def build(self, records: Sequence[Dict], context: Sequence[Dict] = None) -> np.ndarray:
+        """C-contiguous (len(records), len(schema)) matrix in schema order"""
+        frame = FeatureFrame(records, context)
+        matrix = np.empty((len(records), len(self.features)), dtype=self.dtype)
+        if len(records):
+            for column, feature in enumerate(self.features):
+                matrix[:, column] = feature.compute(frame)
+        return matrix
+
+    def validate(self, model, label: str = None):
+        """
+        Check a fitted estimator (scaler, classifier...) against the schema.
+
+        :raises ValueError: feature count or recorded feature names differ
+        """
+        label = label or type(model).__name__
+        expected = getattr(model, "n_features_in_", None)
+        if expected is not None and expected != len(self.features):
+            raise ValueError(
+                f"{label} expects {expected} features, schema '{self.name}' has {len(self.features)}"
+            )
+        names = getattr(model, "feature_names_in_", None)
+        if names is not None and list(names) != self.names:
+            raise ValueError(f"{label} feature names {list(names)} do not match schema '{self.name}'")
+
+
+# -------------------------
+# Feature functions
+# -------------------------
+
+
+def _vendors(frame: FeatureFrame) -> List[str]:
+    """Scan-reported vendor, else IEEE registry lookup of the BSSID"""
+    bssids = frame.column('bssid', '')
+    return [vendor or lookup_vendor(bssid) for vendor, bssid in zip(frame.column('vendor'), bssids)]
+
+
+def _flag(frame: FeatureFrame, field: str, true: float = 1, false: float = 0) -> np.ndarray:
+    return np.array([true if value else false for value in frame.column(field, False)], dtype=np.float64)
+
+
+def _ssid_groups(frame: FeatureFrame):
+    # A record's key defaults to '' but only context records whose 'ssid'
+    # equals that key are members (missing 'ssid' counts as None)
+    return group_by(frame.context.column('ssid'), frame.column('ssid', ''))
+
+
+def duplicate_ssid_count(frame: FeatureFrame) -> np.ndarray:
+    """Other context networks broadcasting the same SSID"""
+    members, keys, groups = _ssid_groups(frame)
+    return np.append(np.bincount(members, minlength=groups), 0)[keys] - 1
+
+
+def ssid_signal_variance(frame: FeatureFrame) -> np.ndarray:
+    """Signal variance across the SSID's BSSIDs / 100, capped at 1"""
+    members, keys, groups = _ssid_groups(frame)
+    counts = np.bincount(members, minlength=groups)
+    signals = frame.context.numeric('signal_strength', -80)
+    variance = np.minimum(group_variance(signals, members, counts) / 100.0, 1.0)
+    return np.append(variance, 0.0)[keys]
+
+
+def channel_congestion(frame: FeatureFrame) -> np.ndarray:
+    """Context networks on the same channel / 10, capped at 1"""
+    members, keys, groups = group_by(frame.context.column('channel'), frame.column('channel', 0))
+    counts = np.append(np.bincount(members, minlength=groups), 0)
+    return np.minimum(counts[keys] / 10.0, 1.0)
+
+
+def _padded_codepoints(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    array = np.array(strings, dtype=str)
+    width = max(array.dtype.itemsize // 4, 1)
+    return array.astype(f"U{width}").view(np.uint32).reshape(len(strings), width), np.char.str_len(array)
+
+
+def ssid_similarity(frame: FeatureFrame, chunk: int = 256) -> np.ndarray:
+    """
+    Best positional character match ratio against any context SSID.
+
+    Compared once per distinct SSID pair, chunked to bound memory.
+    """
+    indices, ssids = factorize([ssid or "" for ssid in frame.column('ssid', '')])
+    known = sorted({ssid for ssid in frame.context.column('ssid', '') if ssid})
+    best = np.zeros(len(ssids))
+    queries = [i for i, ssid in enumerate(ssids) if ssid]
+    if not known or not queries:
+        return best[indices]
+
+    known_codes, known_lengths = _padded_codepoints(known)
+    query_codes, query_lengths = _padded_codepoints([ssids[i] for i in queries])
+    width = max(known_codes.shape[1], query_codes.shape[1])
+    known_codes = np.pad(known_codes, ((0, 0), (0, width - known_codes.shape[1])))
+    query_codes = np.pad(query_codes, ((0, 0), (0, width - query_codes.shape[1])))
+
+    scores = np.empty(len(queries))
+    for start in range(0, len(queries), chunk):
+        block = query_codes[start:start + chunk]
+        # Padding is 0 on both sides; only count positions present in both strings
+        matches = ((block[:, None, :] == known_codes[None, :, :]) & (block[:, None, :] != 0)).sum(axis=2)
+        longest = np.maximum(query_lengths[start:start + chunk, None], known_lengths[None, :])
+        scores[start:start + chunk] = (matches / longest).max(axis=1)
+
+    best[queries] = scores
+    return best[indices]
+
+
+def _traffic_pattern(frame: FeatureFrame) -> np.ndarray:
+    clients = frame.numeric('client_count', 0)
+    return np.where(clients > 30, 0.7, np.where(clients > 10, 0.4, 0.1))
+
+
+# -------------------------
+# Schemas
+# -------------------------
+
+NETWORK_FEATURES = FeatureSchema("network", [
+    Feature('signal_strength', lambda f: f.numeric('signal_strength', -80), "dBm"),
+    Feature('channel', lambda f: f.numeric('channel', 0)),
+    Feature('encryption_type', lambda f: lookup(f.column('encryption', 'Open'), NETWORK_ENCRYPTION_TYPES, 0)),
+    Feature('is_hidden', lambda f: _flag(f, 'is_hidden')),
+    Feature('vendor_trust_score', lambda f: lookup(_vendors(f), NETWORK_VENDOR_TRUST, 0.50)),
+    Feature('signal_variance', ssid_signal_variance, "across BSSIDs of the SSID"),
+    Feature('duplicate_ssid_count', duplicate_ssid_count),
+    Feature('channel_congestion', channel_congestion),
+    Feature('frequency_band', lambda f: (f.numeric('frequency', 2437) > 5000).astype(np.float64),
+            "2.4GHz=0, 5GHz=1"),
+    Feature('encryption_strength',
+            lambda f: lookup(f.column('encryption', 'Open'), NETWORK_ENCRYPTION_STRENGTH, 0.5)),
+])
+
+INFERENCE_FEATURES = FeatureSchema("inference", [
+    Feature('signal_strength', lambda f: f.numeric('signal_strength', -80), "dBm"),
+    Feature('channel_variance', lambda f: _flag(f, 'channel', 0, 10)),
+    Feature('encryption_type', lambda f: lookup(f.column('encryption', 'Open'), INFERENCE_ENCRYPTION_TYPES, 0)),
+    Feature('vendor_consistency', lambda f: lookup(_vendors(f), INFERENCE_VENDOR_TRUST, 0.5)),
+    Feature('behavior_anomaly', lambda f: _flag(f, 'is_hidden', 0.2, 0.1)),
+    Feature('traffic_pattern', _traffic_pattern),
+    Feature('client_count', lambda f: np.minimum(f.numeric('client_count', 0) / 50, 1.0), "ratio of 50"),
+    Feature('ssid_similarity', ssid_similarity, "against known networks"),
+])
+
+BASELINE_FEATURES = FeatureSchema("baseline", [
+    Feature('avg_signal', lambda f: f.numeric('avg_signal', -100, none=0)),
+    Feature('signal_variance', lambda f: f.numeric('signal_variance', 0, none=0)),
+    Feature('channel_variance', lambda f: f.numeric('channel_variance', 0, none=0)),
+    Feature('client_count_avg', lambda f: f.numeric('client_count_avg', 0, none=0)),
+    Feature('client_count_max', lambda f: f.numeric('client_count_max', 0, none=0)),
+    Feature('observation_count', lambda f: f.numeric('observation_count', 0, none=0)),
+])
+
+SCHEMAS: Dict[str, FeatureSchema] = {
+    schema.name: schema for schema in (NETWORK_FEATURES, INFERENCE_FEATURES, BASELINE_FEATURES)
+}
+
+
+def get_schema(name: str) -> Optional[FeatureSchema]:
+    return SCHEMAS.get(name)
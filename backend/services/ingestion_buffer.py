@@ -0,0 +1,199 @@
+"""
+Ingestion Buffer
+Batches append-only document inserts into unordered insert_many calls.
+
+Records are queued in memory and flushed when a batch fills up or the
+oldest pending record reaches `max_age` seconds. Memory is bounded by
+`max_pending`; when the buffer is full the backpressure policy decides
+what happens:
+- "block":        add() waits until the flusher frees space (without a
+                  running flusher it writes a batch itself)
+- "drop_oldest":  the oldest pending record is discarded
+- "drop_newest":  the incoming record is discarded
+
+The buffer never updates or deletes documents.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from services.metrics import LatencyHistogram
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+
+class IngestionBuffer:
+    """Size/age triggered batch writer for a MongoDB collection"""
+
+    def __init__(self, collection, max_batch: int = 500, max_age: float = 2.0,
+                 max_pending: int = 10000, policy: str = "drop_oldest"):
+        """
+        :param collection: Target MongoDB collection
+        :param max_batch: Records per insert_many
+        :param max_age: Seconds before a partial batch is flushed
+        :param max_pending: Maximum records held in memory
+        :param policy: Backpressure policy when max_pending is reached
+        """
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+
+        self.collection = collection
+        self.max_batch = max_batch
+        self.max_age = max_age
+        self.max_pending = max(max_pending, max_batch)
+        self.policy = policy
+
+        # (enqueued_at, record)
+        self._pending: deque = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.flush_latency = LatencyHistogram()
+        self.records_added = 0
+        self.records_inserted = 0
+        self.records_dropped = 0
+        self.records_failed = 0
+        self.flush_errors = 0
+
+    # -------------------------
+    # Intake
+    # -------------------------
+
+    def add(self, record: Dict):
+        while True:
+            with self._cond:
+                if len(self._pending) < self.max_pending or self.policy != "block":
+                    self._append(record)
+                    return
+                if self._running:
+                    self._cond.wait(0.5)
+                    continue
+
+            # "block" without a running flusher (not started or stopping):
+            # nothing else frees space, so write a batch from this thread
+            self.flush()
+            with self._cond:
+                if len(self._pending) >= self.max_pending:
+                    # The write failed; reject rather than grow past the bound
+                    self.records_dropped += 1
+                    return
+
+    def _append(self, record: Dict):
+        """Queue one record; a full buffer drops per policy (lock held)"""
+        if len(self._pending) >= self.max_pending:
+            self.records_dropped += 1
+            if self.policy == "drop_newest":
+                return
+            self._pending.popleft()
+
+        self._pending.append((time.monotonic(), record))
+        self.records_added += 1
+
+        if len(self._pending) >= self.max_batch:
+            self._cond.notify_all()
+
+    def add_many(self, records: List[Dict]):
+        for record in records:
+            self.add(record)
+
+    # -------------------------
+    # Flushing
+    # -------------------------
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Stop the flusher and write out everything still pending"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+        deadline = time.monotonic() + timeout
+        while self.pending_count() and time.monotonic() < deadline:
+            if self.flush() == 0 and self.flush_errors:
+                break
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    if len(self._pending) >= self.max_batch:
+                        break
+                    if self._pending:
+                        age = time.monotonic() - self._pending[0][0]
+                        if age >= self.max_age:
+                            break
+                        self._cond.wait(self.max_age - age)
+                    else:
+                        self._cond.wait(self.max_age)
+                if not self._running:
+                    return
+
+            self.flush()
+
+    def flush(self) -> int:
+        """Insert one batch; returns the number of records written"""
+        with self._cond:
+            if not self._pending:
+                return 0
+            batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+            # Space was freed for blocked producers
+            self._cond.notify_all()
+
+        records = [record for _, record in batch]
+        started = time.monotonic()
+
+        try:
+            result = self.collection.insert_many(records, ordered=False)
+            inserted = len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Unordered: everything except the reported errors was written
+            inserted = e.details.get("nInserted", 0)
+            self.records_failed += len(records) - inserted
+        except PyMongoError as e:
+            print(f"[IngestionBuffer] Flush failed, requeueing {len(batch)} records: {e}")
+            self.flush_errors += 1
+            self._requeue(batch)
+            return 0
+
+        self.flush_latency.observe(time.monotonic() - started)
+        self.records_inserted += inserted
+        return inserted
+
+    def _requeue(self, batch: list):
+        """Put a failed batch back at the front, within the memory bound"""
+        with self._cond:
+            space = self.max_pending - len(self._pending)
+            keep = batch[-space:] if space > 0 else []
+            self.records_dropped += len(batch) - len(keep)
+            self._pending.extendleft(reversed(keep))
+
+    def get_metrics(self) -> Dict:
+        return {
+            "pending": self.pending_count(),
+            "records_added": self.records_added,
+            "records_inserted": self.records_inserted,
+            "records_dropped": self.records_dropped,
+            "records_failed": self.records_failed,
+            "flush_errors": self.flush_errors,
+            "policy": self.policy,
+            "flush_latency": self.flush_latency.snapshot()
+        }
@@ -0,0 +1,152 @@
+"""
+Live Scan Buffer
+Coalesces incremental scan deltas and publishes them in batches.
+
+The scanner reports deltas (new BSSID, RSSI update, client count change)
+as packets arrive. Deltas for the same BSSID collapse into one entry,
+and a background thread flushes whatever is pending every
+`flush_interval_ms`, so subscribers get one batched message per interval
+instead of one per packet.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+# Accepted flush periods; shorter ones would turn the flush thread into a busy loop
+MIN_FLUSH_MS = 50
+MAX_FLUSH_MS = 10000
+
+
+def parse_flush_interval(value) -> int:
+    """
+    Flush period from request input, clamped to [MIN_FLUSH_MS, MAX_FLUSH_MS].
+
+    Raises ValueError for non-numeric or non-positive values.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError("live_flush_ms must be a number of milliseconds")
+    try:
+        milliseconds = int(float(value))
+    except (ValueError, OverflowError):
+        raise ValueError("live_flush_ms must be a number of milliseconds")
+    if milliseconds <= 0:
+        raise ValueError("live_flush_ms must be positive")
+    return min(max(milliseconds, MIN_FLUSH_MS), MAX_FLUSH_MS)
+
+
+class LiveScanBuffer:
+    """Coalescing delta buffer with a periodic flush"""
+
+    def __init__(self, emit: Callable[[Dict], None], scan_id: str,
+                 flush_interval_ms: int = 500, client_count: Callable[[str], int] = None):
+        """
+        :param emit: Called with each batched payload
+        :param scan_id: Included in every payload
+        :param flush_interval_ms: Flush period in milliseconds, clamped to
+                                  [MIN_FLUSH_MS, MAX_FLUSH_MS]
+        :param client_count: Resolves the current client count for a BSSID at flush time
+        """
+        self.emit = emit
+        self.scan_id = scan_id
+        self.flush_interval = min(max(flush_interval_ms, MIN_FLUSH_MS), MAX_FLUSH_MS) / 1000.0
+        self.client_count = client_count
+
+        self._new_networks: Dict[str, Dict] = {}
+        self._rssi: Dict[str, int] = {}
+        self._dirty_clients = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.sequence = 0
+        self.deltas_received = 0
+        self.entries_emitted = 0
+
+    # -------------------------
+    # Delta intake (capture thread)
+    # -------------------------
+
+    def network_added(self, network: Dict):
+        with self._lock:
+            self.deltas_received += 1
+            self._new_networks[network["bssid"]] = dict(network)
+            self._rssi.pop(network["bssid"], None)
+
+    def rssi_updated(self, bssid: str, signal_strength: int):
+        with self._lock:
+            self.deltas_received += 1
+            pending = self._new_networks.get(bssid)
+            if pending is not None:
+                # Not published yet: just refresh the pending record
+                pending["signal_strength"] = signal_strength
+            else:
+                self._rssi[bssid] = signal_strength
+
+    def client_changed(self, bssid: str):
+        with self._lock:
+            self.deltas_received += 1
+            self._dirty_clients.add(bssid)
+
+    # -------------------------
+    # Flushing
+    # -------------------------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and publish anything still pending"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _flush_loop(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while not self._stop_event.wait(max(next_flush - time.monotonic(), 0)):
+            next_flush += self.flush_interval
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[LiveScanBuffer] Flush error: {e}")
+
+    def flush(self) -> bool:
+        """Emit one batched payload if anything changed; True if emitted"""
+        with self._lock:
+            if not (self._new_networks or self._rssi or self._dirty_clients):
+                return False
+            new_networks, self._new_networks = self._new_networks, {}
+            rssi, self._rssi = self._rssi, {}
+            dirty_clients, self._dirty_clients = self._dirty_clients, set()
+            self.sequence += 1
+            sequence = self.sequence
+
+        clients = {}
+        if self.client_count is not None:
+            clients = {bssid: self.client_count(bssid) for bssid in dirty_clients}
+
+        payload = {
+            "scan_id": self.scan_id,
+            "seq": sequence,
+            "new_networks": list(new_networks.values()),
+            "rssi": rssi,
+            "clients": clients,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        self.entries_emitted += len(new_networks) + len(rssi) + len(clients)
+        self.emit(payload)
+        return True
+
+    def get_stats(self) -> Dict:
+        return {
+            "flushes": self.sequence,
+            "deltas_received": self.deltas_received,
+            "entries_emitted": self.entries_emitted
+        }
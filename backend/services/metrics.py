@@ -0,0 +1,70 @@
+"""
+Metrics
+Small thread-safe latency histograms used by background services.
+"""
+
+import threading
+from typing import Dict, Sequence
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds)"""
+
+    DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self, buckets_ms: Sequence[float] = None):
+        self.buckets_ms = tuple(buckets_ms or self.DEFAULT_BUCKETS_MS)
+        self._counts = [0] * (len(self.buckets_ms) + 1)  # last bucket is +inf
+        self._count = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Record one latency sample given in seconds"""
+        ms = seconds * 1000.0
+        index = len(self.buckets_ms)
+        for i, bound in enumerate(self.buckets_ms):
+            if ms <= bound:
+                index = i
+                break
+
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._total_ms += ms
+            if ms > self._max_ms:
+                self._max_ms = ms
+
+    def percentile(self, q: float) -> float:
+        """
+        Upper bound of the bucket containing the q-th percentile (0-100),
+        capped at the largest sample so it never exceeds max_ms.
+        """
+        with self._lock:
+            if self._count == 0:
+                return 0.0
+            target = self._count * q / 100.0
+            seen = 0
+            for i, count in enumerate(self._counts):
+                seen += count
+                if seen >= target:
+                    return min(float(self.buckets_ms[i]), self._max_ms) if i < len(self.buckets_ms) else self._max_ms
+            return self._max_ms
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            count = self._count
+            buckets = {f"le_{bound}ms": n for bound, n in zip(self.buckets_ms, self._counts)}
+            buckets["inf"] = self._counts[-1]
+            avg_ms = self._total_ms / count if count else 0.0
+            max_ms = self._max_ms
+
+        return {
+            "count": count,
+            "avg_ms": round(avg_ms, 3),
+            "max_ms": round(max_ms, 3),
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "buckets": buckets
+        }
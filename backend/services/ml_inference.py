@@ -5,6 +5,8 @@ from typing import Dict, List, Tuple
 from datetime import datetime
 import json
 
+from services.feature_registry import INFERENCE_FEATURES
+
 class MLInference:
     """ML Model inference engine for threat detection"""
 
@@ -15,6 +17,7 @@ class MLInference:
         self.scaler = None
         self.model_loaded = False
         self.model_info = {}
+        self.schema = INFERENCE_FEATURES
 
     def load_models(self, model_dir: str = None) -> bool:
         """Load trained models from disk"""
@@ -47,6 +50,11 @@ class MLInference:
                     print(f"Loaded scaler: {f}")
             
             if self.rf_model and self.scaler:
+                # Models must have been fitted on the current feature schema
+                for label, model in (("scaler", self.scaler), ("rf_model", self.rf_model), ("gb_model", self.gb_model)):
+                    if model is not None:
+                        self.schema.validate(model, label)
+                
                 self.model_loaded = True
                 print("Models loaded successfully")
                 return True
@@ -60,67 +68,54 @@ class MLInference:
 
     def extract_features_from_network(self, network: Dict, known_networks: List[Dict] = None) -> np.ndarray:
         """Extract ML features from network data"""
+        return self.extract_features([network], known_networks)[0]
+
+    def extract_features(self, networks: List[Dict], known_networks: List[Dict] = None) -> np.ndarray:
+        """Feature matrix (float32, INFERENCE_FEATURES order) for several networks"""
+        return self.schema.build(networks, context=known_networks or [])
+
+    def _threat_level(self, score: float) -> str:
+        if score > 0.7:
+            return "critical"
+        elif score > 0.5:
+            return "high"
+        elif score > 0.3:
+            return "medium"
+        return "low"
+
+    def _predict_networks(self, networks: List[Dict], known_networks: List[Dict] = None) -> List[Dict]:
+        """Score all networks with one scaler / model call per model"""
+        features = self.extract_features(networks, known_networks)
         
-        signal_strength = network.get("signal_strength", -80)
-        
-        # Channel variance (simplified - in real scenario would track over time)
-        channel_variance = 0 if network.get("channel") else 10
-        
-        # Encryption type to numeric (0=Open, 1=WEP, 2=WPA, 3=WPA2)
-        encryption_map = {"Open": 0, "WEP": 1, "WPA": 2, "WPA2": 3}
-        encryption_type = encryption_map.get(network.get("encryption", "Open"), 0)
-        
-        # Vendor consistency check
-        known_vendors = {"Apple": 0.95, "Linksys": 0.85, "TP-Link": 0.80, "Unknown": 0.40}
-        vendor = network.get("vendor", "Unknown")
-        vendor_consistency = known_vendors.get(vendor, 0.5)
-        
-        # Behavior anomaly (placeholder)
-        behavior_anomaly = 0.2 if network.get("is_hidden") else 0.1
-        
-        # Traffic pattern anomaly (based on client count)
-        client_count = network.get("client_count", 0)
-        traffic_pattern = 0.7 if client_count > 30 else (0.4 if client_count > 10 else 0.1)
-        
-        # Client count ratio
-        client_count_feature = min(client_count / 50, 1.0)
-        
-        # SSID similarity to known networks
-        ssid_similarity = 0.0
-        if known_networks:
-            ssid = network.get("ssid", "")
-            for known in known_networks:
-                known_ssid = known.get("ssid", "")
-                if ssid and known_ssid:
-                    similarity = self._string_similarity(ssid, known_ssid)
-                    ssid_similarity = max(ssid_similarity, similarity)
-        
-        features = np.array([
-            signal_strength,
-            channel_variance,
-            encryption_type,
-            vendor_consistency,
-            behavior_anomaly,
-            traffic_pattern,
-            client_count_feature,
-            ssid_similarity
-        ])
+        # Scale features
+        features_scaled = self.scaler.transform(features)
         
-        return features
-
-    def _string_similarity(self, s1: str, s2: str) -> float:
-        """Calculate string similarity (Levenshtein-based)"""
-        if not s1 or not s2:
-            return 0.0
+        # Get predictions from both models
+        rf_scores = self.rf_model.predict_proba(features_scaled)[:, 1]
+        gb_scores = self.gb_model.predict_proba(features_scaled)[:, 1] if self.gb_model else rf_scores
         
-        # Simple similarity metric
-        matches = sum(1 for a, b in zip(s1, s2) if a == b)
-        max_len = max(len(s1), len(s2))
+        # Ensemble vote
+        ensemble_scores = (rf_scores + gb_scores) / 2
+        timestamp = datetime.utcnow().isoformat()
         
-        if max_len == 0:
-            return 0.0
+        results = []
+        for network, rf_threat_score, gb_threat_score, ensemble_threat_score in zip(
+                networks, rf_scores, gb_scores, ensemble_scores):
+            results.append({
+                "bssid": network.get("bssid"),
+                "ssid": network.get("ssid"),
+                "threat_level": self._threat_level(ensemble_threat_score),
+                "confidence_score": float(ensemble_threat_score),
+                "model_scores": {
+                    "random_forest": float(rf_threat_score),
+                    "gradient_boosting": float(gb_threat_score),
+                    "ensemble": float(ensemble_threat_score)
+                },
+                "is_threat": bool(ensemble_threat_score > 0.5),
+                "timestamp": timestamp
+            })
         
-        return matches / max_len
+        return results
 
     def predict_single_network(self, network: Dict, known_networks: List[Dict] = None) -> Dict:
         """Predict if a single network is an evil twin"""
@@ -132,44 +127,7 @@ class MLInference:
             }
         
         try:
-            # Extract features
-            features = self.extract_features_from_network(network, known_networks)
-            
-            # Scale features
-            features_scaled = self.scaler.transform([features])[0]
-            
-            # Get predictions from both models
-            rf_pred_proba = self.rf_model.predict_proba([features_scaled])[0]
-            gb_pred_proba = self.gb_model.predict_proba([features_scaled])[0] if self.gb_model else rf_pred_proba
-            
-            # Ensemble vote
-            rf_threat_score = rf_pred_proba[1]
-            gb_threat_score = gb_pred_proba[1]
-            ensemble_threat_score = (rf_threat_score + gb_threat_score) / 2
-            
-            # Determine threat level
-            if ensemble_threat_score > 0.7:
-                threat_level = "critical"
-            elif ensemble_threat_score > 0.5:
-                threat_level = "high"
-            elif ensemble_threat_score > 0.3:
-                threat_level = "medium"
-            else:
-                threat_level = "low"
-            
-            return {
-                "bssid": network.get("bssid"),
-                "ssid": network.get("ssid"),
-                "threat_level": threat_level,
-                "confidence_score": float(ensemble_threat_score),
-                "model_scores": {
-                    "random_forest": float(rf_threat_score),
-                    "gradient_boosting": float(gb_threat_score),
-                    "ensemble": float(ensemble_threat_score)
-                },
-                "is_threat": ensemble_threat_score > 0.5,
-                "timestamp": datetime.utcnow().isoformat()
-            }
+            return self._predict_networks([network], known_networks)[0]
         
         except Exception as e:
             return {
@@ -193,8 +151,17 @@ class MLInference:
             "timestamp": datetime.utcnow().isoformat()
         }
         
-        for network in networks:
-            pred = self.predict_single_network(network, known_networks)
+        if not self.model_loaded:
+            predictions["predictions"] = [self.predict_single_network(network) for network in networks]
+            return predictions
+        
+        try:
+            results = self._predict_networks(networks, known_networks) if networks else []
+        except Exception:
+            # Isolate the failing network(s)
+            results = [self.predict_single_network(network, known_networks) for network in networks]
+        
+        for pred in results:
             predictions["predictions"].append(pred)
             
             if not pred.get("error"):
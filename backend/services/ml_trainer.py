@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import Dict, Tuple, List
 import json
 
+from services.feature_registry import INFERENCE_FEATURES
+
 class MLTrainer:
     """ML Model training and evaluation"""
 
@@ -123,12 +125,7 @@ class MLTrainer:
         }
         
         # Feature importance
-        feature_names = [
-            'signal_strength', 'channel_variance', 'encryption_type',
-            'vendor_consistency', 'behavior_anomaly', 'traffic_pattern',
-            'client_count', 'ssid_similarity'
-        ]
-        feature_importance = dict(zip(feature_names, model.feature_importances_))
+        feature_importance = dict(zip(INFERENCE_FEATURES.names, model.feature_importances_))
         
         return {
             "model": model,
@@ -168,12 +165,7 @@ class MLTrainer:
         }
         
         # Feature importance
-        feature_names = [
-            'signal_strength', 'channel_variance', 'encryption_type',
-            'vendor_consistency', 'behavior_anomaly', 'traffic_pattern',
-            'client_count', 'ssid_similarity'
-        ]
-        feature_importance = dict(zip(feature_names, model.feature_importances_))
+        feature_importance = dict(zip(INFERENCE_FEATURES.names, model.feature_importances_))
         
         return {
             "model": model,
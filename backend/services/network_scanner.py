@@ -1,6 +1,6 @@
 import scapy.all as scapy
 from scapy.arch import get_if_hwaddr, get_if_list
-from scapy.layers.dot11 import Dot11, Dot11Beacon, Dot11ProbeReq, Dot11ProbeResp
+from scapy.layers.dot11 import Dot11, Dot11Beacon, Dot11Elt, Dot11ProbeReq, Dot11ProbeResp
 import threading
 import time
 from datetime import datetime
@@ -11,15 +11,29 @@ import platform
 import struct
 import socket
 
+from config import Config
+from services.async_scan import run_command_sync
+from services.client_tracker import ClientTracker
+from services.oui_lookup import lookup_vendor
+
 class NetworkScanner:
     """Real network scanner using Scapy for WiFi/802.11 networks"""
 
-    def __init__(self, interface=None):
+    SNIFFER_START_TIMEOUT = 5  # seconds for AsyncSniffer to open its sockets
+
+    def __init__(self, interface=None, approximate_clients: bool = None, max_tracked_bssids: int = None):
         self.interface = interface
         self.networks = {}
         self.scanning = False
-        self.clients = {}
+        self.clients = ClientTracker(
+            max_bssids=max_tracked_bssids or Config.MAX_TRACKED_BSSIDS,
+            approximate=Config.CLIENT_TRACKING_APPROXIMATE if approximate_clients is None else approximate_clients,
+            exact_limit=Config.CLIENT_EXACT_LIMIT,
+            precision=Config.CLIENT_HLL_PRECISION
+        )
         self.packets_captured = 0
+        # Optional LiveScanBuffer receiving incremental deltas
+        self.delta_listener = None
 
     def get_available_interfaces(self) -> List[str]:
         """Get available network interfaces"""
@@ -35,13 +49,13 @@ class NetworkScanner:
         try:
             if sys.platform == 'linux' or sys.platform == 'linux2':
                 # Check for monitor mode on Linux
-                result = subprocess.run(['iwconfig'], capture_output=True, text=True)
+                result = run_command_sync(['iwconfig'], timeout=5)
                 for line in result.stdout.split('\n'):
                     if 'Monitor' in line:
                         return line.split()[0]
             elif sys.platform == 'darwin':
                 # macOS
-                result = subprocess.run(['ifconfig'], capture_output=True, text=True)
+                result = run_command_sync(['ifconfig'], timeout=5)
                 for line in result.stdout.split('\n'):
                     if 'monitor' in line.lower():
                         return line.split()[0]
@@ -116,23 +130,8 @@ class NetworkScanner:
         return "Open"
 
     def _get_vendor_from_mac(self, mac: str) -> str:
-        """Get vendor from MAC address (simplified OUI lookup)"""
-        oui_map = {
-            "00:05:4E": "Linksys",
-            "00:0B:85": "Netgear",
-            "00:1A:2B": "Apple",
-            "00:1E:E5": "TP-Link",
-            "00:25:5A": "Apple",
-            "00:50:F2": "Microsoft",
-            "08:55:31": "Huawei",
-            "14:CC:20": "Xiaomi",
-            "28:E0:2C": "ASUS",
-        }
-        mac_prefix = mac[:8].upper()
-        for prefix, vendor in oui_map.items():
-            if mac_prefix.startswith(prefix):
-                return vendor
-        return "Unknown"
+        """Get vendor from MAC address (IEEE registry lookup)"""
+        return lookup_vendor(mac)
 
     def packet_handler(self, packet):
         """Handle captured packets"""
@@ -143,23 +142,73 @@ class NetworkScanner:
             if packet.haslayer(Dot11Beacon):
                 network_info = self.parse_beacon(packet)
                 if network_info:
-                    bssid = network_info["bssid"]
-                    if bssid not in self.networks:
-                        self.networks[bssid] = network_info
-                        self.networks[bssid]["client_count"] = 0
-                    self.networks[bssid]["signal_strength"] = network_info["signal_strength"]
+                    self.update_network(network_info)
             
             # Track clients (Data frames from stations)
             elif packet.haslayer(Dot11) and packet[Dot11].type == 2:
                 src = packet[Dot11].addr2
-                dst = packet[Dot11].addr1
                 bssid = packet[Dot11].addr3
-                
-                if bssid not in self.clients:
-                    self.clients[bssid] = set()
-                self.clients[bssid].add(src)
+                self.track_client(bssid, src)
+
+    def update_network(self, network_info: Dict):
+        """Merge a parsed beacon into the network table"""
+        bssid = network_info["bssid"]
+        listener = self.delta_listener
+        if bssid not in self.networks:
+            self.networks[bssid] = network_info
+            self.networks[bssid]["client_count"] = 0
+            if listener:
+                listener.network_added(network_info)
+        elif listener and self.networks[bssid]["signal_strength"] != network_info["signal_strength"]:
+            listener.rssi_updated(bssid, network_info["signal_strength"])
+        self.networks[bssid]["signal_strength"] = network_info["signal_strength"]
+
+    def track_client(self, bssid: str, station: str):
+        """Record a station seen on a BSSID"""
+        if bssid and station:
+            if self.clients.add(bssid, station) and self.delta_listener:
+                self.delta_listener.client_changed(bssid)
+
+    def capture(self, interface: str, duration: int, stop_event: threading.Event = None, prn=None):
+        """
+        Capture on `interface` until `duration` elapses or `stop_event` is set.
+
+        Uses AsyncSniffer so a cancellation stops capture immediately instead
+        of waiting for the sniff timeout. `prn` defaults to packet_handler.
+        """
+        if stop_event is None:
+            stop_event = threading.Event()
 
-    def start_scan(self, interface: str = None, duration: int = 30, channels: List[int] = None):
+        sniffer = scapy.AsyncSniffer(
+            iface=interface,
+            prn=prn or self.packet_handler,
+            store=False,
+            # Backstops should stop() ever be missed
+            timeout=duration,
+            stop_filter=lambda _: stop_event.is_set()
+        )
+        sniffer.start()
+
+        deadline = time.monotonic() + duration
+        while sniffer.thread.is_alive():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or stop_event.wait(min(remaining, 0.1)):
+                break
+
+        # `running` is only set once the capture loop has opened its
+        # sockets; a cancel that came earlier still has to stop it
+        ready_by = time.monotonic() + self.SNIFFER_START_TIMEOUT
+        while sniffer.thread.is_alive() and not sniffer.running and time.monotonic() < ready_by:
+            time.sleep(0.01)
+
+        if sniffer.running:
+            sniffer.stop(join=False)
+
+        # Re-raises capture errors (e.g. PermissionError)
+        sniffer.join(timeout=1)
+
+    def start_scan(self, interface: str = None, duration: int = 30, channels: List[int] = None,
+                   stop_event: threading.Event = None):
         """Start passive WiFi scan"""
         if interface is None:
             interface = self.interface
@@ -168,7 +217,7 @@ class NetworkScanner:
             raise ValueError("No interface specified")
         
         self.networks = {}
-        self.clients = {}
+        self.clients.clear()
         self.packets_captured = 0
         self.scanning = True
         
@@ -180,12 +229,7 @@ class NetworkScanner:
                 channels = list(range(1, 14))  # WiFi channels 1-13 (valid worldwide)
             
             # Simple passive scan without channel hopping
-            scapy.sniff(
-                iface=interface,
-                prn=self.packet_handler,
-                timeout=duration,
-                store=False
-            )
+            self.capture(interface, duration, stop_event)
             
             self.scanning = False
             print(f"Scan completed. Found {len(self.networks)} networks.")
@@ -199,11 +243,15 @@ class NetworkScanner:
         
         return self.get_results()
 
-    def start_active_scan(self, interface: str = None, duration: int = 15):
+    def start_active_scan(self, interface: str = None, duration: int = 15,
+                          stop_event: threading.Event = None):
         """Start active WiFi scan with probe requests"""
         if interface is None:
             interface = self.interface
         
+        if stop_event is None:
+            stop_event = threading.Event()
+        
         self.networks = {}
         self.scanning = True
         
@@ -219,21 +267,16 @@ class NetworkScanner:
             
             def send_probes():
                 start_time = time.time()
-                while time.time() - start_time < duration:
+                while time.time() - start_time < duration and not stop_event.is_set():
                     scapy.send(probe_req, iface=interface, verbose=False)
-                    time.sleep(1)
+                    stop_event.wait(1)
             
             # Send probes in background
             probe_thread = threading.Thread(target=send_probes, daemon=True)
             probe_thread.start()
             
             # Capture responses
-            scapy.sniff(
-                iface=interface,
-                prn=self.packet_handler,
-                timeout=duration,
-                store=False
-            )
+            self.capture(interface, duration, stop_event)
             
             self.scanning = False
             
@@ -249,14 +292,18 @@ class NetworkScanner:
             "networks": [],
             "clients": {},
             "total_packets": self.packets_captured,
+            "client_tracking": self.clients.get_stats(),
             "timestamp": datetime.utcnow().isoformat()
         }
         
         for bssid, network_info in self.networks.items():
             network_data = network_info.copy()
-            network_data["client_count"] = len(self.clients.get(bssid, set()))
+            network_data["client_count"] = self.clients.count(bssid)
+            network_data["client_count_error"] = self.clients.error_bound(bssid)
+            network_data["client_count_exact"] = self.clients.is_exact(bssid)
             results["networks"].append(network_data)
-            results["clients"][bssid] = list(self.clients.get(bssid, set()))
+            # Station lists are only kept for exact counters
+            results["clients"][bssid] = self.clients.stations(bssid)
         
         return results
 
@@ -0,0 +1,214 @@
+"""
+Vendor Lookup
+Shared MAC address -> vendor resolution for every scanner and feature extractor.
+
+Loads the IEEE registries from local CSV exports into sorted integer
+arrays, one per assignment size:
+- MA-L (oui.csv):    24-bit prefixes
+- MA-M (mam.csv):    28-bit prefixes
+- MA-S (oui36.csv):  36-bit prefixes
+
+Lookups try the longest prefix first with a binary search, and results
+are memoized per MAC. When no registry files are present a small
+built-in table is used instead.
+
+Registry exports: https://standards-oui.ieee.org/ (oui/oui.csv,
+oui28/mam.csv, oui36/oui36.csv). Place them in Config.OUI_REGISTRY_DIR.
+"""
+
+import csv
+import functools
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from config import Config
+
+UNKNOWN_VENDOR = "Unknown"
+
+# Registry file -> prefix length in bits
+REGISTRY_FILES = {
+    "oui.csv": 24,
+    "mam.csv": 28,
+    "oui36.csv": 36,
+}
+
+# Used when the IEEE registry has not been downloaded
+BUILTIN_OUIS = {
+    "00:05:4E": "Linksys",
+    "00:0B:85": "Netgear",
+    "00:0C:29": "VMware",
+    "00:1A:2B": "Apple",
+    "00:1B:63": "Apple",
+    "00:1E:E5": "TP-Link",
+    "00:23:6C": "Apple",
+    "00:25:5A": "Apple",
+    "00:50:56": "VMware",
+    "00:50:F2": "Microsoft",
+    "08:00:27": "VirtualBox",
+    "08:55:31": "Huawei",
+    "14:CC:20": "Xiaomi",
+    "28:E0:2C": "Asus",
+    "52:54:00": "QEMU",
+}
+
+# Registry organisation names -> short brand names used by trust scores
+BRAND_ALIASES = [
+    ("apple", "Apple"),
+    ("cisco", "Cisco"),
+    ("linksys", "Linksys"),
+    ("tp-link", "TP-Link"),
+    ("netgear", "Netgear"),
+    ("asustek", "Asus"),
+    ("d-link", "D-Link"),
+    ("belkin", "Belkin"),
+    ("ubiquiti", "Ubiquiti"),
+    ("huawei", "Huawei"),
+    ("xiaomi", "Xiaomi"),
+    ("microsoft", "Microsoft"),
+    ("vmware", "VMware"),
+]
+
+
+def normalize_vendor(name: str) -> str:
+    """Map a registry organisation name onto its short brand name"""
+    lowered = name.lower()
+    for keyword, brand in BRAND_ALIASES:
+        if keyword in lowered:
+            return brand
+    return name.strip()
+
+
+def mac_to_int(mac: str) -> Optional[tuple]:
+    """
+    Parse a MAC (or MAC prefix) into (value, bits).
+
+    Accepts ':', '-' or '.' separators and prefixes such as 'AA:BB:CC'.
+    """
+    if not mac:
+        return None
+
+    digits = "".join(c for c in mac if c not in ":-. ")
+    if not digits or len(digits) > 12:
+        return None
+
+    try:
+        return int(digits, 16), len(digits) * 4
+    except ValueError:
+        return None
+
+
+class VendorLookup:
+    """Longest-prefix vendor index over 24/28/36-bit assignments"""
+
+    def __init__(self, registry_dir: str = None, cache_size: int = 4096):
+        self.vendors: List[str] = []
+        self._vendor_ids: Dict[str, int] = {}
+        # prefix bits -> (sorted prefixes, vendor id per prefix)
+        self._tables: Dict[int, tuple] = {}
+        self.registry_loaded = False
+
+        if registry_dir and os.path.isdir(registry_dir):
+            self.registry_loaded = self._load_registry(registry_dir)
+
+        if not self.registry_loaded:
+            self._build_tables({24: [
+                (mac_to_int(prefix)[0], vendor) for prefix, vendor in BUILTIN_OUIS.items()
+            ]})
+
+        # Memoized per MAC/BSSID
+        self.lookup = functools.lru_cache(maxsize=cache_size)(self._lookup)
+
+    def _load_registry(self, registry_dir: str) -> bool:
+        entries: Dict[int, list] = {}
+
+        for filename, bits in REGISTRY_FILES.items():
+            path = os.path.join(registry_dir, filename)
+            if not os.path.exists(path):
+                continue
+
+            with open(path, newline="", encoding="utf-8", errors="replace") as f:
+                reader = csv.reader(f)
+                next(reader, None)  # header
+                for row in reader:
+                    if len(row) < 3:
+                        continue
+                    try:
+                        prefix = int(row[1].strip(), 16)
+                    except ValueError:
+                        continue
+                    entries.setdefault(bits, []).append((prefix, normalize_vendor(row[2])))
+
+        if not entries:
+            return False
+
+        self._build_tables(entries)
+        print(f"[VendorLookup] Loaded {sum(len(v) for v in entries.values())} registry assignments")
+        return True
+
+    def _build_tables(self, entries: Dict[int, list]):
+        for bits, rows in entries.items():
+            rows.sort()
+            prefixes = array("Q")
+            vendor_ids = array("I")
+            for prefix, vendor in rows:
+                prefixes.append(prefix)
+                vendor_ids.append(self._vendor_id(vendor))
+            self._tables[bits] = (prefixes, vendor_ids)
+
+    def _vendor_id(self, vendor: str) -> int:
+        vendor_id = self._vendor_ids.get(vendor)
+        if vendor_id is None:
+            vendor_id = len(self.vendors)
+            self.vendors.append(vendor)
+            self._vendor_ids[vendor] = vendor_id
+        return vendor_id
+
+    def _lookup(self, mac: str) -> str:
+        parsed = mac_to_int(mac)
+        if parsed is None:
+            return UNKNOWN_VENDOR
+        value, available_bits = parsed
+
+        # Longest (most specific) assignment wins
+        for bits in sorted(self._tables, reverse=True):
+            if bits > available_bits:
+                continue
+            prefixes, vendor_ids = self._tables[bits]
+            key = value >> (available_bits - bits)
+            i = bisect_left(prefixes, key)
+            if i < len(prefixes) and prefixes[i] == key:
+                return self.vendors[vendor_ids[i]]
+
+        return UNKNOWN_VENDOR
+
+    def get_stats(self) -> Dict:
+        cache = self.lookup.cache_info()
+        return {
+            "registry_loaded": self.registry_loaded,
+            "assignments": {bits: len(table[0]) for bits, table in self._tables.items()},
+            "vendors": len(self.vendors),
+            "cache_hits": cache.hits,
+            "cache_misses": cache.misses
+        }
+
+
+_lookup_instance: Optional[VendorLookup] = None
+_lookup_lock = threading.Lock()
+
+
+def get_vendor_lookup() -> VendorLookup:
+    """Shared VendorLookup loaded from Config.OUI_REGISTRY_DIR"""
+    global _lookup_instance
+    if _lookup_instance is None:
+        with _lookup_lock:
+            if _lookup_instance is None:
+                _lookup_instance = VendorLookup(Config.OUI_REGISTRY_DIR)
+    return _lookup_instance
+
+
+def lookup_vendor(mac: str) -> str:
+    """Vendor name for a MAC address or prefix"""
+    return get_vendor_lookup().lookup(mac)
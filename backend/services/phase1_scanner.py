@@ -2,54 +2,120 @@
 Phase 1: Passive Baseline Collection
 -----------------------------------
 This service is responsible ONLY for collecting raw Wi-Fi scan data
-using Windows netsh and storing it in MongoDB.
+using the host's scan tool (netsh on Windows, iw/nmcli on Linux)
+and storing it in MongoDB.
 
 STRICT RULES:
 - No ML
 - No anomaly detection
 - No labeling
 - No aggregation
-- Append-only storage
+- Append-only storage: raw_scans documents are inserted, never updated;
+  in delta mode (raw_scan_buckets) observations are appended to hourly
+  bucket documents with upserted $push updates, never rewritten
 """
 
-import subprocess
+import queue
 import threading
 import time
-from datetime import datetime
 from typing import List, Dict, Optional
 
+from config import Config
 from models.database import Database
+from services.adaptive_interval import AdaptiveIntervalController
+from services.ingestion_buffer import IngestionBuffer
+from services.metrics import LatencyHistogram
+from services.scan_backends import scan_all, select_backend
+from services.scan_buckets import ScanBucketWriter
+from services.scan_normalizer import normalize_record
 
 
 class Phase1Scanner:
     """
     Phase 1 Scanner
-    Runs passive Wi-Fi scans using netsh and stores raw results.
+    Runs passive Wi-Fi scans using a scan backend and stores raw results.
     """
 
-    def __init__(self, interval: int = 20):
+    def __init__(self, interval: int = 20, backend: str = None, interface: str = None,
+                 adaptive: bool = None, interfaces: List[str] = None):
         """
-        :param interval: Scan interval in seconds
+        :param interval: Scan interval in seconds (starting value when adaptive)
+        :param backend: Force a scan backend ("netsh", "iw", "nmcli"); auto-detected if None
+        :param interface: Wireless interface for Linux backends
+        :param adaptive: Adapt the interval to the environment change rate
+        :param interfaces: Scan several interfaces concurrently (Linux backends)
         """
         self.interval = interval
         self.running = False
         self.thread: Optional[threading.Thread] = None
+        self.persist_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        # Scan stage -> persistence stage; a slow DB never delays the next scan
+        self.queue: queue.Queue = queue.Queue(maxsize=Config.PHASE1_QUEUE_SIZE)
+
+        # Per-stage latency
+        self.scan_latency = LatencyHistogram()
+        self.parse_latency = LatencyHistogram()
+        self.persist_latency = LatencyHistogram()
+        self.schedule_lag = LatencyHistogram()
+        self.scans_completed = 0
+        self.scans_dropped = 0
+        self.missed_ticks = 0
+
+        if adaptive is None:
+            adaptive = Config.PHASE1_ADAPTIVE_INTERVAL
+        self.controller: Optional[AdaptiveIntervalController] = None
+        if adaptive:
+            self.controller = AdaptiveIntervalController(
+                Config.PHASE1_MIN_INTERVAL,
+                Config.PHASE1_MAX_INTERVAL,
+                initial=interval
+            )
+            self.interval = self.controller.interval
+
+        # Chosen once; the scan loop never re-detects
+        backend_name = backend or Config.PHASE1_SCAN_BACKEND
+        self.backends = [select_backend(name, backend_name) for name in (interfaces or [interface])]
+        self.backend = self.backends[0]
+        print(f"[Phase1Scanner] Using {self.backend.name} scan backend")
 
         self.db = Database.get_db()
         self.collection = self.db["raw_scans"]
 
+        # Batches inserts into unordered insert_many calls
+        self.buffer = IngestionBuffer(
+            self.collection,
+            max_batch=Config.INGEST_BATCH_SIZE,
+            max_age=Config.INGEST_MAX_AGE,
+            max_pending=Config.INGEST_MAX_PENDING,
+            policy=Config.INGEST_BACKPRESSURE
+        )
+
+        # Delta mode: hourly per-BSSID buckets instead of one document per scan
+        self.bucket_writer: Optional[ScanBucketWriter] = None
+        if Config.RAW_SCAN_STORAGE_MODE == "delta":
+            self.bucket_writer = ScanBucketWriter(
+                self.db["raw_scan_buckets"],
+                max_pending=Config.INGEST_MAX_PENDING
+            )
+
     # -------------------------
     # Core control methods
     # -------------------------
 
     def start(self):
         """
-        Start the background scanning loop.
+        Start the background scanning and persistence stages.
         """
         if self.running:
             return
 
         self.running = True
+        self._stop_event.clear()
+        self.buffer.start()
+        self.persist_thread = threading.Thread(target=self._persist_loop, daemon=True)
+        self.persist_thread.start()
         self.thread = threading.Thread(target=self._scan_loop, daemon=True)
         self.thread.start()
 
@@ -58,36 +124,113 @@ class Phase1Scanner:
         Stop the background scanning loop.
         """
         self.running = False
+        self._stop_event.set()
         if self.thread:
             self.thread.join(timeout=5)
 
+        # Persistence stage drains the queue before exiting
+        if self.persist_thread:
+            self.persist_thread.join(timeout=5)
+
+        # Write out whatever is still buffered
+        self.buffer.stop()
+        if self.bucket_writer is not None:
+            self.bucket_writer.flush()
+
     def is_running(self) -> bool:
         """
         Check whether the scanner is running.
         """
         return self.running
 
+    def get_metrics(self) -> Dict:
+        """
+        Scheduler, per-stage latency and ingestion metrics.
+        """
+        return {
+            "interval": self.interval,
+            "scans_completed": self.scans_completed,
+            "scans_dropped": self.scans_dropped,
+            "missed_ticks": self.missed_ticks,
+            "queue_depth": self.queue.qsize(),
+            "adaptive": self.controller.get_stats() if self.controller else None,
+            "stages": {
+                "schedule_lag": self.schedule_lag.snapshot(),
+                "scan": self.scan_latency.snapshot(),
+                "parse": self.parse_latency.snapshot(),
+                "persist": self.persist_latency.snapshot()
+            },
+            "ingestion": self.buffer.get_metrics(),
+            "buckets": self.bucket_writer.get_metrics() if self.bucket_writer else None
+        }
+
     # -------------------------
-    # Internal loop
+    # Internal loops
     # -------------------------
 
     def _scan_loop(self):
         """
-        Continuous scanning loop.
+        Scan stage: start a scan every `interval` seconds on a monotonic clock.
+
+        The period does not drift with scan or DB time. If a scan overruns
+        one or more ticks, the missed ticks are skipped instead of bursting.
         """
-        while self.running:
+        next_run = time.monotonic()
+
+        while not self._stop_event.wait(max(next_run - time.monotonic(), 0)):
+            started = time.monotonic()
+            self.schedule_lag.observe(started - next_run)
+
             try:
                 raw_output = self.scan()
+                parsed_at = time.monotonic()
+                self.scan_latency.observe(parsed_at - started)
+
                 parsed_records = self.parse_output(raw_output)
+                self.parse_latency.observe(time.monotonic() - parsed_at)
+                self.scans_completed += 1
 
-                for record in parsed_records:
-                    self.save_scan(record)
+                if self.controller is not None:
+                    self.interval = self.controller.update(parsed_records)
+
+                try:
+                    self.queue.put_nowait(parsed_records)
+                except queue.Full:
+                    self.scans_dropped += 1
+                    print("[Phase1Scanner] Persistence queue full, dropping scan")
 
             except Exception as e:
                 # Phase 1 must NEVER crash the system
                 print(f"[Phase1Scanner] Error: {e}")
 
-            time.sleep(self.interval)
+            next_run += self.interval
+            now = time.monotonic()
+            if next_run < now:
+                skipped = int((now - next_run) // self.interval) + 1
+                self.missed_ticks += skipped
+                next_run += skipped * self.interval
+
+    def _persist_loop(self):
+        """
+        Persistence stage: hand parsed scans to the ingestion buffer.
+        """
+        while True:
+            try:
+                parsed_records = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    return
+                continue
+
+            started = time.monotonic()
+            try:
+                for record in parsed_records:
+                    self.save_scan(record)
+                if self.bucket_writer is not None:
+                    self.bucket_writer.flush()
+            except Exception as e:
+                print(f"[Phase1Scanner] Persist error: {e}")
+            self.persist_latency.observe(time.monotonic() - started)
 
     # -------------------------
     # Scanning & parsing
@@ -95,94 +238,53 @@ class Phase1Scanner:
 
     def scan(self) -> str:
         """
-        Run netsh command and return raw output as string.
-        """
-        command = ["netsh", "wlan", "show", "networks", "mode=bssid"]
+        Run the backend scan command and return raw output as string.
 
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            shell=False
-        )
+        With several interfaces the scans run concurrently and their
+        outputs are concatenated (every backend format is block based).
+        """
+        if len(self.backends) == 1:
+            return self.backend.scan()
 
-        return result.stdout
+        outputs = []
+        for backend, output in zip(self.backends, scan_all(self.backends)):
+            if isinstance(output, Exception):
+                print(f"[Phase1Scanner] Scan failed on {backend.interface}: {output}")
+                continue
+            outputs.append(output)
+        return "\n".join(outputs)
 
     def parse_output(self, output: str) -> List[Dict]:
         """
-        Parse raw netsh output into structured records.
+        Parse raw backend output into structured records.
 
         IMPORTANT:
         - Parsing only
         - No interpretation
         - No scoring
         """
-        records: List[Dict] = []
-        current_ssid: Optional[str] = None
-
-        lines = output.splitlines()
-        timestamp = datetime.utcnow().isoformat()
-
-        for line in lines:
-            line = line.strip()
-
-            if line.startswith("SSID"):
-                parts = line.split(":", 1)
-                current_ssid = parts[1].strip() if len(parts) > 1 else ""
-
-            elif line.startswith("BSSID"):
-                # Start a new BSSID record
-                parts = line.split(":", 1)
-                bssid = parts[1].strip()
-
-                record = {
-                    "ssid": current_ssid,
-                    "bssid": bssid,
-                    "timestamp": timestamp,
-                }
-
-                records.append(record)
-
-            elif records:
-                # Attach fields to the most recent BSSID
-                last = records[-1]
-
-                if line.startswith("Signal"):
-                    last["signal"] = line.split(":", 1)[1].strip()
-
-                elif line.startswith("Channel"):
-                    last["channel"] = line.split(":", 1)[1].strip()
-
-                elif line.startswith("Band"):
-                    last["band"] = line.split(":", 1)[1].strip()
-
-                elif line.startswith("Authentication"):
-                    last["authentication"] = line.split(":", 1)[1].strip()
-
-                elif line.startswith("Encryption"):
-                    last["encryption"] = line.split(":", 1)[1].strip()
-
-                elif line.startswith("Radio type"):
-                    last["radio_type"] = line.split(":", 1)[1].strip()
-
-                elif line.startswith("Connected Stations"):
-                    last["connected_stations"] = line.split(":", 1)[1].strip()
-
-                elif line.startswith("Channel Utilization"):
-                    last["channel_utilization"] = line.split(":", 1)[1].strip()
-
-        return records
+        return self.backend.parse(output)
 
     # -------------------------
     # Persistence
     # -------------------------
 
     def save_scan(self, data: Dict):
-        """+
-        Save raw scan record to MongoDB.
+        """
+        Queue raw scan record for insertion into MongoDB.
+
+        Typed numeric fields are added next to the raw text, then
+        records are written in batches by the ingestion buffer, or
+        appended to hourly buckets in delta storage mode.
 
         RULE:
-        - Insert only
-        - Never update
+        - raw_scans: insert only, never update
+        - raw_scan_buckets (delta mode): upsert the (ssid, bssid, hour)
+          bucket and $push the observation; stored samples are never
+          modified or removed
         """
-        self.collection.insert_one(data)
+        record = normalize_record(data)
+        if self.bucket_writer is not None:
+            self.bucket_writer.add(record)
+        else:
+            self.buffer.add(record)
@@ -5,21 +5,57 @@ This service transforms raw time-series Wi-Fi scan data
 into aggregated behavioral feature vectors.
 
 STRICT RULES:
-- Input: raw_scans only
+- Input: raw_scans / raw_scan_buckets only
 - Output: features_baseline only
 - No ML
 - No anomaly detection
 - No threat labeling
 - No confidence scoring
+
+Sharded mode (Config.PHASE2_WORKERS > 1): (ssid, bssid) keys are
+partitioned by crc32 into shards, each shard runs in a process pool
+worker with its own DB connection and bulk writer, and the SSID reuse
+counts (ssid_bssid_count) are merged in a reduce step.
 """
 
-from collections import defaultdict
+import multiprocessing
+import time
+import zlib
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, List, Set, Tuple
 
 import numpy as np
+from pymongo import UpdateMany, UpdateOne
 
+from config import Config
 from models.database import Database
+from services.baseline_windows import BaselineWindows, key_queries
+from services.feature_cache import bump_baseline_revision
+from services.oui_lookup import lookup_vendor
+from services.quantile_sketch import BASELINE_QUANTILES, TDigest, quantile_field
+from services.scan_buckets import STATE_FIELDS, bucket_columns
+from services.scan_normalizer import TYPED_FIELDS
+
+SKETCH_PROJECTION = {"_id": 0, "ssid": 1, "bssid": 1, "sketch_until": 1, "signal_sketch": 1, "client_sketch": 1}
+
+
+def shard_of(ssid: str, bssid: str, shards: int) -> int:
+    """Stable shard of a key (hash() differs between processes)"""
+    return zlib.crc32(f"{ssid}\x00{bssid}".encode("utf-8", "surrogatepass")) % shards
+
+
+def partition_keys(keys: Iterable[Tuple[str, str]], shards: int) -> List[List[Tuple[str, str]]]:
+    partitions = [[] for _ in range(shards)]
+    for ssid, bssid in keys:
+        partitions[shard_of(ssid, bssid, shards)].append((ssid, bssid))
+    return partitions
+
+
+def _run_shard(shard: int, keys: List[Tuple[str, str]], now: datetime) -> Dict:
+    """Process pool entry point; connects to MongoDB in the worker"""
+    return Phase2FeatureExtractor().run_shard(shard, keys, now)
 
 
 class Phase2FeatureExtractor:
@@ -31,46 +67,235 @@ class Phase2FeatureExtractor:
     def __init__(self):
         self.db = Database.get_db()
         self.raw_collection = self.db["raw_scans"]
+        self.bucket_collection = self.db["raw_scan_buckets"]
         self.features_collection = self.db["features_baseline"]
+        self.windows = BaselineWindows(self.db)
 
     # -------------------------
     # Public entry point
     # -------------------------
 
-    def run(self):
+    def run(self, workers: int = None):
         """
         Main entry point for Phase 2 feature extraction.
+
+        :param workers: Worker processes; > 1 runs sharded (Config.PHASE2_WORKERS)
         """
+        workers = Config.PHASE2_WORKERS if workers is None else workers
+
         # Safety Check: Do not run if no raw data exists
-        if self.raw_collection.count_documents({}) == 0:
+        if self.raw_collection.count_documents({}) == 0 and self.bucket_collection.count_documents({}) == 0:
             print("[Phase2] Warning: No raw scans found. Aborting baseline generation.")
             return
 
+        if self.raw_collection.count_documents({"observed_at": {"$exists": False}}, limit=1):
+            print("[Phase2] Warning: raw_scans without typed fields found; run migrate_raw_scans_typed.py")
+
+        # Recent behavior: refresh partials since the watermark; they are
+        # merged per window instead of rescanning raw data
+        now = datetime.utcnow()
+        written = self.windows.update_partials(now)
+        print(f"[Phase2] {written} partial aggregates updated")
+
+        if workers > 1:
+            self.run_sharded(workers, now=now)
+        else:
+            self.run_single(now)
+
+        # Cached feature matrices built from older baselines are now stale
+        revision = bump_baseline_revision(self.db)
+        print(f"[Phase2] features_baseline revision {revision}")
+
+    def run_single(self, now: datetime = None):
+        """
+        Build every baseline in this process.
+        """
+        now = now or datetime.utcnow()
         scans = self.load_raw_scans()
         grouped = self.process_data(scans)
 
+        columns = {}
+        for key, observations in grouped.items():
+            columns[key] = self._new_columns()
+            self.add_observations(columns[key], observations)
+
+        # Delta-encoded storage (raw_scan_buckets) is read bucket by bucket
+        for bucket in self.load_buckets():
+            key = (bucket.get("ssid"), bucket.get("bssid"))
+            if not key[0] or not key[1]:
+                continue
+            if key not in columns:
+                columns[key] = self._new_columns()
+            self.add_bucket(columns[key], bucket)
+
+        window_stats = self.windows.compute(now)
+        sketches = self.update_sketches(set(columns), now)
+        print(f"[Phase2] {len(window_stats)} networks with recent data")
+
         # Pre-calculate SSID reuse counts (how many BSSIDs per SSID)
         ssid_counts = defaultdict(int)
-        for (ssid, bssid) in grouped.keys():
+        for (ssid, bssid) in columns.keys():
             ssid_counts[ssid] += 1
 
-        for key, observations in grouped.items():
-            ssid = key[0]
+        for (ssid, bssid), key_columns in columns.items():
             count = ssid_counts[ssid]
-            features = self.calculate_features(observations, ssid_bssid_count=count)
+            features = self.features_from_columns(ssid, bssid, key_columns, ssid_bssid_count=count)
+            features.update(window_stats.get((ssid, bssid)) or self.windows.empty_stats())
+            features.update(sketches.get((ssid, bssid), {}))
             self.save_features(features)
 
+    # -------------------------
+    # Sharded execution
+    # -------------------------
+
+    def list_keys(self) -> Set[Tuple[str, str]]:
+        """
+        Distinct (ssid, bssid) keys across both raw stores.
+        """
+        pipeline = [{"$group": {"_id": {"ssid": "$ssid", "bssid": "$bssid"}}}]
+        keys = set()
+        for collection in (self.raw_collection, self.bucket_collection):
+            for doc in collection.aggregate(pipeline, allowDiskUse=True):
+                ssid, bssid = doc["_id"].get("ssid"), doc["_id"].get("bssid")
+                if ssid and bssid:
+                    keys.add((ssid, bssid))
+        return keys
+
+    def run_sharded(self, workers: int, shards: int = None, now: datetime = None) -> List[Dict]:
+        """
+        Map shards over a process pool, then reduce the SSID reuse counts.
+
+        :param shards: Key partitions; Config.PHASE2_SHARDS or one per worker
+        :return: Per-shard results (see run_shard), ordered by shard
+        """
+        shards = shards or Config.PHASE2_SHARDS or workers
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+
+        keys = self.list_keys()
+        partitions = partition_keys(keys, shards)
+        print(f"[Phase2] {len(keys)} keys in {shards} shards, {workers} workers")
+
+        results = []
+        # spawn: MongoClient is not fork-safe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, shards), mp_context=context) as pool:
+            futures = [
+                pool.submit(_run_shard, shard, shard_keys, now)
+                for shard, shard_keys in enumerate(partitions) if shard_keys
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                print(
+                    f"[Phase2] Shard {result['shard']}: {result['keys']} keys in {result['seconds']:.2f}s "
+                    f"(load {result['load_seconds']:.2f}s, compute {result['compute_seconds']:.2f}s, "
+                    f"write {result['write_seconds']:.2f}s)"
+                )
+
+        totals = self.reduce_ssid_counts(results)
+        print(f"[Phase2] Sharded run: {sum(totals.values())} baselines, "
+              f"{len(totals)} SSIDs in {time.perf_counter() - started:.2f}s")
+        return sorted(results, key=lambda result: result["shard"])
+
+    def run_shard(self, shard: int, keys: List[Tuple[str, str]], now: datetime) -> Dict:
+        """
+        Build and bulk-write the baselines of one shard's keys.
+
+        ssid_bssid_count is left to reduce_ssid_counts, since an SSID's
+        BSSIDs are spread over shards.
+        """
+        started = time.perf_counter()
+        wanted = set(keys)
+        columns = {}
+
+        for query, owned in key_queries(keys):
+            grouped = self.process_data(self.load_raw_scans(query))
+            for key, observations in grouped.items():
+                if key in owned:
+                    self.add_observations(columns.setdefault(key, self._new_columns()), observations)
+
+            for bucket in self.load_buckets(query):
+                key = (bucket.get("ssid"), bucket.get("bssid"))
+                if key in owned:
+                    self.add_bucket(columns.setdefault(key, self._new_columns()), bucket)
+
+        window_stats = self.windows.compute(now, keys=wanted)
+        sketches = self.update_sketches(wanted, now)
+        loaded = time.perf_counter()
+
+        ssid_counts = Counter()
+        operations = []
+        write_seconds = 0.0
+        for (ssid, bssid), key_columns in columns.items():
+            features = self.features_from_columns(ssid, bssid, key_columns)
+            del features["ssid_bssid_count"]
+            features.update(window_stats.get((ssid, bssid)) or self.windows.empty_stats())
+            features.update(sketches.get((ssid, bssid), {}))
+            operations.append(UpdateOne({"ssid": ssid, "bssid": bssid}, {"$set": features}, upsert=True))
+            ssid_counts[ssid] += 1
+
+            if len(operations) >= Config.PHASE2_WRITE_BATCH:
+                write_seconds += self._bulk_write(operations)
+                operations = []
+
+        if operations:
+            write_seconds += self._bulk_write(operations)
+
+        total = time.perf_counter() - started
+        return {
+            "shard": shard,
+            "keys": len(columns),
+            "ssid_counts": dict(ssid_counts),
+            "load_seconds": loaded - started,
+            "compute_seconds": total - (loaded - started) - write_seconds,
+            "write_seconds": write_seconds,
+            "seconds": total
+        }
+
+    def reduce_ssid_counts(self, results: List[Dict]) -> Counter:
+        """
+        Merge per-shard SSID counts and write ssid_bssid_count.
+        """
+        totals = Counter()
+        for result in results:
+            totals.update(result["ssid_counts"])
+
+        operations = [
+            UpdateMany({"ssid": ssid}, {"$set": {"ssid_bssid_count": count}})
+            for ssid, count in totals.items()
+        ]
+        for i in range(0, len(operations), Config.PHASE2_WRITE_BATCH):
+            self._bulk_write(operations[i:i + Config.PHASE2_WRITE_BATCH])
+        return totals
+
+    def _bulk_write(self, operations: List) -> float:
+        started = time.perf_counter()
+        self.features_collection.bulk_write(operations, ordered=False)
+        return time.perf_counter() - started
+
     # -------------------------
     # Data loading
     # -------------------------
 
-    def load_raw_scans(self) -> List[Dict]:
+    def load_raw_scans(self, query: Dict = None) -> List[Dict]:
         """
-        Load all raw scan documents from MongoDB.
+        Load the typed fields of all raw scan documents from MongoDB.
 
         Phase 2 MUST NOT modify raw data.
         """
-        return list(self.raw_collection.find({}))
+        projection = {field: 1 for field in TYPED_FIELDS}
+        projection["_id"] = 0
+        return list(self.raw_collection.find(query or {}, projection))
+
+    def load_buckets(self, query: Dict = None):
+        """
+        Iterate delta-encoded scan buckets (see services.scan_buckets).
+        """
+        projection = {"_id": 0, "ssid": 1, "bssid": 1, "t": 1, "s": 1,
+                      "changes": 1, "first_seen": 1, "last_seen": 1}
+        projection.update({f"keyframe.{field}": 1 for field in STATE_FIELDS})
+        return self.bucket_collection.find(query or {}, projection)
 
     # -------------------------
     # Aggregation
@@ -102,45 +327,81 @@ class Phase2FeatureExtractor:
         """
         Calculate aggregated behavioral features for a single (ssid, bssid).
         """
+        columns = self._new_columns()
+        self.add_observations(columns, observations)
 
         ssid = observations[0].get("ssid")
         bssid = observations[0].get("bssid")
+        return self.features_from_columns(ssid, bssid, columns, ssid_bssid_count)
 
-        # Collect numeric fields and categories
-        signals = []
-        channels = []
-        client_counts = []
-        timestamps = []
-        encryptions = []
-        authentications = []
+    @staticmethod
+    def _new_columns() -> Dict:
+        return {
+            "signals": [],
+            "channels": [],
+            "client_counts": [],
+            "timestamps": [],
+            "encryptions": [],
+            "authentications": [],
+            "count": 0
+        }
 
+    @staticmethod
+    def add_observations(columns: Dict, observations: List[Dict]):
+        """
+        Collect numeric fields and categories from raw scan documents.
+        """
         for obs in observations:
-            if "signal" in obs:
-                try:
-                    signals.append(self._parse_int(obs["signal"]))
-                except ValueError:
-                    pass
-
-            if "channel" in obs:
-                try:
-                    channels.append(self._parse_int(obs["channel"]))
-                except ValueError:
-                    pass
-
-            if "connected_stations" in obs:
-                try:
-                    client_counts.append(self._parse_int(obs["connected_stations"]))
-                except ValueError:
-                    pass
-
-            if "timestamp" in obs:
-                timestamps.append(obs["timestamp"])
-            
+            if obs.get("signal_percent") is not None:
+                columns["signals"].append(obs["signal_percent"])
+
+            if obs.get("channel_number") is not None:
+                columns["channels"].append(obs["channel_number"])
+
+            if obs.get("stations_count") is not None:
+                columns["client_counts"].append(obs["stations_count"])
+
+            if obs.get("observed_at") is not None:
+                columns["timestamps"].append(obs["observed_at"])
+
             if "encryption" in obs:
-                encryptions.append(obs["encryption"])
-                
+                columns["encryptions"].append(obs["encryption"])
+
             if "authentication" in obs:
-                authentications.append(obs["authentication"])
+                columns["authentications"].append(obs["authentication"])
+
+        columns["count"] += len(observations)
+
+    @staticmethod
+    def add_bucket(columns: Dict, bucket: Dict):
+        """
+        Collect the same columns straight from a bucket's arrays.
+        """
+        expanded = bucket_columns(bucket)
+
+        columns["signals"].extend(s for s in expanded["signal_percent"] if s is not None)
+        columns["channels"].extend(c for c in expanded["channel_number"] if c is not None)
+        columns["client_counts"].extend(c for c in expanded["stations_count"] if c is not None)
+        columns["encryptions"].extend(e for e in expanded["encryption"] if e is not None)
+        columns["authentications"].extend(a for a in expanded["authentication"] if a is not None)
+
+        # Only min / max are used
+        for field in ("first_seen", "last_seen"):
+            if bucket.get(field) is not None:
+                columns["timestamps"].append(bucket[field])
+
+        columns["count"] += expanded["count"]
+
+    def features_from_columns(self, ssid: str, bssid: str, columns: Dict, ssid_bssid_count: int = 1) -> Dict:
+        """
+        Aggregate collected columns into the feature document.
+        """
+        signals = columns["signals"]
+        channels = columns["channels"]
+        client_counts = columns["client_counts"]
+        timestamps = columns["timestamps"]
+        encryptions = columns["encryptions"]
+        authentications = columns["authentications"]
 
         features = {
             "ssid": ssid,
@@ -162,12 +423,13 @@ class Phase2FeatureExtractor:
             "encryption": self._mode(encryptions),
             "authentication": self._mode(authentications),
             "vendor_oui": bssid[:8].upper() if bssid else None,
+            "vendor": lookup_vendor(bssid) if bssid else None,
             "ssid_bssid_count": ssid_bssid_count,
 
             # Time statistics
-            "first_seen": min(timestamps) if timestamps else None,
-            "last_seen": max(timestamps) if timestamps else None,
-            "observation_count": len(observations),
+            "first_seen": min(timestamps).isoformat() if timestamps else None,
+            "last_seen": max(timestamps).isoformat() if timestamps else None,
+            "observation_count": columns["count"],
 
             # Metadata
             "updated_at": datetime.utcnow().isoformat()
@@ -175,6 +437,56 @@ class Phase2FeatureExtractor:
 
         return features
 
+    def update_sketches(self, keys: Set[Tuple[str, str]], now: datetime) -> Dict[Tuple[str, str], Dict]:
+        """
+        Fold observations newer than each baseline's sketch_until into its
+        stored quantile sketches (signal_sketch, client_sketch).
+
+        Returns the sketch and percentile fields to $set per key.
+        """
+        # BSON dates keep milliseconds; a finer bound would re-read records
+        end = now - self.windows.lag
+        end = end.replace(microsecond=end.microsecond // 1000 * 1000)
+
+        stored = {}
+        for query, owned in key_queries(keys):
+            for doc in self.features_collection.find(query, SKETCH_PROJECTION):
+                key = (doc["ssid"], doc["bssid"])
+                if key in owned and doc.get("sketch_until"):
+                    stored[key] = doc
+
+        # New keys read their whole history, the others only what arrived
+        # since the oldest sketch_until
+        new_keys = keys - stored.keys()
+        since = min((doc["sketch_until"] for doc in stored.values()), default=None)
+        # Each key is read from the one chunk that owns it
+        sources = [(None, query, owned) for query, owned in key_queries(new_keys)]
+        sources += [(since, query, owned) for query, owned in key_queries(stored.keys())]
+
+        signals = defaultdict(list)
+        clients = defaultdict(list)
+        for start, query, owned in sources:
+            for obs in self.windows.observations(start, end, query):
+                key = (obs.get("ssid"), obs.get("bssid"))
+                if key not in owned:
+                    continue
+                if key in stored and obs["observed_at"] < stored[key]["sketch_until"]:
+                    continue
+                signals[key].append(obs.get("signal_percent"))
+                clients[key].append(obs.get("stations_count"))
+
+        updates = {key: {"sketch_until": end} for key in keys}
+        for key in new_keys | signals.keys():
+            doc = stored.get(key, {})
+            for metric, values in (("signal", signals[key]), ("client", clients[key])):
+                digest = TDigest.from_dict(doc.get(f"{metric}_sketch"))
+                digest.update(values)
+                updates[key][f"{metric}_sketch"] = digest.to_dict()
+                for q in BASELINE_QUANTILES:
+                    updates[key][quantile_field(metric, q)] = digest.quantile(q)
+
+        return updates
+
     # -------------------------
     # Persistence
     # -------------------------
@@ -202,13 +514,6 @@ class Phase2FeatureExtractor:
     # Utility helpers
     # -------------------------
 
-    @staticmethod
-    def _parse_int(value: str) -> int:
-        """
-        Extract integer from strings like '87%' or 'Channel: 36'.
-        """
-        return int("".join(filter(str.isdigit, value)))
-
     @staticmethod
     def _mode(values: List):
         """
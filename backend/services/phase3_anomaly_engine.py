@@ -15,10 +15,87 @@ STRICT RULES:
 - No blocking/alerting (Phase 4)
 """
 
-from typing import Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from itertools import groupby, islice
+from typing import Dict, Iterable, Iterator, List, Optional
 import numpy as np
+from bson import ObjectId
 from sklearn.ensemble import IsolationForest
+from config import Config
 from models.database import Database
+from services.anomaly_signals import compact_signal
+from services.feature_cache import baseline_key, get_baseline_revision, get_feature_cache
+from services.feature_registry import BASELINE_FEATURES
+from services.anomaly_rules import RULE_FIELDS, decode, evaluate_masks, layer_mask
+from services.ssid_context import (MEMBERS_FIELD, SUMMARY_BSSID, SUMMARY_FIELDS, SSIDContextIndex,
+                                   summary_rows)
+
+# Stored with compact signals; bump when the Isolation Forest setup changes
+ML_MODEL_VERSION = "iforest-1"
+
+# Chunked mode reads only what the rules and the Isolation Forest use
+BASELINE_PROJECTION = {"_id": 0, **{field: 1 for field in RULE_FIELDS + BASELINE_FEATURES.names}}
+FEATURE_PROJECTION = {"_id": 0, **{field: 1 for field in BASELINE_FEATURES.names}}
+
+
+def chunk_by_ssid(baselines: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """
+    Chunks of whole SSIDs from an SSID-sorted stream, each closed once it
+    holds at least `size` baselines, so none exceeds 2 * size - 1. An SSID
+    with more than `size` BSSIDs gets chunks of its own of at most `size`;
+    the cross-network rules then see the rest of it through the SSID's
+    summary rows (Phase3AnomalyEngine.load_ssid_summaries).
+    """
+    chunk = []
+    for _, group in groupby(baselines, key=lambda doc: doc.get("ssid")):
+        head = list(islice(group, size + 1))
+        if len(head) <= size:
+            chunk.extend(head)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+            continue
+
+        if chunk:
+            yield chunk
+        yield head[:size]
+        chunk = head[size:]
+        for doc in group:
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+            chunk.append(doc)
+        yield chunk
+        chunk = []
+    if chunk:
+        yield chunk
+
+
+def reservoir_sample(matrices: Iterable[np.ndarray], size: int, seed: int = 42) -> np.ndarray:
+    """
+    Uniform sample of up to `size` rows from a stream of matrices
+    (Algorithm R); every row is kept, in stream order, while fewer arrive.
+    """
+    rng = np.random.default_rng(seed)
+    reservoir = None
+    seen = 0
+    for matrix in matrices:
+        if reservoir is None:
+            reservoir = np.empty((size, matrix.shape[1]), dtype=matrix.dtype)
+
+        fill = min(max(size - seen, 0), len(matrix))
+        reservoir[seen:seen + fill] = matrix[:fill]
+
+        # Row i of the stream replaces a random slot with probability size / (i + 1)
+        slots = rng.integers(0, np.arange(seen + fill, seen + len(matrix)) + 1)
+        for row in np.flatnonzero(slots < size):
+            reservoir[slots[row]] = matrix[fill + row]
+        seen += len(matrix)
+
+    if reservoir is None:
+        return np.empty((0, 0), dtype=np.float32)
+    return reservoir[:min(seen, size)]
 
 class Phase3AnomalyEngine:
     """
@@ -40,11 +117,16 @@ class Phase3AnomalyEngine:
         2. Apply Layer 1 (Signatures)
         3. Apply Layer 2 (Behavior)
         4. Apply Layer 3 (ML Isolation Forest)
-        5. Save all signals to anomaly_signals
+        5. Save all signals to anomaly_signals (Config.ANOMALY_SIGNAL_FORMAT)
         """
         print("[Phase 3] Starting Anomaly Detection Engine...")
         
-        # Load all baselines
+        # Load all baselines (revision first: a concurrent Phase 2 run bumps it afterwards)
+        revision = get_baseline_revision(self.db)
+        if Config.PHASE3_CHUNK_SIZE > 0:
+            self.run_chunked(revision)
+            return
+
         baselines = self.load_baselines()
         
         if not baselines:
@@ -54,12 +136,31 @@ class Phase3AnomalyEngine:
         print(f"[Phase 3] Analyzing {len(baselines)} network baselines...")
         
         # Layer 3: Run ML Isolation Forest on all baselines
-        ml_results = self.run_isolation_forest(baselines)
+        ml_results = self.run_isolation_forest(baselines, revision)
+
+        # Layers 1 & 2: every rule as one vector expression over all baselines
+        masks = self.apply_rules(baselines)
         
-        # Process each baseline
+        if Config.ANOMALY_SIGNAL_FORMAT == "compact":
+            signals_to_save = self.build_compact_signals(baselines, masks, ml_results, revision)
+        else:
+            signals_to_save = self.build_layered_signals(baselines, masks, ml_results)
+        
+        # Save all signals
+        self.save_anomaly_signals(signals_to_save)
+        
+        print(f"[Phase 3] Completed. {len(signals_to_save)} signals generated.")
+
+    def build_layered_signals(self, baselines: List[Dict], masks: np.ndarray, ml_results: Dict) -> List[Dict]:
+        """
+        Layered format: signature, behavior and ml documents per network.
+
+        Each rule document carries only its own layer's bits in rule_mask.
+        """
         signals_to_save = []
+        signature_bits, behavior_bits = layer_mask("signature"), layer_mask("behavior")
         
-        for baseline in baselines:
+        for baseline, mask in zip(baselines, masks):
             ssid = baseline.get("ssid")
             bssid = baseline.get("bssid")
             
@@ -67,16 +168,22 @@ class Phase3AnomalyEngine:
                 continue
             
             # Layer 1: Signature Rules
-            signature_signals = self.apply_signature_rules(baseline)
-            signature_signals["ssid"] = ssid
-            signature_signals["bssid"] = bssid
-            signals_to_save.append(signature_signals)
+            signals_to_save.append({
+                "layer": "signature",
+                "signals": decode(int(mask), "signature"),
+                "rule_mask": int(mask) & signature_bits,
+                "ssid": ssid,
+                "bssid": bssid
+            })
             
             # Layer 2: Behavior Rules
-            behavior_signals = self.apply_behavior_rules(baseline)
-            behavior_signals["ssid"] = ssid
-            behavior_signals["bssid"] = bssid
-            signals_to_save.append(behavior_signals)
+            signals_to_save.append({
+                "layer": "behavior",
+                "signals": decode(int(mask), "behavior"),
+                "rule_mask": int(mask) & behavior_bits,
+                "ssid": ssid,
+                "bssid": bssid
+            })
             
             # Layer 3: ML Results
             ml_signal = ml_results.get((ssid, bssid))
@@ -84,11 +191,32 @@ class Phase3AnomalyEngine:
                 ml_signal["ssid"] = ssid
                 ml_signal["bssid"] = bssid
                 signals_to_save.append(ml_signal)
-        
-        # Save all signals
-        self.save_anomaly_signals(signals_to_save)
-        
-        print(f"[Phase 3] Completed. {len(signals_to_save)} signals generated.")
+
+        return signals_to_save
+
+    def build_compact_signals(self, baselines: List[Dict], masks: np.ndarray, ml_results: Dict,
+                              revision: int = 0, run_id: ObjectId = None, ts: datetime = None) -> List[Dict]:
+        """
+        Compact format: one document per network holding all three layers
+        (see services.anomaly_signals). Chunks of one run share run_id and ts.
+        """
+        run_id = run_id or ObjectId()
+        ts = ts or datetime.utcnow()
+        model_version = f"{ML_MODEL_VERSION}@{baseline_key(revision)}"
+
+        signals_to_save = []
+        for baseline, mask in zip(baselines, masks):
+            ssid = baseline.get("ssid")
+            bssid = baseline.get("bssid")
+
+            if not ssid or not bssid:
+                continue
+
+            ml_signal = ml_results.get((ssid, bssid))
+            ml_score = ml_signal["anomaly_score"] if ml_signal else None
+            signals_to_save.append(compact_signal(ssid, bssid, mask, ml_score, model_version, run_id, ts))
+
+        return signals_to_save
 
     def load_baselines(self) -> List[Dict]:
         """
@@ -96,41 +224,29 @@ class Phase3AnomalyEngine:
         """
         return list(self.features_collection.find({}))
 
-    def run_isolation_forest(self, baselines: List[Dict]) -> Dict[str, Dict]:
+    def run_isolation_forest(self, baselines: List[Dict], revision: int = 0) -> Dict[str, Dict]:
         """
         Layer 3: Unsupervised ML Anomaly Detection.
         - Train Isolation Forest on current baselines
         - Return anomaly scores for each (ssid, bssid)
+
+        With a baseline revision (bumped by every Phase 2 run) the feature
+        matrix is memory-mapped from the feature cache when already built.
         """
         if not baselines:
             return {}
 
-        # 1. Prepare Feature Matrix
-        # Features: [avg_signal, signal_variance, channel_variance, client_count_avg, client_count_max, observation_count]
-        feature_matrix = []
-        keys = [] # To map back to (ssid, bssid)
-
-        for doc in baselines:
-            # Safely extract numeric features, defaulting to 0 or appropriate neutral value if missing
-            features = [
-                doc.get("avg_signal", -100),           # Default weak signal
-                doc.get("signal_variance", 0),
-                doc.get("channel_variance", 0),
-                doc.get("client_count_avg", 0),
-                doc.get("client_count_max", 0),
-                doc.get("observation_count", 0)
-            ]
-            
-            # Handle possible None values explicitly
-            features = [f if f is not None else 0 for f in features]
-            
-            feature_matrix.append(features)
-            keys.append((doc.get("ssid"), doc.get("bssid")))
-
-        if not feature_matrix:
-            return {}
-
-        X = np.array(feature_matrix)
+        # 1. Prepare Feature Matrix (BASELINE_FEATURES: avg_signal, signal_variance,
+        # channel_variance, client_count_avg, client_count_max, observation_count;
+        # missing fields default to a weak signal / 0, None values to 0)
+        if revision:
+            X, cached_keys = get_feature_cache().get_or_build(
+                BASELINE_FEATURES, baseline_key(revision), lambda: baselines
+            )
+            keys = [(str(ssid), str(bssid)) for ssid, bssid in cached_keys] # To map back to (ssid, bssid)
+        else:
+            X = BASELINE_FEATURES.build(baselines)
+            keys = [(doc.get("ssid"), doc.get("bssid")) for doc in baselines] # To map back to (ssid, bssid)
 
         # 2. Train Isolation Forest
         # contamination='auto' allows the model to determine the threshold
@@ -164,60 +280,174 @@ class Phase3AnomalyEngine:
 
         return results
 
-    def apply_signature_rules(self, baseline: Dict) -> Dict:
+    def run_chunked(self, revision: int = 0, chunk_size: int = None, sample_size: int = None,
+                    workers: int = None):
         """
-        Layer 1: Deterministic checks.
-        - SSID reuse
-        - Encryption downgrade
-        - Vendor inconsistency
-        - Channel instability
+        Streaming variant of run() for very large baseline sets.
+
+        1. Fit the Isolation Forest on a reservoir sample of the features
+        2. Summarize the SSIDs too large for one chunk (one aggregate)
+        3. Stream baselines (projection, SSID order) in chunks (chunk_by_ssid)
+        4. Score and apply the rules per chunk on a thread pool
+        5. Save each chunk's signals as soon as it completes
+
+        At most 2 * workers chunks of under 2 * chunk_size baselines are
+        held in memory, plus the summaries of the large SSIDs.
+        """
+        chunk_size = chunk_size or Config.PHASE3_CHUNK_SIZE
+        workers = max(1, workers or Config.PHASE3_WORKERS)
+
+        model = self.fit_sampled_forest(revision, sample_size or Config.PHASE3_SAMPLE_SIZE, chunk_size)
+        if model is None:
+            print("[Phase 3] No baselines found. Nothing to analyze.")
+            return
+
+        summaries = self.load_ssid_summaries(chunk_size)
+        run_id, ts = ObjectId(), datetime.utcnow()
+        cursor = (self.features_collection.find({}, BASELINE_PROJECTION)
+                  .sort([("ssid", 1), ("bssid", 1)]).batch_size(chunk_size))
+
+        networks = saved = chunks = 0
+        pending = set()
+
+        def save(done):
+            nonlocal saved, chunks
+            for future in done:
+                signals = future.result()
+                self.save_anomaly_signals(signals)
+                saved += len(signals)
+                chunks += 1
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for chunk in chunk_by_ssid(cursor, chunk_size):
+                networks += len(chunk)
+                pending.add(pool.submit(self.score_chunk, model, chunk, revision, run_id, ts, summaries))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    save(done)
+            save(wait(pending).done)
+
+        print(f"[Phase 3] Completed. {saved} signals generated for {networks} baselines in {chunks} chunks.")
+
+    def load_ssid_summaries(self, chunk_size: int) -> Dict[str, List[Dict]]:
+        """
+        Summary rows (services.ssid_context) of every SSID with more than
+        `chunk_size` baselines: one per distinct vendor / channel / security
+        combination with its BSSID count and earliest first_seen.
         """
-        signals = {
-            "ssid_reuse": False,
-            "encryption_weak": False,
-            "vendor_mismatch": False,
-            "channel_instability": False
+        large = [
+            doc["_id"] for doc in self.features_collection.aggregate([
+                {"$group": {"_id": "$ssid", "members": {"$sum": 1}}},
+                {"$match": {"members": {"$gt": chunk_size}, "_id": {"$nin": [None, ""]}}}
+            ], allowDiskUse=True)
+        ]
+        if not large:
+            return {}
+
+        summaries = {}
+        for doc in self.features_collection.aggregate([
+            {"$match": {"ssid": {"$in": large}, "bssid": {"$nin": [None, ""]}}},
+            {"$group": {
+                "_id": {"ssid": "$ssid", **{field: f"${field}" for field in SUMMARY_FIELDS}},
+                MEMBERS_FIELD: {"$sum": 1},
+                "first_seen": {"$min": {"$ifNull": ["$first_seen", ""]}}
+            }}
+        ], allowDiskUse=True):
+            key = doc["_id"]
+            summaries.setdefault(key["ssid"], []).append({
+                "ssid": key["ssid"],
+                "bssid": SUMMARY_BSSID,
+                **{field: key.get(field) for field in SUMMARY_FIELDS},
+                "first_seen": doc["first_seen"],
+                MEMBERS_FIELD: doc[MEMBERS_FIELD]
+            })
+
+        print(f"[Phase 3] {len(large)} SSIDs larger than a chunk; splitting with per-SSID summaries")
+        return summaries
+
+    def fit_sampled_forest(self, revision: int, sample_size: int, chunk_size: int) -> Optional[IsolationForest]:
+        """
+        Isolation Forest fitted on up to `sample_size` baselines.
+
+        Rows come from the cached feature matrix of this revision when
+        present (memory-mapped), otherwise from one pass over the features
+        only. Each tree sees 256 rows either way ('auto' max_samples).
+        """
+        cached = get_feature_cache().get(BASELINE_FEATURES, baseline_key(revision)) if revision else None
+        if cached is not None:
+            matrix = cached[0]
+            rows = np.arange(len(matrix))
+            if len(rows) > sample_size:
+                rows = np.sort(np.random.default_rng(42).choice(len(matrix), sample_size, replace=False))
+            X = np.asarray(matrix[rows])
+        else:
+            cursor = (self.features_collection.find({}, FEATURE_PROJECTION)
+                      .sort([("ssid", 1), ("bssid", 1)]).batch_size(chunk_size))
+            X = reservoir_sample(
+                (BASELINE_FEATURES.build(chunk) for chunk in chunk_by_ssid(cursor, chunk_size)), sample_size
+            )
+
+        if not len(X):
+            return None
+
+        print(f"[Phase 3] Fitting Isolation Forest on {len(X)} sampled baselines")
+        iso_forest = IsolationForest(contamination='auto', random_state=42, n_jobs=-1)
+        iso_forest.fit(X)
+        return iso_forest
+
+    def score_chunk(self, model: IsolationForest, baselines: List[Dict], revision: int = 0,
+                    run_id: ObjectId = None, ts: datetime = None,
+                    summaries: Optional[Dict[str, List[Dict]]] = None) -> List[Dict]:
+        """
+        All three layers for one chunk; returns its anomaly_signals documents.
+        predict() is -1 exactly where decision_function < 0. `summaries`
+        (load_ssid_summaries) stand in for BSSIDs of split SSIDs that are
+        in other chunks.
+        """
+        scores = model.decision_function(BASELINE_FEATURES.build(baselines))
+        ml_results = {
+            (doc.get("ssid"), doc.get("bssid")): {
+                "layer": "ml",
+                "anomaly_score": float(score),
+                "is_outlier": bool(score < 0)
+            }
+            for doc, score in zip(baselines, scores)
         }
 
-        # 1. SSID Reuse Rule
-        # Using pre-calculated count if available from Phase 2, or default to 1
-        ssid_count = baseline.get("ssid_bssid_count", 1)
-        if ssid_count > 2:
-            signals["ssid_reuse"] = True
-
-        # 2. Encryption Weakness Rule
-        encryption = baseline.get("encryption", "Unknown")
-        if encryption and encryption in ["Open", "None", "WEP"]:
-            signals["encryption_weak"] = True
-
-        # 3. Vendor Inconsistency Rule
-        # This requires global context or a lookup. 
-        # For Layer 1 simple logic: if BSSID OUI doesn't match expected OUI for this SSID (future)
-        # For now, we rely on Phase 2 flagging multiple vendors if we had that logic.
-        # But wait, the rule says: "if ssid has multiple vendor_ouis".
-        # Since we receive ONE baseline, we can't see others.
-        # BUT, if we assume Phase 2 sets a flag, or we need to look it up.
-        # Given the constraint "Input: One baseline document", strict implementation 
-        # is only possible if the *baseline itself* contains evidence of mismatch.
-        # However, checking the Phase 2 update, we only stored `vendor_oui`.
-        # To strictly follow the "Input: One baseline" rule, we can't implement this 
-        # unless Phase 2 computed it. 
-        # Re-reading: "use lookup map built in Phase 2".
-        # I didn't build a lookup map in Phase 2.
-        # I will implement a placeholder or simple logic:
-        # If I can't check other baselines, I returns False. 
-        # BUT, `Phase3AnomalyEngine.run()` loads ALL baselines.
-        # So I can build the map in `run()` and pass it?
-        # The method signature is `apply_signature_rules(self, baseline: Dict)`.
-        # I will adhere to the signature. For now, False. 
-        # User said: "This rule requires: either vendor_oui in baseline or a lookup map built in Phase 2".
-        # I added `vendor_oui` to baseline. I did NOT build a lookup map.
-        pass 
-
-        # 4. Channel Instability Rule
-        channel_variance = baseline.get("channel_variance", 0)
-        if channel_variance and channel_variance > 10:
-            signals["channel_instability"] = True
+        context = []
+        if summaries:
+            for ssid, members in groupby(baselines, key=lambda doc: doc.get("ssid")):
+                if ssid in summaries:
+                    context.extend(summary_rows(summaries[ssid], list(members)))
+
+        masks = self.apply_rules(baselines, context)
+        if Config.ANOMALY_SIGNAL_FORMAT == "compact":
+            return self.build_compact_signals(baselines, masks, ml_results, revision, run_id, ts)
+        return self.build_layered_signals(baselines, masks, ml_results)
+
+    def apply_rules(self, baselines: List[Dict], summaries: Optional[List[Dict]] = None) -> np.ndarray:
+        """
+        Layers 1 & 2 for all baselines at once (see services.anomaly_rules).
+
+        Returns one int64 rule bitmask per baseline; `summaries` are context
+        rows for SSID members outside `baselines`.
+        """
+        return evaluate_masks(baselines, summaries)
+
+    def apply_signature_rules(self, baseline: Dict, context: Optional[SSIDContextIndex] = None) -> Dict:
+        """
+        Layer 1: Deterministic checks for a single baseline.
+        - SSID reuse
+        - Weak encryption
+        - Vendor inconsistency, encryption downgrade and channel
+          disagreement relative to sibling BSSIDs (requires context)
+        - Channel instability
+
+        The registry is evaluated over the baseline's SSID group, so the
+        cross-network rules see its siblings; alone, they never fire.
+        """
+        group, position = context.group(baseline) if context is not None else ([baseline], 0)
+        signals = decode(int(self.apply_rules(group)[position]), "signature")
 
         return {
             "layer": "signature",
@@ -226,48 +456,17 @@ class Phase3AnomalyEngine:
 
     def apply_behavior_rules(self, baseline: Dict) -> Dict:
         """
-        Layer 2: Statistical deviations.
+        Layer 2: Statistical deviations for a single baseline.
         - Signal variance spikes
         - Client count spikes
         - Unstable presence
+        - Wide signal spread (p5..p95 from the Phase 2 quantile sketch)
         """
-        signals = {
-            "signal_variance_high": False,
-            "client_spike": False,
-            "unstable_presence": False
-        }
-
-        # Constants (to be tuned later)
-        SIGNAL_VARIANCE_THRESHOLD = 15
-        MIN_OBSERVATIONS = 5
-
-        # 1. Signal Variance Spike
-        signal_variance = baseline.get("signal_variance")
-        if signal_variance is not None and signal_variance > SIGNAL_VARIANCE_THRESHOLD:
-            signals["signal_variance_high"] = True
-
-        # 2. Client Count Spike
-        client_avg = baseline.get("client_count_avg")
-        client_max = baseline.get("client_count_max")
-        
-        if client_avg is not None and client_max is not None:
-            # Guard against division by zero or low activity noise
-            if client_avg > 0:
-                if client_max > (client_avg * 2):
-                    signals["client_spike"] = True
-
-        # 3. Unstable Presence
-        observation_count = baseline.get("observation_count", 0)
-        if observation_count < MIN_OBSERVATIONS and signals["signal_variance_high"]:
-            signals["unstable_presence"] = True
-
         return {
             "layer": "behavior",
-            "signals": signals
+            "signals": decode(int(self.apply_rules([baseline])[0]), "behavior")
         }
 
-
-
     def save_anomaly_signals(self, signals: List[Dict]):
         """
         Save the combined output of all layers to `anomaly_signals`.
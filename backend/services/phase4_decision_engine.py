@@ -5,7 +5,7 @@ This service is the REASONING LAYER that aggregates multi-layer evidence
 from Phase 3 and produces final verdicts with confidence scores and explanations.
 
 STRICT RULES:
-- Input: anomaly_signals only (Phase 3 output)
+- Input: anomaly_signals only (Phase 3 output, layered or compact documents)
 - Output: threats (final verdicts) + detection_logs (audit trail)
 - No scanning, no feature extraction, no ML training
 - Pure policy-based reasoning
@@ -18,6 +18,8 @@ Architecture:
 from typing import Dict, List, Optional
 from datetime import datetime
 from models.database import Database
+from services.anomaly_rules import RULE_BITS, RULES, decode, layer_score
+from services.anomaly_signals import created_at, is_outlier
 
 
 class Phase4DecisionEngine:
@@ -54,12 +56,15 @@ class Phase4DecisionEngine:
         "ssid_reuse": "SSID reused across multiple BSSIDs",
         "encryption_weak": "Weak or no encryption detected",
         "vendor_mismatch": "Vendor OUI inconsistency detected",
+        "encryption_downgrade": "Weaker security than other access points of this SSID",
+        "channel_disagreement": "Channel differs from other access points of this SSID",
         "channel_instability": "Frequent channel changes observed",
         
         # Layer 2 - Behavior
         "signal_variance_high": "Unstable signal behavior observed",
         "client_spike": "Unusual client count spike detected",
         "unstable_presence": "Network appears and disappears frequently",
+        "signal_spread_wide": "Signal strength spread suggests multiple transmitters",
         
         # Layer 3 - ML
         "is_outlier": "ML model flagged this AP as anomalous"
@@ -87,23 +92,17 @@ class Phase4DecisionEngine:
         """
         print("[Phase 4] Starting Decision Engine...")
         
-        # Load all signals
+        # Load all signals (compact: latest document per network)
+        compact_signals = self.load_compact_signals()
         signals = self.load_anomaly_signals()
         
-        if not signals:
+        if not signals and not compact_signals:
             print("[Phase 4] No anomaly signals found. Nothing to decide.")
             return
         
-        print(f"[Phase 4] Processing {len(signals)} anomaly signals...")
+        print(f"[Phase 4] Processing {len(compact_signals)} compact and {len(signals)} layered anomaly signals...")
         
-        # Group signals by network
-        grouped_signals = self.group_signals_by_network(signals)
-        
-        # Process each network
-        decisions = []
-        for network_key, network_signals in grouped_signals.items():
-            decision = self.make_decision(network_key, network_signals)
-            decisions.append(decision)
+        decisions = self.make_decisions(compact_signals, signals)
         
         # Save all decisions
         self.save_decisions(decisions)
@@ -113,11 +112,51 @@ class Phase4DecisionEngine:
         # Log summary
         self.log_detection_summary(decisions)
 
+    def make_decisions(self, compact_signals: List[Dict], signals: List[Dict]) -> List[Dict]:
+        """
+        One decision per network, from whichever format Phase 3 wrote last.
+
+        A compact document is used unless the network has a layered
+        document inserted after its ts (e.g. ANOMALY_SIGNAL_FORMAT was
+        switched back to "layered"); compact signals are decided straight
+        from their masks.
+        """
+        grouped_signals = self.group_signals_by_network(signals)
+        decisions = []
+        
+        for record in compact_signals:
+            network_key = (record["ssid"], record["bssid"])
+            layered = grouped_signals.get(network_key)
+            if layered:
+                newest = max((t for t in map(created_at, layered) if t is not None), default=None)
+                if newest is not None and (record.get("ts") is None or newest > record["ts"]):
+                    continue
+            grouped_signals.pop(network_key, None)
+            decisions.append(self.make_compact_decision(record))
+        
+        # Layered networks without a newer compact signal
+        for network_key, network_signals in grouped_signals.items():
+            decisions.append(self.make_decision(network_key, network_signals))
+        
+        return decisions
+
     def load_anomaly_signals(self) -> List[Dict]:
         """
-        Fetch all anomaly signals from Phase 3 output.
+        Fetch all layered anomaly signals from Phase 3 output.
         """
-        return list(self.anomaly_collection.find({}))
+        return list(self.anomaly_collection.find({"layer": {"$exists": True}}))
+
+    def load_compact_signals(self) -> List[Dict]:
+        """
+        Fetch the newest compact anomaly signal of every network.
+        """
+        pipeline = [
+            {"$match": {"mask": {"$exists": True}}},
+            {"$sort": {"ts": 1}},
+            {"$group": {"_id": {"ssid": "$ssid", "bssid": "$bssid"}, "signal": {"$last": "$$ROOT"}}},
+            {"$replaceRoot": {"newRoot": "$signal"}}
+        ]
+        return list(self.anomaly_collection.aggregate(pipeline, allowDiskUse=True))
 
     def group_signals_by_network(self, signals: List[Dict]) -> Dict[tuple, List[Dict]]:
         """
@@ -159,15 +198,31 @@ class Phase4DecisionEngine:
         # Aggregate signals from all layers
         layer_scores = self.compute_layer_scores(signals)
         
+        # Generate human-readable explanation
+        explanation = self.generate_explanation(signals)
+        
+        return self.build_decision(ssid, bssid, layer_scores, explanation)
+
+    def make_compact_decision(self, record: Dict) -> Dict:
+        """
+        Decision for one compact signal document (rule bitmask + ML score),
+        read without expanding it into per-layer documents.
+        """
+        layer_scores = self.compute_mask_scores(record)
+        explanation = self.explain_mask(record)
+        return self.build_decision(record["ssid"], record["bssid"], layer_scores, explanation)
+
+    def build_decision(self, ssid: str, bssid: str, layer_scores: Dict[str, float],
+                       explanation: List[str]) -> Dict:
+        """
+        Confidence, verdict and threat level from layer scores.
+        """
         # Compute weighted confidence
         confidence = self.compute_confidence(layer_scores)
         
         # Determine verdict based on confidence
         verdict = self.determine_verdict(confidence)
         
-        # Generate human-readable explanation
-        explanation = self.generate_explanation(signals)
-        
         # Map to threat level
         threat_level = self.THREAT_LEVELS.get(verdict, "unknown")
         
@@ -203,18 +258,14 @@ class Phase4DecisionEngine:
             layer = signal.get("layer")
             
             if layer == "signature":
-                # Count TRUE signals in Layer 1
+                # Weigh TRUE signals in Layer 1 (anomaly_rules weights)
                 sig_signals = signal.get("signals", {})
-                true_count = sum(1 for v in sig_signals.values() if v is True)
-                total_count = len(sig_signals)
-                scores["signature"] = true_count / total_count if total_count > 0 else 0.0
+                scores["signature"] = layer_score(name for name, v in sig_signals.items() if v is True)
             
             elif layer == "behavior":
-                # Count TRUE signals in Layer 2
+                # Weigh TRUE signals in Layer 2
                 beh_signals = signal.get("signals", {})
-                true_count = sum(1 for v in beh_signals.values() if v is True)
-                total_count = len(beh_signals)
-                scores["behavior"] = true_count / total_count if total_count > 0 else 0.0
+                scores["behavior"] = layer_score(name for name, v in beh_signals.items() if v is True)
             
             elif layer == "ml":
                 # Binary: outlier or not
@@ -223,6 +274,31 @@ class Phase4DecisionEngine:
         
         return scores
 
+    def compute_mask_scores(self, record: Dict) -> Dict[str, float]:
+        """
+        Layer scores of a compact signal: weights of the layer's rules set
+        in the mask (see anomaly_rules.layer_score), ML 1.0 for outliers.
+        """
+        mask = int(record.get("mask", 0))
+        scores = {}
+        for layer in ("signature", "behavior"):
+            scores[layer] = layer_score(name for name, fired in decode(mask, layer).items() if fired)
+        scores["ml"] = 1.0 if is_outlier(record) else 0.0
+        return scores
+
+    def explain_mask(self, record: Dict) -> List[str]:
+        """
+        Explanations of a compact signal, in rule registry order.
+        """
+        mask = int(record.get("mask", 0))
+        explanations = [
+            self.SIGNAL_EXPLANATIONS[rule.name] for rule in RULES
+            if mask & RULE_BITS[rule.name] and rule.name in self.SIGNAL_EXPLANATIONS
+        ]
+        if is_outlier(record):
+            explanations.append(self.SIGNAL_EXPLANATIONS["is_outlier"])
+        return explanations
+
     def compute_confidence(self, layer_scores: Dict[str, float]) -> float:
         """
         Compute weighted confidence score from all layers.
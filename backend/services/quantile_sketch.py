@@ -0,0 +1,143 @@
+"""
+Quantile Sketches
+Mergeable t-digest for baseline percentiles (signal, client counts).
+
+A digest keeps about compression / 2 weighted centroids, small in the
+middle of the distribution and near-singletons in the tails (k1 scale
+function), so p5 / p95 stay accurate without keeping raw observations.
+Digests merge by concatenating centroids and recompressing, which is
+how Phase 2 folds new observations into the stored baseline sketch.
+
+Serialized form (features_baseline):
+
+    {"n": count, "min": ..., "max": ..., "compression": ...,
+     "centroids": <bytes: little-endian float32 (mean, weight) pairs>}
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from config import Config
+
+# Recompress once this many values per unit of compression are buffered
+BUFFER_FACTOR = 5
+
+# Percentiles stored next to each sketch, e.g. signal_p95
+BASELINE_QUANTILES = (0.05, 0.5, 0.95)
+
+
+class TDigest:
+    """Merging t-digest over float values"""
+
+    def __init__(self, compression: float = None):
+        self.compression = compression or Config.BASELINE_SKETCH_COMPRESSION
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+        self._buffered = 0
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum()) + sum(float(w.sum()) for _, w in self._buffer)
+
+    def update(self, values: Iterable[float]):
+        """Add observations; None / NaN values are skipped"""
+        values = np.fromiter((v for v in values if v is not None), dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self._add(values, np.ones(len(values)))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: "TDigest"):
+        if not other.count:
+            return
+        other._compress()
+        self._add(other.means, other.weights)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _add(self, means: np.ndarray, weights: np.ndarray):
+        self._buffer.append((means, weights))
+        self._buffered += len(means)
+        if self._buffered >= BUFFER_FACTOR * self.compression:
+            self._compress()
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means] + [m for m, _ in self._buffer])
+        weights = np.concatenate([self.weights] + [w for _, w in self._buffer])
+        self._buffer = []
+        self._buffered = 0
+
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        # Centroids whose midpoints fall in the same unit of k1(q) merge;
+        # k1 is steep near q = 0 and 1, so tail centroids stay small
+        total = weights.sum()
+        midpoints = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * midpoints - 1, -1.0, 1.0))
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        _, cluster = np.unique(cluster, return_inverse=True)
+
+        self.weights = np.bincount(cluster, weights=weights)
+        self.means = np.bincount(cluster, weights=weights * means) / self.weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0 <= q <= 1); None when empty"""
+        self._compress()
+        total = self.weights.sum()
+        if not total:
+            return None
+
+        # Interpolate between centroid centers, anchored at min / max
+        centers = np.cumsum(self.weights) - self.weights / 2
+        x = np.concatenate(([0.0], centers, [total]))
+        y = np.concatenate(([self.min], self.means, [self.max]))
+        return float(np.interp(min(max(q, 0.0), 1.0) * total, x, y))
+
+    def to_dict(self) -> Dict:
+        self._compress()
+        centroids = np.column_stack([self.means, self.weights]).astype("<f4")
+        return {
+            "n": float(self.weights.sum()),
+            "min": self.min if self.weights.size else None,
+            "max": self.max if self.weights.size else None,
+            "compression": self.compression,
+            "centroids": centroids.tobytes()
+        }
+
+    @classmethod
+    def from_dict(cls, doc: Optional[Dict]) -> "TDigest":
+        digest = cls(doc.get("compression") if doc else None)
+        if doc and doc.get("n"):
+            centroids = np.frombuffer(doc["centroids"], dtype="<f4").reshape(-1, 2).astype(np.float64)
+            digest.means, digest.weights = centroids[:, 0], centroids[:, 1]
+            digest.min, digest.max = doc["min"], doc["max"]
+        return digest
+
+
+def quantile_field(metric: str, q: float) -> str:
+    """('signal', 0.95) -> 'signal_p95'"""
+    return f"{metric}_p{round(q * 100)}"
+
+
+def baseline_quantile(baseline: Dict, metric: str, q: float) -> Optional[float]:
+    """
+    q-quantile of a baseline's `<metric>_sketch` ('signal' or 'client').
+
+    Stored percentiles (BASELINE_QUANTILES) are read directly; other
+    quantiles are computed from the sketch.
+    """
+    field = quantile_field(metric, q)
+    if field in baseline:
+        return baseline[field]
+    sketch = baseline.get(f"{metric}_sketch")
+    return TDigest.from_dict(sketch).quantile(q) if sketch else None
@@ -0,0 +1,237 @@
+"""
+Scan Backends
+Pluggable OS-specific Wi-Fi scan sources for Phase 1.
+
+Each backend runs one scan command and parses its text output into the
+Phase 1 raw record schema (netsh field names):
+
+    ssid, bssid, timestamp, signal ("87%"), channel, band,
+    authentication, encryption, radio_type,
+    connected_stations, channel_utilization
+
+Backends:
+- NetshBackend: Windows `netsh wlan show networks mode=bssid`
+- IwBackend:    Linux `iw dev <if> scan dump` (nl80211 scan cache)
+- NmcliBackend: Linux `nmcli -t -e yes ... dev wifi list` (terse output)
+- IwlistBackend: Linux `iwlist <if> scan` (wireless extensions)
+
+netsh / iw / iwlist text is tokenized by services.scan_parser.
+
+Commands run on the shared asyncio scan loop (services.async_scan);
+scan_all() scans several interfaces concurrently.
+
+Parsing only: no interpretation, no scoring.
+"""
+
+import asyncio
+import shutil
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+from services.async_scan import run_command, run_command_sync, run_sync
+from services.scan_parser import freq_to_band, parse_iw, parse_iwlist, parse_netsh
+
+
+def split_terse(line: str) -> List[str]:
+    """Split an `nmcli -t -e yes` line on unescaped ':'"""
+    if "\\" not in line:
+        return line.split(":")
+
+    # Park escaped characters on control codes nmcli never emits
+    line = line.replace("\\\\", "\x00").replace("\\:", "\x01")
+    return [
+        field.replace("\x01", ":").replace("\x00", "\\")
+        for field in line.split(":")
+    ]
+
+
+class ScanBackend:
+    """Base class: run a scan command, parse its output"""
+
+    name = "base"
+    timeout = 30
+
+    def __init__(self, interface: str = None):
+        self.interface = interface
+
+    @classmethod
+    def available(cls) -> bool:
+        return False
+
+    def command(self) -> List[str]:
+        raise NotImplementedError
+
+    async def scan_async(self) -> str:
+        """Run the scan command on the event loop and return raw output."""
+        result = await run_command(self.command(), self.timeout)
+        return result.stdout
+
+    def scan(self) -> str:
+        """Run the scan command and return raw output as string."""
+        return run_sync(self.scan_async())
+
+    def parse(self, output: str) -> List[Dict]:
+        raise NotImplementedError
+
+
+class NetshBackend(ScanBackend):
+    """Windows netsh backend"""
+
+    name = "netsh"
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform == "win32"
+
+    def command(self) -> List[str]:
+        return ["netsh", "wlan", "show", "networks", "mode=bssid"]
+
+    def parse(self, output: str) -> List[Dict]:
+        return parse_netsh(output)
+
+
+class IwBackend(ScanBackend):
+    """Linux nl80211 backend using the kernel scan cache (`iw ... scan dump`)"""
+
+    name = "iw"
+
+    def __init__(self, interface: str = None):
+        super().__init__(interface or self.default_interface() or "wlan0")
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform.startswith("linux") and shutil.which("iw") is not None
+
+    def command(self) -> List[str]:
+        return ["iw", "dev", self.interface, "scan", "dump"]
+
+    @staticmethod
+    def default_interface() -> Optional[str]:
+        """First wireless interface reported by `iw dev`"""
+        try:
+            result = run_command_sync(["iw", "dev"], timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        for line in result.stdout.splitlines():
+            line = line.strip()
+            if line.startswith("Interface "):
+                return line.split(None, 1)[1]
+        return None
+
+    def parse(self, output: str) -> List[Dict]:
+        return parse_iw(output)
+
+
+class IwlistBackend(ScanBackend):
+    """Linux wireless-extensions backend (`iwlist <if> scan`), for hosts without iw"""
+
+    name = "iwlist"
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform.startswith("linux") and shutil.which("iwlist") is not None
+
+    def command(self) -> List[str]:
+        return ["iwlist", self.interface or "wlan0", "scan"]
+
+    def parse(self, output: str) -> List[Dict]:
+        return parse_iwlist(output)
+
+
+class NmcliBackend(ScanBackend):
+    """Linux NetworkManager backend using terse, escaped output"""
+
+    name = "nmcli"
+    FIELDS = ["SSID", "BSSID", "CHAN", "FREQ", "SIGNAL", "SECURITY"]
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform.startswith("linux") and shutil.which("nmcli") is not None
+
+    def command(self) -> List[str]:
+        command = ["nmcli", "-t", "-e", "yes", "-f", ",".join(self.FIELDS), "dev", "wifi", "list"]
+        if self.interface:
+            command += ["ifname", self.interface]
+        return command
+
+    def parse(self, output: str) -> List[Dict]:
+        records: List[Dict] = []
+        timestamp = datetime.utcnow().isoformat()
+
+        for line in output.splitlines():
+            if not line:
+                continue
+            fields = split_terse(line)
+            if len(fields) != len(self.FIELDS):
+                continue
+
+            ssid, bssid, chan, freq, signal, security = fields
+            record = {
+                "ssid": ssid,
+                "bssid": bssid.lower(),
+                "timestamp": timestamp,
+                "signal": f"{signal}%",
+                "channel": chan,
+            }
+
+            freq_digits = freq.split(" ", 1)[0]
+            if freq_digits.isdigit():
+                record["band"] = freq_to_band(int(freq_digits))
+
+            record["authentication"], record["encryption"] = self._security(security)
+            records.append(record)
+
+        return records
+
+    @staticmethod
+    def _security(security: str) -> tuple:
+        tokens = security.split()
+        enterprise = "802.1X" in tokens
+        if "WPA3" in tokens:
+            return ("WPA3-Enterprise" if enterprise else "WPA3-Personal"), "CCMP"
+        if "WPA2" in tokens:
+            return ("WPA2-Enterprise" if enterprise else "WPA2-Personal"), "CCMP"
+        if "WPA1" in tokens:
+            return ("WPA-Enterprise" if enterprise else "WPA-Personal"), "TKIP"
+        if "WEP" in tokens:
+            return "Open", "WEP"
+        return "Open", "None"
+
+
+async def scan_all_async(backends: List[ScanBackend]) -> List[Union[str, Exception]]:
+    """Run several backends (one per interface) concurrently"""
+    return await asyncio.gather(*(backend.scan_async() for backend in backends), return_exceptions=True)
+
+
+def scan_all(backends: List[ScanBackend]) -> List[Union[str, Exception]]:
+    """Blocking wrapper around scan_all_async; one output or exception per backend"""
+    return run_sync(scan_all_async(backends))
+
+
+BACKENDS = {
+    NetshBackend.name: NetshBackend,
+    IwBackend.name: IwBackend,
+    NmcliBackend.name: NmcliBackend,
+    IwlistBackend.name: IwlistBackend,
+}
+
+
+def select_backend(interface: str = None, name: str = None) -> ScanBackend:
+    """
+    Pick the scan backend for this host.
+
+    An explicit `name` wins; otherwise the first available of
+    netsh (Windows), iw, nmcli, iwlist (Linux). Falls back to netsh.
+    """
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown scan backend: {name}")
+        return BACKENDS[name](interface)
+
+    for backend_cls in (NetshBackend, IwBackend, NmcliBackend, IwlistBackend):
+        if backend_cls.available():
+            return backend_cls(interface)
+
+    return NetshBackend(interface)
@@ -0,0 +1,242 @@
+"""
+Raw Scan Buckets
+Delta-encoded storage for Phase 1 raw scans.
+
+Instead of one document per BSSID per scan, each (ssid, bssid) gets one
+document per hour in `raw_scan_buckets`:
+
+    {
+        "ssid", "bssid", "hour":  bucket key (hour is a BSON date)
+        "keyframe": full normalized record of the first observation,
+                    minus per-sample fields
+        "t":        [ms offsets from `hour`]          one per observation
+        "s":        [signal percent or None]          one per observation
+        "changes":  {field: {"t": [ms offsets], "v": [new values]}}
+                    state fields that changed at those observations
+        "count", "first_seen", "last_seen"
+    }
+
+A new hour always starts a new bucket, so every BSSID gets a fresh
+keyframe once an hour. State between changes is constant; readers rebuild
+per-sample values by applying `changes` on top of `keyframe`.
+
+Append-only: buckets are only ever extended, never rewritten.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from services.metrics import LatencyHistogram
+
+# Values that change every scan; stored in arrays, never in the keyframe
+SAMPLE_FIELDS = ("signal", "signal_percent", "signal_dbm", "timestamp", "observed_at", "_id")
+
+# Slowly changing fields tracked through `changes`
+STATE_FIELDS = (
+    "channel_number", "band_code", "stations_count", "encryption",
+    "authentication", "radio_type", "channel_utilization"
+)
+
+
+def bucket_hour(observed_at: datetime) -> datetime:
+    return observed_at.replace(minute=0, second=0, microsecond=0)
+
+
+class ScanBucketWriter:
+    """Accumulates normalized records and upserts them into hourly buckets"""
+
+    def __init__(self, collection, max_pending: int = 10000):
+        """
+        :param collection: Target MongoDB collection (raw_scan_buckets)
+        :param max_pending: Maximum buffered observations; further ones are dropped
+        """
+        self.collection = collection
+        self.max_pending = max_pending
+
+        # bucket key -> last written state
+        self._state: Dict[Tuple, Dict] = {}
+        # bucket key -> pending update
+        self._pending: Dict[Tuple, Dict] = {}
+        self._pending_count = 0
+        # Buckets whose stored state is uncertain after a failed write
+        self._restate = set()
+        # Buckets from the hour we started in may already exist from a previous run
+        self._started_hour = bucket_hour(datetime.utcnow())
+        self._lock = threading.Lock()
+
+        self.flush_latency = LatencyHistogram()
+        self.records_added = 0
+        self.records_dropped = 0
+        self.buckets_written = 0
+        self.flush_errors = 0
+
+    def add(self, record: Dict):
+        """Queue one normalized record (see scan_normalizer)"""
+        observed_at = record.get("observed_at")
+        bssid = record.get("bssid")
+        if observed_at is None or not bssid:
+            self.records_dropped += 1
+            return
+
+        hour = bucket_hour(observed_at)
+        key = (record.get("ssid"), bssid, hour)
+        state = {field: record.get(field) for field in STATE_FIELDS if record.get(field) is not None}
+        offset_ms = int((observed_at - hour) / timedelta(milliseconds=1))
+
+        with self._lock:
+            if self._pending_count >= self.max_pending:
+                self.records_dropped += 1
+                return
+
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = {
+                    "keyframe": {k: v for k, v in record.items() if k not in SAMPLE_FIELDS},
+                    "t": [],
+                    "s": [],
+                    "changes": {},
+                    "first_seen": observed_at,
+                    "last_seen": observed_at
+                }
+
+            previous = self._state.get(key)
+            if previous is None:
+                changed = {}
+                if hour == self._started_hour or key in self._restate:
+                    # Bucket may predate this process; restate everything
+                    changed = state
+                    self._restate.discard(key)
+            else:
+                changed = {k: v for k, v in state.items() if previous.get(k) != v}
+
+            for field, value in changed.items():
+                change = pending["changes"].setdefault(field, {"t": [], "v": []})
+                change["t"].append(offset_ms)
+                change["v"].append(value)
+
+            pending["t"].append(offset_ms)
+            pending["s"].append(record.get("signal_percent"))
+            pending["first_seen"] = min(pending["first_seen"], observed_at)
+            pending["last_seen"] = max(pending["last_seen"], observed_at)
+
+            merged = dict(previous or {})
+            merged.update(state)
+            self._state[key] = merged
+
+            self._pending_count += 1
+            self.records_added += 1
+
+            # Forget state of closed hours
+            if len(self._state) > 4 * max(len(self._pending), 1024):
+                self._prune_state(hour)
+
+    def _prune_state(self, current_hour: datetime):
+        for key in [k for k in self._state if k[2] < current_hour and k not in self._pending]:
+            del self._state[key]
+
+    def flush(self) -> int:
+        """Write all pending buckets with one bulk_write; returns buckets written"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            count, self._pending_count = self._pending_count, 0
+
+        operations = []
+        for (ssid, bssid, hour), update in pending.items():
+            doc_update = {
+                "$setOnInsert": {"keyframe": update["keyframe"]},
+                "$push": {
+                    "t": {"$each": update["t"]},
+                    "s": {"$each": update["s"]}
+                },
+                "$inc": {"count": len(update["t"])},
+                "$min": {"first_seen": update["first_seen"]},
+                "$max": {"last_seen": update["last_seen"]}
+            }
+            for field, change in update["changes"].items():
+                doc_update["$push"][f"changes.{field}.t"] = {"$each": change["t"]}
+                doc_update["$push"][f"changes.{field}.v"] = {"$each": change["v"]}
+            operations.append(UpdateOne({"ssid": ssid, "bssid": bssid, "hour": hour}, doc_update, upsert=True))
+
+        started = time.monotonic()
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            print(f"[ScanBucketWriter] Flush failed, dropping {count} observations: {e}")
+            self.flush_errors += 1
+            self.records_dropped += count
+            with self._lock:
+                # Buckets may be half written; restate them on the next write
+                for key in pending:
+                    self._state.pop(key, None)
+                    self._restate.add(key)
+            return 0
+
+        self.flush_latency.observe(time.monotonic() - started)
+        self.buckets_written += len(operations)
+        return len(operations)
+
+    def get_metrics(self) -> Dict:
+        return {
+            "pending": self._pending_count,
+            "records_added": self.records_added,
+            "records_dropped": self.records_dropped,
+            "buckets_written": self.buckets_written,
+            "flush_errors": self.flush_errors,
+            "flush_latency": self.flush_latency.snapshot()
+        }
+
+
+def bucket_columns(bucket: Dict) -> Dict[str, List]:
+    """
+    Per-sample columns of one bucket, without building per-sample dicts.
+
+    State fields are expanded run by run between change points.
+    """
+    offsets = bucket.get("t", [])
+    count = len(offsets)
+    keyframe = bucket.get("keyframe", {})
+    changes = bucket.get("changes", {})
+
+    columns = {}
+    for field in STATE_FIELDS:
+        column = []
+        value = keyframe.get(field)
+        change = changes.get(field)
+        if change:
+            for change_t, new_value in sorted(zip(change["t"], change["v"]), key=lambda c: c[0]):
+                # Observations are appended in time order
+                index = max(bisect_left(offsets, change_t), len(column))
+                column.extend([value] * (index - len(column)))
+                value = new_value
+        column.extend([value] * (count - len(column)))
+        columns[field] = column
+
+    columns["signal_percent"] = list(bucket.get("s", []))
+    columns["count"] = count
+    return columns
+
+
+def expand_bucket(bucket: Dict) -> List[Dict]:
+    """Rebuild per-observation records (typed fields) from a bucket"""
+    columns = bucket_columns(bucket)
+    hour: Optional[datetime] = bucket.get("hour")
+    records = []
+    for i, offset_ms in enumerate(bucket.get("t", [])):
+        record = {"ssid": bucket.get("ssid"), "bssid": bucket.get("bssid")}
+        for field in STATE_FIELDS:
+            if columns[field][i] is not None:
+                record[field] = columns[field][i]
+        if columns["signal_percent"][i] is not None:
+            record["signal_percent"] = columns["signal_percent"][i]
+        if hour is not None:
+            record["observed_at"] = hour + timedelta(milliseconds=offset_ms)
+        records.append(record)
+    return records
@@ -0,0 +1,128 @@
+"""
+Scan Result Cache
+Shares recent WiFi scan results between callers.
+
+- Results younger than the freshness window are served from memory.
+- While a rescan is in flight, other callers for the same key wait for
+  it instead of starting their own (request coalescing).
+- Hit / miss / coalesced counters expose how often the radio was spared.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+from config import Config
+
+
+class _InFlight:
+    """One running scan that late callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[List[Dict]] = None
+        self.error: Optional[BaseException] = None
+
+
+class ScanResultCache:
+    """TTL cache with in-flight request coalescing"""
+
+    def __init__(self, ttl: float = 10.0):
+        """
+        :param ttl: Default freshness window in seconds
+        """
+        self.ttl = ttl
+        # key -> (completed_at monotonic, results)
+        self._entries: Dict[Hashable, tuple] = {}
+        self._in_flight: Dict[Hashable, _InFlight] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_scan(self, key: Hashable, scan: Callable[[], List[Dict]],
+                    max_age: float = None) -> List[Dict]:
+        """
+        Return cached results for `key` if fresh enough, else run `scan`.
+
+        :param max_age: Override the freshness window; 0 forces a rescan
+                        (an already running rescan is still shared)
+        """
+        max_age = self.ttl if max_age is None else max_age
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= max_age:
+                self.hits += 1
+                return self._copy(entry[1])
+
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                flight = self._in_flight[key] = _InFlight()
+                owner = True
+
+        if not owner:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self._copy(flight.result)
+
+        try:
+            flight.result = scan()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = (time.monotonic(), flight.result)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.done.set()
+
+        return self._copy(flight.result)
+
+    @staticmethod
+    def _copy(results: List[Dict]) -> List[Dict]:
+        # Callers annotate networks in place; keep the cached copy clean
+        return [dict(network) for network in results]
+
+    def invalidate(self, key: Hashable = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            requests = self.hits + self.misses + self.coalesced
+            return {
+                "ttl": self.ttl,
+                "requests": requests,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round((self.hits + self.coalesced) / requests, 4) if requests else 0.0,
+                "in_flight": len(self._in_flight),
+                "entries": len(self._entries)
+            }
+
+
+_cache_instance: Optional[ScanResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_scan_cache() -> ScanResultCache:
+    """Process-wide cache shared by all WiFiScanner instances"""
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = ScanResultCache(Config.WIFI_SCAN_CACHE_TTL)
+    return _cache_instance
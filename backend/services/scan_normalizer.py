@@ -0,0 +1,101 @@
+"""
+Scan Normalizer
+Adds typed numeric fields to raw Phase 1 records at ingestion time.
+
+The raw text fields written by the scan backends ("87%", "36",
+"5 GHz", ISO timestamp) are kept untouched; typed copies are stored
+next to them so later phases never re-parse strings:
+
+    signal_percent  int     0-100
+    signal_dbm      int     approximated from percent unless the backend reported dBm
+    channel_number  int
+    band_code       str     one of BANDS
+    stations_count  int
+    observed_at     datetime (stored as BSON date)
+"""
+
+from datetime import datetime
+from typing import Dict, Optional
+
+BAND_24 = "2.4GHz"
+BAND_5 = "5GHz"
+BAND_6 = "6GHz"
+BAND_UNKNOWN = "unknown"
+BANDS = (BAND_24, BAND_5, BAND_6, BAND_UNKNOWN)
+
+# Fields Phase 2 reads; every other raw field stays out of the projection
+TYPED_FIELDS = (
+    "ssid", "bssid", "signal_percent", "signal_dbm", "channel_number",
+    "band_code", "stations_count", "observed_at", "encryption", "authentication"
+)
+
+
+def parse_int(value) -> Optional[int]:
+    """Integer from strings like '87%' or ' 4'; None if there are no digits"""
+    if isinstance(value, int):
+        return value
+    if not isinstance(value, str):
+        return None
+    digits = "".join(filter(str.isdigit, value))
+    return int(digits) if digits else None
+
+
+def band_code(band: Optional[str], channel: Optional[int] = None) -> str:
+    """Map netsh-style band text ('2.4 GHz') to a band code"""
+    if band:
+        text = band.replace(" ", "").lower()
+        if text.startswith("2.4"):
+            return BAND_24
+        if text.startswith("5"):
+            return BAND_5
+        if text.startswith("6"):
+            return BAND_6
+    if channel is not None:
+        if 1 <= channel <= 14:
+            return BAND_24
+        if 32 <= channel <= 177:
+            return BAND_5
+    return BAND_UNKNOWN
+
+
+def percent_to_dbm(percent: int) -> int:
+    """Inverse of the Windows signal quality mapping"""
+    return int(percent / 2 - 100)
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def normalize_record(record: Dict) -> Dict:
+    """Return the record with typed fields added alongside the raw text"""
+    normalized = dict(record)
+
+    signal = parse_int(record.get("signal"))
+    if signal is not None:
+        normalized["signal_percent"] = signal
+        if "signal_dbm" not in record:
+            normalized["signal_dbm"] = percent_to_dbm(signal)
+
+    channel = parse_int(record.get("channel"))
+    if channel is not None:
+        normalized["channel_number"] = channel
+
+    normalized["band_code"] = band_code(record.get("band"), channel)
+
+    stations = parse_int(record.get("connected_stations"))
+    if stations is not None:
+        normalized["stations_count"] = stations
+
+    observed_at = parse_timestamp(record.get("timestamp"))
+    if observed_at is not None:
+        normalized["observed_at"] = observed_at
+
+    return normalized
@@ -0,0 +1,388 @@
+"""
+Scan Output Parser
+Table-driven, single-pass tokenizer for Wi-Fi scan tool output.
+
+Each format (netsh, iw, iwlist) is a table of (token, pattern) pairs
+compiled into ONE multiline regex. The whole output is consumed by a
+single finditer pass; `match.lastgroup` names the token that matched.
+Lines without a token hit an unnamed catch-all alternative (lastgroup is
+None), so the engine steps line by line instead of retrying the
+alternation at every character.
+
+All formats emit the Phase 1 raw record schema (netsh field names):
+
+    ssid, bssid, timestamp, signal ("87%"), channel, band,
+    authentication, encryption, radio_type,
+    connected_stations, channel_utilization
+    (+ signal_dbm as int when the tool reports dBm)
+
+Parsing only: no interpretation, no scoring.
+"""
+
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# -------------------------
+# Unit helpers
+# -------------------------
+
+
+def dbm_to_percent(dbm: float) -> int:
+    """Signal quality as reported by Windows (linear between -100 and -50 dBm)"""
+    return int(max(0, min(100, 2 * (dbm + 100))))
+
+
+def freq_to_band(freq_mhz: int) -> str:
+    if freq_mhz >= 5925:
+        return "6 GHz"
+    if freq_mhz >= 4900:
+        return "5 GHz"
+    return "2.4 GHz"
+
+
+def freq_to_channel(freq_mhz: int) -> Optional[int]:
+    if freq_mhz == 2484:
+        return 14
+    if 2412 <= freq_mhz < 2484:
+        return (freq_mhz - 2407) // 5
+    if 5955 <= freq_mhz <= 7115:
+        return (freq_mhz - 5950) // 5
+    if 5000 <= freq_mhz < 5925:
+        return (freq_mhz - 5000) // 5
+    return None
+
+
+def channel_to_band(channel: int) -> Optional[str]:
+    if 1 <= channel <= 14:
+        return "2.4 GHz"
+    if 32 <= channel <= 177:
+        return "5 GHz"
+    return None
+
+
+# -------------------------
+# Tokenizer
+# -------------------------
+
+_VALUE = r"(?P<{}>[^\r\n]*)"
+
+
+def compile_table(table: Sequence[Tuple[str, str]]):
+    """
+    One regex for a token table.
+
+    Every alternative is wrapped in a group named after its token, so the
+    outer group closes last and `match.lastgroup` identifies the token.
+    Any other line matches the trailing catch-all with lastgroup None.
+    """
+    alternatives = "|".join(f"(?P<{token}>{pattern})" for token, pattern in table)
+    return re.compile(rf"^[ \t]*(?:{alternatives}|[^\r\n]*)", re.MULTILINE)
+
+
+# netsh wlan show networks mode=bssid
+# "Channel Utilization" must come before "Channel"
+NETSH_TABLE = (
+    ("bssid", r"BSSID[ \t]+\d+[ \t]*:" + _VALUE.format("bssid_v")),
+    ("ssid", r"SSID[ \t]+\d+[ \t]*:" + _VALUE.format("ssid_v")),
+    ("signal", r"Signal[ \t]*:" + _VALUE.format("signal_v")),
+    ("channel_utilization", r"Channel Utilization[ \t]*:" + _VALUE.format("channel_utilization_v")),
+    ("channel", r"Channel[ \t]*:" + _VALUE.format("channel_v")),
+    ("band", r"Band[ \t]*:" + _VALUE.format("band_v")),
+    ("authentication", r"Authentication[ \t]*:" + _VALUE.format("authentication_v")),
+    ("encryption", r"Encryption[ \t]*:" + _VALUE.format("encryption_v")),
+    ("radio_type", r"Radio type[ \t]*:" + _VALUE.format("radio_type_v")),
+    ("connected_stations", r"Connected Stations[ \t]*:" + _VALUE.format("connected_stations_v")),
+)
+NETSH_REGEX = compile_table(NETSH_TABLE)
+
+# Lines printed once per SSID block, before its BSSIDs; every other
+# netsh token is stored verbatim on the current BSSID
+NETSH_SSID_FIELDS = ("authentication", "encryption")
+
+# iw dev <if> scan dump
+IW_TABLE = (
+    ("bss", r"BSS[ \t]+(?P<bss_v>[0-9a-fA-F]{2}(?::[0-9a-fA-F]{2}){5})"),
+    ("ssid", r"SSID:[ \t]?" + _VALUE.format("ssid_v")),
+    ("signal", r"signal:[ \t]*(?P<signal_v>-?\d+(?:\.\d+)?)[ \t]*dBm"),
+    ("freq", r"freq:[ \t]*(?P<freq_v>\d+)"),
+    ("capability", r"capability:" + _VALUE.format("capability_v")),
+    ("rsn", r"RSN:"),
+    ("wpa", r"WPA:"),
+    ("eht", r"EHT capabilities"),
+    ("he", r"HE capabilities"),
+    ("vht", r"VHT capabilities"),
+    ("ht", r"HT capabilities"),
+    ("channel", r"(?:DS Parameter set: channel|\* primary channel:)[ \t]*(?P<channel_v>\d+)"),
+    ("stations", r"\* station count:[ \t]*(?P<stations_v>\d+)"),
+    ("utilisation", r"\* channel utilisation:[ \t]*(?P<utilisation_v>\d+)/255"),
+    ("ciphers", r"\* Pairwise ciphers:" + _VALUE.format("ciphers_v")),
+    ("suites", r"\* Authentication suites:" + _VALUE.format("suites_v")),
+)
+IW_REGEX = compile_table(IW_TABLE)
+
+# iwlist <if> scan
+IWLIST_TABLE = (
+    ("cell", r"Cell[ \t]+\d+[ \t]*-[ \t]*Address:[ \t]*(?P<cell_v>[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5})"),
+    ("essid", r"ESSID:" + _VALUE.format("essid_v")),
+    ("freq", r"Frequency[:=](?P<freq_v>\d+(?:\.\d+)?)[ \t]*GHz(?:[ \t]*\(Channel[ \t]+(?P<freq_channel>\d+)\))?"),
+    ("channel", r"Channel[:=](?P<channel_v>\d+)"),
+    ("quality", r"Quality[:=](?P<quality_v>\d+)/(?P<quality_max>\d+)"
+                r"(?:[ \t]+Signal level[:=](?P<quality_level>-?\d+)[ \t]*(?P<quality_unit>dBm)?)?"),
+    ("level", r"Signal level[:=](?P<level_v>-?\d+)[ \t]*(?P<level_unit>dBm)?"),
+    ("encryption_key", r"Encryption key:(?P<encryption_key_v>on|off)"),
+    ("ie", r"IE:" + _VALUE.format("ie_v")),
+    ("ciphers", r"Pairwise Ciphers[ \t]*\(\d+\)[ \t]*:" + _VALUE.format("ciphers_v")),
+    ("suites", r"Authentication Suites[ \t]*\(\d+\)[ \t]*:" + _VALUE.format("suites_v")),
+)
+IWLIST_REGEX = compile_table(IWLIST_TABLE)
+
+# Element IDs (hex) iwlist dumps as "IE: Unknown: <id><len>...";
+# 0xFF elements are keyed by id + extension id
+IWLIST_CAPABILITY_IES = {
+    "2D": "ht",
+    "BF": "vht",
+    "FF23": "he",
+    "FF6C": "eht",
+}
+
+
+# -------------------------
+# netsh
+# -------------------------
+
+
+def parse_netsh(output: str, timestamp: str = None) -> List[Dict]:
+    timestamp = timestamp or datetime.utcnow().isoformat()
+    records: List[Dict] = []
+    ssid: Optional[str] = None
+    block_fields: Dict[str, str] = {}
+    block_records: List[Dict] = []
+    last: Optional[Dict] = None
+
+    for match in NETSH_REGEX.finditer(output):
+        token = match.lastgroup
+        if token is None:
+            continue
+        value = match.group(token + "_v").strip()
+
+        if token == "bssid":
+            if not value:
+                # Truncated line; drop its fields rather than misattribute them
+                last = None
+                continue
+            last = {"ssid": ssid, "bssid": value, "timestamp": timestamp}
+            last.update(block_fields)
+            records.append(last)
+            block_records.append(last)
+        elif token == "ssid":
+            ssid = value
+            block_fields = {}
+            block_records = []
+        elif token in NETSH_SSID_FIELDS:
+            block_fields[token] = value
+            for record in block_records:
+                record[token] = value
+        elif last is not None:
+            last[token] = value
+
+    return records
+
+
+# -------------------------
+# iw / iwlist (shared record builder)
+# -------------------------
+
+
+def _new_state(bssid: str) -> Dict:
+    return {"bssid": bssid.lower(), "ciphers": [], "auth": [], "section": None}
+
+
+def _record_from_state(state: Dict, timestamp: str) -> Dict:
+    record = {
+        "ssid": state.get("ssid", ""),
+        "bssid": state["bssid"],
+        "timestamp": timestamp,
+    }
+
+    if "signal_dbm" in state:
+        record["signal"] = f"{dbm_to_percent(state['signal_dbm'])}%"
+        record["signal_dbm"] = int(round(state["signal_dbm"]))
+    elif "quality" in state:
+        record["signal"] = f"{state['quality']}%"
+
+    freq = state.get("freq")
+    channel = state.get("channel") or (freq_to_channel(freq) if freq else None)
+    if channel is not None:
+        record["channel"] = str(channel)
+    if freq:
+        record["band"] = freq_to_band(freq)
+    elif channel is not None and channel_to_band(channel):
+        record["band"] = channel_to_band(channel)
+
+    # Security
+    suites = [s for section, values in state["auth"] if section == "RSN" for s in values]
+    ciphers = [c for section, values in state["ciphers"] for c in values]
+    if state.get("rsn"):
+        if "SAE" in suites:
+            record["authentication"] = "WPA3-Personal"
+        elif "IEEE" in suites or "802.1X" in suites:
+            record["authentication"] = "WPA2-Enterprise"
+        else:
+            record["authentication"] = "WPA2-Personal"
+    elif state.get("wpa"):
+        record["authentication"] = "WPA-Personal"
+    else:
+        record["authentication"] = "Open"
+
+    if ciphers:
+        record["encryption"] = "CCMP" if "CCMP" in ciphers else ciphers[0]
+    elif state.get("privacy"):
+        record["encryption"] = "WEP"
+    else:
+        record["encryption"] = "None"
+
+    # Radio type from the highest advertised capability
+    if state.get("eht"):
+        record["radio_type"] = "802.11be"
+    elif state.get("he"):
+        record["radio_type"] = "802.11ax"
+    elif state.get("vht"):
+        record["radio_type"] = "802.11ac"
+    elif state.get("ht"):
+        record["radio_type"] = "802.11n"
+    elif freq:
+        record["radio_type"] = "802.11a" if freq >= 4900 else "802.11g"
+
+    if "stations" in state:
+        record["connected_stations"] = state["stations"]
+    if "utilisation" in state:
+        record["channel_utilization"] = f"{state['utilisation']} ({round(state['utilisation'] * 100 / 255)} %)"
+
+    return record
+
+
+def parse_iw(output: str, timestamp: str = None) -> List[Dict]:
+    timestamp = timestamp or datetime.utcnow().isoformat()
+    records: List[Dict] = []
+    state: Optional[Dict] = None
+
+    for match in IW_REGEX.finditer(output):
+        token = match.lastgroup
+        if token is None:
+            continue
+
+        if token == "bss":
+            if state is not None:
+                records.append(_record_from_state(state, timestamp))
+            state = _new_state(match.group("bss_v"))
+            continue
+        if state is None:
+            continue
+
+        if token == "ssid":
+            state["ssid"] = match.group("ssid_v").strip()
+        elif token == "signal":
+            state["signal_dbm"] = float(match.group("signal_v"))
+        elif token == "freq":
+            state["freq"] = int(match.group("freq_v"))
+        elif token == "capability":
+            state["privacy"] = "Privacy" in match.group("capability_v")
+        elif token in ("rsn", "wpa"):
+            state[token] = True
+            state["section"] = token.upper()
+        elif token in ("eht", "he", "vht", "ht"):
+            state[token] = True
+        elif token == "channel":
+            state.setdefault("channel", int(match.group("channel_v")))
+        elif token == "stations":
+            state["stations"] = match.group("stations_v")
+        elif token == "utilisation":
+            state["utilisation"] = int(match.group("utilisation_v"))
+        elif token in ("ciphers", "suites") and state["section"]:
+            key = "ciphers" if token == "ciphers" else "auth"
+            state[key].append((state["section"], match.group(token + "_v").split()))
+
+    if state is not None:
+        records.append(_record_from_state(state, timestamp))
+    return records
+
+
+def parse_iwlist(output: str, timestamp: str = None) -> List[Dict]:
+    timestamp = timestamp or datetime.utcnow().isoformat()
+    records: List[Dict] = []
+    state: Optional[Dict] = None
+
+    for match in IWLIST_REGEX.finditer(output):
+        token = match.lastgroup
+        if token is None:
+            continue
+
+        if token == "cell":
+            if state is not None:
+                records.append(_record_from_state(state, timestamp))
+            state = _new_state(match.group("cell_v"))
+            continue
+        if state is None:
+            continue
+
+        if token == "essid":
+            state["ssid"] = match.group("essid_v").strip().strip('"')
+        elif token == "channel":
+            state["channel"] = int(match.group("channel_v"))
+        elif token == "freq":
+            state["freq"] = int(round(float(match.group("freq_v")) * 1000))
+            if match.group("freq_channel"):
+                state.setdefault("channel", int(match.group("freq_channel")))
+        elif token == "quality":
+            maximum = int(match.group("quality_max")) or 100
+            state["quality"] = min(100, int(match.group("quality_v")) * 100 // maximum)
+            if match.group("quality_level") and match.group("quality_unit"):
+                state["signal_dbm"] = float(match.group("quality_level"))
+        elif token == "level":
+            if match.group("level_unit"):
+                state["signal_dbm"] = float(match.group("level_v"))
+        elif token == "encryption_key":
+            state["privacy"] = match.group("encryption_key_v") == "on"
+        elif token == "ie":
+            ie = match.group("ie_v").strip()
+            if ie.startswith("Unknown:"):
+                # Raw element: first byte is the element ID (extension ID for 0xFF)
+                element = ie[8:].strip()[:6].upper()
+                capability = IWLIST_CAPABILITY_IES.get(element[:2]) or IWLIST_CAPABILITY_IES.get(element[:2] + element[4:6])
+                if capability:
+                    state[capability] = True
+                state["section"] = None
+            elif "WPA2" in ie or "802.11i" in ie:
+                state["rsn"] = True
+                state["section"] = "RSN"
+            elif "WPA" in ie:
+                state["wpa"] = True
+                state["section"] = "WPA"
+            else:
+                state["section"] = None
+        elif token in ("ciphers", "suites") and state["section"]:
+            values = match.group(token + "_v").split()
+            if token == "suites":
+                # iwlist prints "802.1x"; iw prints "IEEE 802.1X"
+                values = ["802.1X" if v.lower() == "802.1x" else v for v in values]
+            key = "ciphers" if token == "ciphers" else "auth"
+            state[key].append((state["section"], values))
+
+    if state is not None:
+        records.append(_record_from_state(state, timestamp))
+    return records
+
+
+PARSERS: Dict[str, Callable[[str, str], List[Dict]]] = {
+    "netsh": parse_netsh,
+    "iw": parse_iw,
+    "iwlist": parse_iwlist,
+}
+
+
+def parse_scan_output(format_name: str, output: str, timestamp: str = None) -> List[Dict]:
+    """Parse scan tool output of the given format into raw records"""
+    if format_name not in PARSERS:
+        raise ValueError(f"Unknown scan output format: {format_name}")
+    return PARSERS[format_name](output, timestamp)
@@ -0,0 +1,211 @@
+"""
+Scan Sessions
+Per-scan state and cancellation for the scan API.
+
+Every /api/scan/start request gets its own ScanSession with a private
+NetworkScanner, so concurrent scans never share network/client tables.
+ScanSessionManager limits how many sessions may capture on the same
+interface at once; further requests wait in a queue until a slot frees
+up or they are cancelled.
+"""
+
+import threading
+from typing import Dict, List, Optional, Union
+
+from config import Config
+from services.capture_supervisor import CaptureSupervisor
+from services.live_scan_buffer import LiveScanBuffer
+from services.network_scanner import NetworkScanner
+
+
+class ScanSession:
+    """State for a single scan request"""
+
+    def __init__(self, scan_id: str, interface: str, duration: int = 30,
+                 scan_type: str = "passive", interfaces: List[Union[str, Dict]] = None,
+                 live_buffer: LiveScanBuffer = None):
+        """
+        :param interface: Interface for single-interface scans
+        :param interfaces: Worker specs for multi-interface capture (see CaptureSupervisor)
+        :param live_buffer: Receives incremental deltas while capture runs
+        """
+        self.scan_id = scan_id
+        self.interface = interface
+        self.interfaces = interfaces
+        self.duration = duration
+        self.scan_type = scan_type
+        self.status = "queued"
+
+        self.scanner = NetworkScanner(interface)
+        self.supervisor: Optional[CaptureSupervisor] = None
+        self.cancel_event = threading.Event()
+
+        self.live_buffer = live_buffer
+        if live_buffer is not None:
+            live_buffer.client_count = self.scanner.clients.count
+            self.scanner.delta_listener = live_buffer
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def interface_names(self) -> List[str]:
+        """Interfaces this session captures on"""
+        if self.interfaces:
+            return [spec["interface"] if isinstance(spec, dict) else spec for spec in self.interfaces]
+        return [self.interface]
+
+    def run(self) -> Dict:
+        """Capture until the duration elapses or the session is cancelled"""
+        self.status = "in_progress"
+
+        if self.live_buffer is None:
+            return self._capture()
+
+        self.live_buffer.start()
+        try:
+            return self._capture()
+        finally:
+            self.live_buffer.stop()
+
+    def _capture(self) -> Dict:
+        if self.interfaces:
+            self.supervisor = CaptureSupervisor(self.interfaces, self.duration, scanner=self.scanner)
+            self.supervisor.start()
+            if self.cancelled:
+                self.supervisor.stop()
+            self.supervisor.join()
+            return self.supervisor.get_results()
+
+        if self.scan_type == "active":
+            return self.scanner.start_active_scan(self.interface, self.duration, stop_event=self.cancel_event)
+        return self.scanner.start_scan(self.interface, self.duration, stop_event=self.cancel_event)
+
+    def cancel(self):
+        """Stop capture as soon as possible"""
+        self.cancel_event.set()
+        if self.supervisor is not None:
+            self.supervisor.stop()
+
+
+class ScanSessionManager:
+    """Registry of scan sessions with a per-interface concurrency limit"""
+
+    def __init__(self, max_per_interface: int = None):
+        self.max_per_interface = max_per_interface or Config.MAX_CONCURRENT_SCANS_PER_INTERFACE
+        self._sessions: Dict[str, ScanSession] = {}
+        self._active: Dict[str, int] = {}
+        self._holding = set()
+        # Sessions waiting for slots, oldest first
+        self._queue: List[ScanSession] = []
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+
+    def create(self, scan_id: str, interface: str, duration: int = 30,
+               scan_type: str = "passive", interfaces: List[Union[str, Dict]] = None,
+               live_buffer: LiveScanBuffer = None) -> ScanSession:
+        session = ScanSession(scan_id, interface, duration, scan_type, interfaces, live_buffer)
+        with self._lock:
+            self._sessions[scan_id] = session
+        return session
+
+    def get(self, scan_id: str) -> Optional[ScanSession]:
+        with self._lock:
+            return self._sessions.get(scan_id)
+
+    def remove(self, scan_id: str):
+        with self._lock:
+            self._sessions.pop(scan_id, None)
+
+    def _can_start(self, session: ScanSession) -> bool:
+        """
+        Free slot on every interface and no earlier queued session waiting
+        for one of them (lock held). All slots are taken at once, so two
+        multi-interface sessions cannot deadlock.
+        """
+        names = set(session.interface_names)
+        if any(self._active.get(name, 0) >= self.max_per_interface for name in names):
+            return False
+        for queued in self._queue:
+            if queued is session:
+                break
+            if names & set(queued.interface_names):
+                return False
+        return True
+
+    def _take(self, session: ScanSession):
+        for name in set(session.interface_names):
+            self._active[name] = self._active.get(name, 0) + 1
+        self._holding.add(session.scan_id)
+
+    def try_acquire(self, session: ScanSession) -> bool:
+        """
+        Take the session's slots if they are free right now; otherwise
+        queue it (finish with acquire()). Check and take are one step, so
+        two requests cannot both see a free slot.
+        """
+        with self._cond:
+            if self._can_start(session):
+                self._take(session)
+                return True
+            if session not in self._queue:
+                self._queue.append(session)
+            return False
+
+    def acquire(self, session: ScanSession) -> bool:
+        """
+        Block until the session holds a slot on every interface it uses.
+
+        Returns False if the session was cancelled while queued.
+        """
+        with self._cond:
+            if session.scan_id in self._holding:
+                return True
+            if session not in self._queue:
+                self._queue.append(session)
+            try:
+                while not session.cancelled:
+                    if self._can_start(session):
+                        self._take(session)
+                        return True
+                    self._cond.wait(0.1)
+                return False
+            finally:
+                self._queue.remove(session)
+                # Sessions queued behind this one may start now
+                self._cond.notify_all()
+
+    def release(self, session: ScanSession):
+        """Give back the session's slots (no-op if it holds none)"""
+        with self._cond:
+            if session.scan_id not in self._holding:
+                return
+            self._holding.discard(session.scan_id)
+            for name in set(session.interface_names):
+                self._active[name] = max(self._active.get(name, 0) - 1, 0)
+            self._cond.notify_all()
+
+    def discard(self, session: ScanSession):
+        """Drop a session that will never run: its slots, queue place and entry"""
+        self.release(session)
+        with self._cond:
+            if session in self._queue:
+                self._queue.remove(session)
+                self._cond.notify_all()
+            self._sessions.pop(session.scan_id, None)
+
+    def queued(self) -> List[str]:
+        """scan_ids waiting for a slot, oldest first"""
+        with self._lock:
+            return [session.scan_id for session in self._queue]
+
+    def cancel(self, scan_id: str) -> bool:
+        """Cancel a queued or running session; False if unknown"""
+        session = self.get(scan_id)
+        if session is None:
+            return False
+        session.cancel()
+        with self._cond:
+            self._cond.notify_all()
+        return True
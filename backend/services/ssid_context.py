@@ -0,0 +1,113 @@
+"""
+SSID Context Index
+Cross-network view of features_baseline for Phase 3 signature rules.
+
+The cross-network rules themselves (vendor_mismatch, encryption_downgrade,
+channel_disagreement) live in the rule registry (services.anomaly_rules),
+which groups a whole frame by SSID. This index groups the baselines of one
+Phase 3 run by SSID in O(N), so a single baseline can be evaluated by the
+same registry together with its sibling BSSIDs. It also holds the helpers
+those rules share.
+
+Summary rows stand in for BSSIDs of an SSID that are not in the frame
+(chunked Phase 3 splits SSIDs larger than a chunk): one row per distinct
+(vendor, vendor_oui, avg_channel, authentication, encryption) with the
+number of BSSIDs it represents in MEMBERS_FIELD and their earliest
+first_seen. The cross-network rules weight rows by MEMBERS_FIELD.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.oui_lookup import UNKNOWN_VENDOR
+
+MIN_CHANNEL_SIBLINGS = 2
+
+# BSSIDs represented by one row (1 when absent)
+MEMBERS_FIELD = "_members"
+SUMMARY_FIELDS = ("vendor", "vendor_oui", "avg_channel", "authentication", "encryption")
+SUMMARY_BSSID = "*"
+
+
+def security_rank(authentication: Optional[str], encryption: Optional[str]) -> Optional[float]:
+    """
+    Order security modes: Open 0, WEP 1, WPA 2, WPA2 3, WPA3 4 (+0.5 Enterprise).
+
+    None when neither field is known.
+    """
+    auth = (authentication or "").upper()
+    enc = (encryption or "").upper()
+
+    if "WPA3" in auth:
+        rank = 4.0
+    elif "WPA2" in auth:
+        rank = 3.0
+    elif "WPA" in auth:
+        rank = 2.0
+    elif "WEP" in enc or "SHARED" in auth:
+        rank = 1.0
+    elif auth == "OPEN" or enc in ("NONE", "OPEN"):
+        rank = 0.0
+    elif "CCMP" in enc or "GCMP" in enc or "AES" in enc:
+        rank = 3.0
+    elif "TKIP" in enc:
+        rank = 2.0
+    else:
+        return None
+
+    if "ENTERPRISE" in auth or "802.1X" in auth:
+        rank += 0.5
+    return rank
+
+
+def vendor_key(baseline: Dict) -> Optional[str]:
+    """Vendor name when known (vendors own many OUIs), else the OUI"""
+    vendor = baseline.get("vendor")
+    return vendor if vendor and vendor != UNKNOWN_VENDOR else baseline.get("vendor_oui")
+
+
+def summary_key(baseline: Dict) -> Tuple:
+    return tuple(baseline.get(field) for field in SUMMARY_FIELDS)
+
+
+def summary_rows(summary: List[Dict], members: List[Dict]) -> List[Dict]:
+    """
+    Summary rows of an SSID minus `members` (the BSSIDs already in the frame).
+
+    Earliest first_seen is kept as is: if it belonged to a member, the
+    member carries it into the frame itself.
+    """
+    present = Counter(summary_key(member) for member in members)
+    rows = []
+    for row in summary:
+        remaining = row[MEMBERS_FIELD] - present.get(summary_key(row), 0)
+        if remaining > 0:
+            rows.append(dict(row, **{MEMBERS_FIELD: remaining}))
+    return rows
+
+
+class SSIDContextIndex:
+    """SSID -> baselines advertising it, over one set of baselines"""
+
+    def __init__(self, baselines: Iterable[Dict]):
+        self.members: Dict[str, List[Dict]] = {}
+        for baseline in baselines:
+            ssid = baseline.get("ssid")
+            if not ssid or not baseline.get("bssid"):
+                continue
+            self.members.setdefault(ssid, []).append(baseline)
+
+    def get(self, ssid: str) -> Optional[List[Dict]]:
+        return self.members.get(ssid)
+
+    def group(self, baseline: Dict) -> Tuple[List[Dict], int]:
+        """
+        (baselines of the baseline's SSID, position of the baseline in it).
+
+        A baseline outside the indexed set is evaluated as one more member.
+        """
+        members = self.get(baseline.get("ssid")) or []
+        for position, member in enumerate(members):
+            if member is baseline:
+                return members, position
+        return members + [baseline], len(members)
@@ -1,4 +1,19 @@
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, join_room, leave_room
 
 socketio = SocketIO(cors_allowed_origins="*")
 
+
+@socketio.on('join_scan')
+def join_scan(data):
+    """Subscribe to live 'scan_update' batches for a scan"""
+    scan_id = (data or {}).get('scan_id')
+    if scan_id:
+        join_room(scan_id)
+
+
+@socketio.on('leave_scan')
+def leave_scan(data):
+    """Unsubscribe from a scan's live updates"""
+    scan_id = (data or {}).get('scan_id')
+    if scan_id:
+        leave_room(scan_id)
@@ -0,0 +1,77 @@
+"""
+Test script for the adaptive Phase 1 scan interval
+Validates backoff, churn/RSSI speed-up and the known-SSID fast path
+"""
+
+from services.adaptive_interval import AdaptiveIntervalController
+
+
+def _scan(*networks):
+    return [{"ssid": ssid, "bssid": bssid, "signal": f"{signal}%"} for ssid, bssid, signal in networks]
+
+
+BASE = (("HomeNet", "aa:aa:aa:aa:aa:01", 80), ("Office", "aa:aa:aa:aa:aa:02", 60),
+        ("Cafe", "aa:aa:aa:aa:aa:03", 40), ("Lab", "aa:aa:aa:aa:aa:04", 50))
+
+
+def test_stable_backoff():
+    """A quiet environment backs off to the maximum interval"""
+    controller = AdaptiveIntervalController(5, 60, initial=10)
+    for _ in range(10):
+        interval = controller.update(_scan(*BASE))
+
+    assert interval == 60
+    assert controller.reason == "stable environment"
+    print("✅ Stable backoff correct!\n")
+
+
+def test_churn_and_rssi_speed_up():
+    """BSSID churn and large RSSI swings halve the interval"""
+    controller = AdaptiveIntervalController(5, 60, initial=40)
+    controller.update(_scan(*BASE))
+
+    assert controller.update(_scan(*BASE[:3])) == 20
+    assert "churn" in controller.reason
+
+    swung = [(ssid, bssid, signal - 30) for ssid, bssid, signal in BASE[:3]]
+    assert controller.update(_scan(*swung)) == 10
+    assert "RSSI" in controller.reason
+    print("✅ Churn/RSSI speed-up correct!\n")
+
+
+def test_known_ssid_drops_to_min():
+    """A new BSSID advertising a known SSID jumps to the minimum"""
+    controller = AdaptiveIntervalController(5, 60, initial=60)
+    controller.update(_scan(*BASE))
+
+    interval = controller.update(_scan(*BASE, ("HomeNet", "bb:bb:bb:bb:bb:01", 90)))
+    assert interval == 5
+    assert "HomeNet" in controller.reason
+    print("✅ Known-SSID fast path correct!\n")
+
+
+def test_empty_scan_is_no_information():
+    """A failed (empty) scan neither changes the interval nor counts as churn"""
+    controller = AdaptiveIntervalController(5, 120, initial=40)
+    controller.update(_scan(*BASE))
+    assert controller.update(_scan(*BASE)) == 60
+
+    assert controller.update([]) == 60
+    assert controller.update(_scan(*BASE)) == 90
+    assert controller.reason == "stable environment"
+    print("✅ Empty scans ignored!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ADAPTIVE INTERVAL TESTS")
+    print("=" * 60 + "\n")
+
+    test_stable_backoff()
+    test_churn_and_rssi_speed_up()
+    test_known_ssid_drops_to_min()
+    test_empty_scan_is_no_information()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
@@ -0,0 +1,159 @@
+"""
+Test script for compact anomaly_signals documents
+Checks that Phase 4 reaches the same decisions from compact and layered
+signals, and that the compat reader folds layered data correctly
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import bson
+from bson import ObjectId
+
+from services.anomaly_rules import RULE_BITS, layer_mask
+from services.anomaly_signals import compact_from_layered, is_outlier
+from services.phase3_anomaly_engine import Phase3AnomalyEngine
+from services.phase4_decision_engine import Phase4DecisionEngine
+from test_anomaly_rules import _baselines
+
+
+def _phase3_output(count=400, seed=41):
+    baselines = [b for b in _baselines(count, seed) if b.get("ssid") and b.get("bssid")]
+    rng = random.Random(seed)
+    ml_results = {}
+    for baseline in baselines[::3] + baselines[1::3]:
+        score = rng.uniform(-0.3, 0.3)
+        ml_results[(baseline["ssid"], baseline["bssid"])] = {
+            "layer": "ml", "anomaly_score": score, "is_outlier": score < 0
+        }
+
+    engine = Phase3AnomalyEngine.__new__(Phase3AnomalyEngine)
+    masks = engine.apply_rules(baselines)
+    layered = engine.build_layered_signals(baselines, masks, {k: dict(v) for k, v in ml_results.items()})
+    compact = engine.build_compact_signals(baselines, masks, ml_results, revision=7)
+    return baselines, layered, compact
+
+
+def _without_timestamp(decision):
+    decision = dict(decision)
+    decision.pop("timestamp")
+    return decision
+
+
+def test_same_decisions():
+    """Compact signals decide exactly like the three layered documents"""
+    baselines, layered, compact = _phase3_output()
+    phase4 = Phase4DecisionEngine.__new__(Phase4DecisionEngine)
+    grouped = phase4.group_signals_by_network(layered)
+
+    assert len(compact) == len(baselines) and len(layered) > 2 * len(compact)
+    assert len({record["run_id"] for record in compact}) == 1
+    assert compact[0]["model_version"] == "iforest-1@rev7"
+
+    verdicts = set()
+    for record in compact:
+        expected = phase4.make_decision((record["ssid"], record["bssid"]), grouped[(record["ssid"], record["bssid"])])
+        actual = phase4.make_compact_decision(record)
+        assert _without_timestamp(actual) == _without_timestamp(expected), (record, expected)
+        verdicts.add(actual["verdict"])
+
+    assert len(verdicts) > 1
+    print("✅ Compact decisions match layered decisions!\n")
+
+
+def test_newest_format_wins():
+    """Phase 4 decides each network from whichever format was written last"""
+    _, layered, compact = _phase3_output(seed=44)
+    written = datetime(2026, 3, 1, 12, 0, 0)
+    networks = sorted({(record["ssid"], record["bssid"]) for record in compact})
+    switched_back = set(networks[::2])
+
+    for record in compact:
+        # A stale compact run that flagged everything
+        record.update(mask=sum(RULE_BITS.values()), ml_score=-0.5, ts=written)
+    for doc in layered:
+        offset = timedelta(hours=1) if (doc["ssid"], doc["bssid"]) in switched_back else -timedelta(hours=1)
+        doc["_id"] = ObjectId.from_datetime(written + offset)
+    only_compact = dict(compact[0], ssid="Elsewhere")
+
+    phase4 = Phase4DecisionEngine.__new__(Phase4DecisionEngine)
+    grouped = phase4.group_signals_by_network(layered)
+    decisions = {(d["ssid"], d["bssid"]): d for d in phase4.make_decisions(compact + [only_compact], layered)}
+
+    assert len(decisions) == len(networks) + 1
+    for record in compact + [only_compact]:
+        key = (record["ssid"], record["bssid"])
+        if key in switched_back:
+            expected = phase4.make_decision(key, grouped[key])
+        else:
+            expected = phase4.make_compact_decision(record)
+        assert _without_timestamp(decisions[key]) == _without_timestamp(expected), key
+
+    # Layered-only networks are still decided
+    assert set(decisions) >= set(grouped)
+
+    print("✅ Newest signal format wins!\n")
+
+
+def test_compat_reader():
+    """Layered documents fold into the compact record Phase 3 would write"""
+    _, layered, compact = _phase3_output(seed=42)
+    for doc in layered:
+        doc["_id"] = ObjectId()
+
+    folded = {(r["ssid"], r["bssid"]): r for r in compact_from_layered(layered)}
+    assert len(folded) == len(compact)
+    for record in compact:
+        migrated = folded[(record["ssid"], record["bssid"])]
+        assert migrated["mask"] == record["mask"]
+        assert migrated["ml_score"] == record["ml_score"]
+        assert is_outlier(migrated) == is_outlier(record)
+        assert migrated["run_id"] == "migrated"
+
+    # Documents written before this change: no rule_mask, older rule sets
+    legacy = compact_from_layered([
+        {"ssid": "Cafe", "bssid": "aa", "layer": "signature",
+         "signals": {"ssid_reuse": True, "encryption_weak": False, "retired_rule": True}},
+        {"ssid": "Cafe", "bssid": "aa", "layer": "behavior", "signals": {"client_spike": True}},
+        {"ssid": "Cafe", "bssid": "aa", "layer": "ml", "anomaly_score": -0.1, "is_outlier": True},
+    ])[0]
+    phase4 = Phase4DecisionEngine.__new__(Phase4DecisionEngine)
+    assert phase4.explain_mask(legacy) == [
+        "SSID reused across multiple BSSIDs",
+        "Unusual client count spike detected",
+        "ML model flagged this AP as anomalous"
+    ]
+
+    print("✅ Compat reader correct!\n")
+
+
+def test_storage_size():
+    """One compact document replaces up to three, at under 40% of the bytes; layered masks stay per layer"""
+    _, layered, compact = _phase3_output(count=1000, seed=43)
+    layered_bytes = sum(len(bson.encode(doc)) for doc in layered)
+    compact_bytes = sum(len(bson.encode(doc)) for doc in compact)
+    print(f"   documents: {len(layered)} -> {len(compact)}, bytes: {layered_bytes} -> {compact_bytes}")
+
+    assert compact_bytes < 0.4 * layered_bytes
+
+    # Layered rule documents carry only their own layer's bits
+    for doc in layered:
+        if doc["layer"] != "ml":
+            assert doc["rule_mask"] & ~layer_mask(doc["layer"]) == 0, doc
+    assert any(doc["rule_mask"] for doc in layered if doc["layer"] == "behavior")
+    print("✅ Compact storage size correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ANOMALY SIGNAL STORAGE TESTS")
+    print("=" * 60 + "\n")
+
+    test_same_decisions()
+    test_newest_format_wins()
+    test_compat_reader()
+    test_storage_size()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
@@ -0,0 +1,81 @@
+"""
+Test script for the asyncio scan command layer
+Validates concurrency, timeouts and cancellation
+"""
+
+import subprocess
+import sys
+import time
+
+from services.async_scan import run_command, run_commands_sync, run_command_sync, run_sync
+from services.scan_backends import NmcliBackend, scan_all
+
+
+def _sleep_and_print(seconds: float, text: str):
+    return [sys.executable, "-c", f"import time; time.sleep({seconds}); print({text!r})"]
+
+
+def test_commands_run_concurrently():
+    """Several interface scans overlap in one event loop"""
+    started = time.monotonic()
+    results = run_commands_sync({f"wlan{i}": _sleep_and_print(0.5, f"wlan{i}") for i in range(4)})
+    elapsed = time.monotonic() - started
+
+    assert {key: result.stdout.strip() for key, result in results.items()} == {
+        f"wlan{i}": f"wlan{i}" for i in range(4)
+    }
+    assert elapsed < 1.5, elapsed
+    print(f"   4 x 0.5s commands in {elapsed:.2f}s")
+    print("✅ Concurrent execution correct!\n")
+
+
+def test_timeout_and_cancel():
+    """Timeouts raise TimeoutExpired and never leave the process waiting"""
+    started = time.monotonic()
+    try:
+        run_command_sync(_sleep_and_print(5, "late"), timeout=0.3)
+        assert False, "expected timeout"
+    except subprocess.TimeoutExpired:
+        pass
+
+    try:
+        run_sync(run_command(_sleep_and_print(5, "late"), timeout=10), timeout=0.3)
+        assert False, "expected cancellation"
+    except subprocess.TimeoutExpired:
+        pass
+
+    assert time.monotonic() - started < 2
+    print("✅ Timeout / cancellation correct!\n")
+
+
+def test_backends_scan_concurrently():
+    """scan_all returns one output (or exception) per backend"""
+
+    class RecordedNmcli(NmcliBackend):
+        def command(self):
+            return [sys.executable, "-c", "import time; time.sleep(0.3); print('Net:AA\\\\:BB\\\\:CC\\\\:DD\\\\:EE\\\\:01:6:2437 MHz:70:WPA2')"]
+
+    class MissingTool(NmcliBackend):
+        def command(self):
+            return ["netguard-missing-scan-tool"]
+
+    outputs = scan_all([RecordedNmcli("wlan0"), MissingTool("wlan1"), RecordedNmcli("wlan2")])
+
+    assert isinstance(outputs[1], OSError)
+    assert NmcliBackend().parse(outputs[0])[0]["bssid"] == "aa:bb:cc:dd:ee:01"
+    assert outputs[0] == outputs[2]
+    print("✅ Backend fan-out correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ASYNC SCAN TESTS")
+    print("=" * 60 + "\n")
+
+    test_commands_run_concurrently()
+    test_timeout_and_cancel()
+    test_backends_scan_concurrently()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
@@ -0,0 +1,133 @@
+"""
+Test script for windowed / decayed baselines
+Partials are built against in-memory collections and checked against
+statistics computed straight from the raw observations
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from fake_mongo import FakeCollection
+from services.baseline_windows import BaselineWindows, parse_window
+
+NOW = datetime(2026, 3, 10, 12, 30)
+
+
+def _db(raw=(), buckets=()):
+    return {
+        "raw_scans": FakeCollection(raw),
+        "raw_scan_buckets": FakeCollection(buckets),
+        "features_partials": FakeCollection(),
+        "pipeline_meta": FakeCollection()
+    }
+
+
+def _observations(rng, start, end, step, ssid="HomeNet", bssid="aa:bb:cc:dd:ee:01", signal=70):
+    observations = []
+    moment = start
+    while moment < end:
+        observations.append({
+            "ssid": ssid, "bssid": bssid, "observed_at": moment,
+            "signal_percent": signal + rng.randint(-5, 5),
+            "channel_number": rng.choice([6, 6, 6, 11]),
+            "stations_count": rng.randint(0, 12),
+            "encryption": "CCMP", "authentication": "WPA2-Personal"
+        })
+        moment += step
+    return observations
+
+
+def test_windows_match_raw():
+    """Window statistics equal the statistics of the raw observations they cover"""
+    rng = random.Random(3)
+    raw = _observations(rng, NOW - timedelta(days=8), NOW, timedelta(minutes=7))
+    raw += _observations(rng, NOW - timedelta(days=2), NOW, timedelta(minutes=11), bssid="aa:bb:cc:dd:ee:02")
+    bucket = {
+        "ssid": "HomeNet", "bssid": "aa:bb:cc:dd:ee:03", "hour": datetime(2026, 3, 10, 11),
+        "t": [60000 * m for m in range(0, 60, 5)], "s": [40 + m for m in range(12)],
+        "keyframe": {"channel_number": 36, "stations_count": 2}, "changes": {},
+        "last_seen": datetime(2026, 3, 10, 11, 55)
+    }
+    windows = BaselineWindows(_db(raw, [bucket]), ["1h", "24h", "7d"], 60, 24, 0)
+
+    assert windows.update_partials(NOW) > 0
+    stats = windows.compute(NOW)
+    assert len(stats) == 3
+
+    home = stats[("HomeNet", "aa:bb:cc:dd:ee:01")]["windows"]
+    for name in ("1h", "24h", "7d"):
+        # Windows cover whole buckets overlapping (NOW - window, NOW]
+        cutoff = windows.bucket_start(NOW - parse_window(name))
+        covered = [o for o in raw if o["bssid"] == "aa:bb:cc:dd:ee:01" and o["observed_at"] >= cutoff]
+        signals = [o["signal_percent"] for o in covered]
+
+        assert home[name]["observation_count"] == len(covered)
+        assert np.isclose(home[name]["avg_signal"], np.mean(signals))
+        assert np.isclose(home[name]["signal_variance"], np.std(signals))
+        assert home[name]["client_count_max"] == max(o["stations_count"] for o in covered)
+        assert home[name]["avg_channel"] == 6
+
+    from_bucket = stats[("HomeNet", "aa:bb:cc:dd:ee:03")]["windows"]["1h"]
+    assert from_bucket["observation_count"] == 12
+    assert from_bucket["avg_channel"] == 36
+    assert np.isclose(from_bucket["avg_signal"], 45.5)
+
+    print("✅ Window statistics match raw data!\n")
+
+
+def test_incremental_updates():
+    """Runs after the watermark only rebuild recent buckets and match a full rebuild"""
+    rng = random.Random(5)
+    raw = _observations(rng, NOW - timedelta(days=3), NOW - timedelta(minutes=20), timedelta(minutes=9))
+    db = _db(raw)
+    windows = BaselineWindows(db, ["1h", "24h"], 60, 24, 0)
+    windows.update_partials(NOW - timedelta(minutes=20))
+
+    # New data plus a late record inside the bucket that was still open
+    late = _observations(rng, NOW - timedelta(minutes=25), NOW - timedelta(minutes=24), timedelta(minutes=1))
+    db["raw_scans"].docs += late + _observations(rng, NOW - timedelta(minutes=20), NOW, timedelta(minutes=3))
+    written = windows.update_partials(NOW)
+    assert written == 1
+
+    fresh = BaselineWindows(_db(db["raw_scans"].docs), ["1h", "24h"], 60, 24, 0)
+    fresh.update_partials(NOW)
+    assert windows.compute(NOW) == fresh.compute(NOW)
+
+    print("✅ Incremental partials correct!\n")
+
+
+def test_decay_tracks_recent_behavior():
+    """A recent signal change dominates the decayed and short-window baselines"""
+    rng = random.Random(9)
+    raw = _observations(rng, NOW - timedelta(days=7), NOW - timedelta(hours=1), timedelta(minutes=10), signal=40)
+    raw += _observations(rng, NOW - timedelta(hours=1), NOW, timedelta(minutes=2), signal=90)
+    db = _db(raw)
+    db["features_partials"].docs.append({"ssid": "Old", "bssid": "x", "bucket": NOW - timedelta(days=30)})
+    windows = BaselineWindows(db, ["1h", "7d"], 60, 6, 0)
+    windows.update_partials(NOW)
+
+    stats = windows.compute(NOW)[("HomeNet", "aa:bb:cc:dd:ee:01")]
+    all_time = np.mean([o["signal_percent"] for o in raw])
+    assert stats["windows"]["1h"]["avg_signal"] > 75
+    assert stats["decayed"]["avg_signal"] > stats["windows"]["7d"]["avg_signal"]
+    assert stats["windows"]["7d"]["avg_signal"] < all_time + 5
+    # Partials older than the longest window are pruned
+    assert all(p["bucket"] > NOW - timedelta(days=8) for p in db["features_partials"].docs)
+
+    print("✅ Decayed baseline follows recent behavior!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("BASELINE WINDOW TESTS")
+    print("=" * 60 + "\n")
+
+    test_windows_match_raw()
+    test_incremental_updates()
+    test_decay_tracks_recent_behavior()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
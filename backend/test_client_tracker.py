@@ -0,0 +1,112 @@
+"""
+Test script for the memory-bounded client tracker
+Validates exact/approximate counting and the LRU cap
+"""
+
+from services.client_tracker import ClientTracker, HyperLogLog
+
+
+def _mac(i: int) -> str:
+    return ":".join(f"{(i >> shift) & 0xFF:02x}" for shift in (40, 32, 24, 16, 8, 0))
+
+
+def test_exact_counts_below_limit():
+    """Small station sets stay exact, with zero error bound"""
+    tracker = ClientTracker(max_bssids=10, approximate=True, exact_limit=64)
+
+    for i in range(20):
+        tracker.add("aa:aa:aa:aa:aa:01", _mac(i))
+        tracker.add("aa:aa:aa:aa:aa:01", _mac(i))  # duplicates ignored
+
+    assert tracker.count("aa:aa:aa:aa:aa:01") == 20
+    assert tracker.error_bound("aa:aa:aa:aa:aa:01") == 0.0
+    assert tracker.is_exact("aa:aa:aa:aa:aa:01")
+    assert len(tracker.stations("aa:aa:aa:aa:aa:01")) == 20
+
+    print("✅ Exact counts correct!\n")
+
+
+def test_approximate_counts_within_error():
+    """Large station sets switch to HyperLogLog and stay within ~3 std errors"""
+    tracker = ClientTracker(max_bssids=10, approximate=True, exact_limit=64, precision=10)
+    true_count = 5000
+
+    for i in range(true_count):
+        tracker.add("aa:aa:aa:aa:aa:02", _mac(i))
+
+    estimate = tracker.count("aa:aa:aa:aa:aa:02")
+    error = tracker.error_bound("aa:aa:aa:aa:aa:02")
+    print(f"  Estimate: {estimate} ± {error} (true {true_count})")
+
+    assert not tracker.is_exact("aa:aa:aa:aa:aa:02")
+    assert tracker.stations("aa:aa:aa:aa:aa:02") == []
+    assert error > 0
+    assert abs(estimate - true_count) <= 3 * error
+
+    print("✅ Approximate counts correct!\n")
+
+
+def test_exact_mode_never_promotes():
+    """Without approximate mode the counter stays exact"""
+    tracker = ClientTracker(max_bssids=10, approximate=False, exact_limit=8)
+
+    for i in range(100):
+        tracker.add("aa:aa:aa:aa:aa:03", _mac(i))
+
+    assert tracker.is_exact("aa:aa:aa:aa:aa:03")
+    assert tracker.count("aa:aa:aa:aa:aa:03") == 100
+
+    print("✅ Exact mode correct!\n")
+
+
+def test_lru_cap():
+    """Least recently seen BSSIDs are evicted past the cap"""
+    tracker = ClientTracker(max_bssids=3)
+
+    tracker.add("bssid-1", "sta")
+    tracker.add("bssid-2", "sta")
+    tracker.add("bssid-3", "sta")
+    tracker.add("bssid-1", "sta2")  # refresh bssid-1
+    tracker.add("bssid-4", "sta")   # evicts bssid-2
+
+    assert len(tracker) == 3
+    assert "bssid-2" not in tracker
+    assert "bssid-1" in tracker
+    assert tracker.get_stats()["evicted_bssids"] == 1
+
+    print("✅ LRU cap correct!\n")
+
+
+def test_hyperloglog_merge():
+    """Merged sketches estimate the union"""
+    a = HyperLogLog(precision=10)
+    b = HyperLogLog(precision=10)
+
+    for i in range(3000):
+        a.add(_mac(i))
+    for i in range(2000, 5000):
+        b.add(_mac(i))
+
+    a.merge(b)
+    estimate = a.estimate()
+
+    assert abs(estimate - 5000) <= 3 * 5000 * a.relative_error
+
+    print("✅ HyperLogLog merge correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Client Tracker - Validation Tests")
+    print("=" * 60)
+    print()
+
+    test_exact_counts_below_limit()
+    test_approximate_counts_within_error()
+    test_exact_mode_never_promotes()
+    test_lru_cap()
+    test_hyperloglog_merge()
+
+    print("=" * 60)
+    print("🎉 ALL TESTS PASSED")
+    print("=" * 60)
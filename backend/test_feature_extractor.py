@@ -0,0 +1,190 @@
+"""
+Test script for the feature registry and FeatureExtractor batch
+Checks the vectorized schemas against the original per-row formulas
+"""
+
+import random
+
+import numpy as np
+
+from services.feature_extractor import FeatureExtractor
+from services.feature_registry import BASELINE_FEATURES, INFERENCE_FEATURES, NETWORK_FEATURES
+from services.oui_lookup import lookup_vendor
+
+ENCRYPTIONS = ['Open', 'WEP', 'WPA', 'WPA2', 'WPA3', 'WPA/WPA2', 'SAE']
+VENDORS = ['Apple', 'TP-Link', 'Unknown', 'Ubiquiti', None]
+
+
+def _networks(count: int, seed: int):
+    """Random scan with dense SSID / channel groups and missing fields"""
+    rng = random.Random(seed)
+    networks = []
+    for i in range(count):
+        network = {
+            'bssid': f"02:00:00:{(i >> 16) & 0xff:02x}:{(i >> 8) & 0xff:02x}:{i & 0xff:02x}",
+            'ssid': rng.choice([f"Net{rng.randrange(count // 3 + 1)}", 'Corp', '', None]),
+            'signal_strength': rng.choice([rng.randint(-95, -30), rng.uniform(-95, -30)]),
+            'channel': rng.choice([1, 6, 11, 36, 149, 6.0]),
+            'encryption': rng.choice(ENCRYPTIONS),
+            'vendor': rng.choice(VENDORS),
+            'is_hidden': rng.random() < 0.1,
+            'frequency': rng.choice([2437, 5180, 5955])
+        }
+        for field in ('ssid', 'signal_strength', 'channel', 'encryption', 'frequency'):
+            if rng.random() < 0.05:
+                del network[field]
+        networks.append(network)
+    return networks
+
+
+def _reference_network_row(network, all_networks):
+    """FeatureExtractor.extract_features before the registry (per-row scans)"""
+    encryption_types = {'Open': 0, 'WEP': 1, 'WPA': 2, 'WPA2': 3, 'WPA3': 4, 'WPA/WPA2': 2.5}
+    strength = {'Open': 0.0, 'WEP': 0.2, 'WPA': 0.5, 'WPA2': 0.8, 'WPA3': 1.0, 'WPA/WPA2': 0.7}
+    trust = {'Apple': 0.95, 'Cisco': 0.95, 'Linksys': 0.85, 'TP-Link': 0.85, 'Netgear': 0.85,
+             'Asus': 0.85, 'D-Link': 0.80, 'Belkin': 0.80, 'Ubiquiti': 0.90, 'Unknown': 0.30,
+             'VMware': 0.50, 'VirtualBox': 0.50}
+    encryption = network.get('encryption', 'Open')
+    ssid = network.get('ssid', '')
+    same_ssid = [n for n in all_networks if n.get('ssid') == ssid]
+    variance = min(np.var([n.get('signal_strength', -80) for n in same_ssid]) / 100.0, 1.0) \
+        if len(same_ssid) > 1 else 0.0
+    channel = network.get('channel', 0)
+    return np.array([
+        network.get('signal_strength', -80),
+        channel,
+        encryption_types.get(encryption, 0),
+        1 if network.get('is_hidden', False) else 0,
+        trust.get(network.get('vendor') or lookup_vendor(network.get('bssid', '')), 0.50),
+        variance,
+        len(same_ssid) - 1,
+        min(sum(1 for n in all_networks if n.get('channel') == channel) / 10.0, 1.0),
+        1 if network.get('frequency', 2437) > 5000 else 0,
+        strength.get(encryption, 0.5)
+    ])
+
+
+def _reference_inference_row(network, known_networks):
+    """MLInference.extract_features_from_network before the registry"""
+    client_count = network.get("client_count", 0)
+    similarity = 0.0
+    for known in known_networks or []:
+        s1, s2 = network.get("ssid", ""), known.get("ssid", "")
+        if s1 and s2:
+            matches = sum(1 for a, b in zip(s1, s2) if a == b)
+            similarity = max(similarity, matches / max(len(s1), len(s2)))
+    return np.array([
+        network.get("signal_strength", -80),
+        0 if network.get("channel") else 10,
+        {"Open": 0, "WEP": 1, "WPA": 2, "WPA2": 3}.get(network.get("encryption", "Open"), 0),
+        {"Apple": 0.95, "Linksys": 0.85, "TP-Link": 0.80, "Unknown": 0.40}.get(
+            network.get("vendor") or lookup_vendor(network.get("bssid", "")), 0.5),
+        0.2 if network.get("is_hidden") else 0.1,
+        0.7 if client_count > 30 else (0.4 if client_count > 10 else 0.1),
+        min(client_count / 50, 1.0),
+        similarity
+    ])
+
+
+def _reference(row, networks, context):
+    return np.array([row(network, context) for network in networks]).astype(np.float32)
+
+
+def test_network_schema():
+    """Batch output equals the original per-network extraction"""
+    extractor = FeatureExtractor()
+
+    for seed, count in ((1, 1), (2, 2), (3, 50), (4, 400)):
+        networks = _networks(count, seed)
+        batch = extractor.extract_features_batch(networks)
+
+        assert batch.dtype == np.float32 and batch.flags['C_CONTIGUOUS']
+        assert batch.shape == (count, len(extractor.get_feature_names()))
+        assert np.array_equal(batch, _reference(_reference_network_row, networks, networks)), \
+            f"mismatch for seed {seed}"
+        assert np.array_equal(batch[0], extractor.extract_features(networks[0], networks))
+
+    # 'Corp' is one large group: variance must come out of np.var unchanged
+    corp = [{'ssid': 'Corp', 'signal_strength': -40 - (i * 7) % 23 + 0.1 * i, 'channel': 6}
+            for i in range(40)]
+    assert np.array_equal(extractor.extract_features_batch(corp),
+                          _reference(_reference_network_row, corp, corp))
+
+    print("✅ Network schema matches per-network extraction!\n")
+
+
+def test_network_schema_edge_cases():
+    """Empty scans and networks without an 'ssid' key keep their old values"""
+    extractor = FeatureExtractor()
+    assert extractor.extract_features_batch([]).shape == (0, len(NETWORK_FEATURES))
+
+    networks = [{'bssid': 'aa:bb:cc:00:00:01', 'channel': 6}, {'ssid': None, 'signal_strength': -50}]
+    batch = extractor.extract_features_batch(networks)
+    # Missing key looks up '' (no members) -> -1; but counts as a None member
+    assert batch[0, 6] == -1
+    assert batch[1, 6] == 1
+
+    print("✅ Network schema edge cases correct!\n")
+
+
+def test_inference_and_baseline_schemas():
+    """MLInference and Phase 3 matrices keep their original values"""
+    rng = random.Random(7)
+    networks = _networks(120, 5)
+    for network in networks:
+        network['client_count'] = rng.choice([0, 5, 11, 31, 60])
+    known = _networks(30, 6) + [{'ssid': 'Net1x'}, {'ssid': ''}, {}]
+
+    for context in (known, []):
+        matrix = INFERENCE_FEATURES.build(networks, context=context)
+        assert np.array_equal(matrix, _reference(_reference_inference_row, networks, context))
+
+    baselines = [
+        {'avg_signal': -61.5, 'signal_variance': 2.5, 'channel_variance': 0,
+         'client_count_avg': 3.2, 'client_count_max': 7, 'observation_count': 40},
+        {'avg_signal': None, 'observation_count': 3},
+        {}
+    ]
+    expected = np.array([[-61.5, 2.5, 0, 3.2, 7, 40], [0, 0, 0, 0, 0, 3], [-100, 0, 0, 0, 0, 0]],
+                        dtype=np.float32)
+    assert np.array_equal(BASELINE_FEATURES.build(baselines), expected)
+
+    print("✅ Inference and baseline schemas correct!\n")
+
+
+def test_validate():
+    """Fitted models are checked against the schema they are fed with"""
+    class Model:
+        n_features_in_ = 8
+
+    INFERENCE_FEATURES.validate(Model())
+    for schema in (NETWORK_FEATURES, BASELINE_FEATURES):
+        try:
+            schema.validate(Model(), "rf_model")
+            assert False, "feature count mismatch accepted"
+        except ValueError as e:
+            assert "rf_model expects 8 features" in str(e)
+
+    Model.feature_names_in_ = np.array(INFERENCE_FEATURES.names[::-1])
+    try:
+        INFERENCE_FEATURES.validate(Model())
+        assert False, "reordered feature names accepted"
+    except ValueError:
+        pass
+
+    print("✅ Schema validation correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("FEATURE EXTRACTOR TESTS")
+    print("=" * 60 + "\n")
+
+    test_network_schema()
+    test_network_schema_edge_cases()
+    test_inference_and_baseline_schemas()
+    test_validate()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
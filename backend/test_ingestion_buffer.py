@@ -0,0 +1,189 @@
+"""
+Test script for the ingestion buffer
+Validates size/age flushes, the backpressure policies, requeue on
+failure and the metrics against an in-memory collection
+"""
+
+import threading
+import time
+
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from fake_mongo import FakeCollection
+from services.ingestion_buffer import IngestionBuffer
+
+
+class InsertResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
+class FlakyCollection(FakeCollection):
+    """insert_many target that can fail or stall on demand"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self.fail_next = 0
+        self.duplicates = set()
+        # Called inside insert_many, like a producer racing the write
+        self.during_insert = None
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def insert_many(self, records, ordered=True):
+        assert not ordered
+        self.gate.wait(5)
+        if self.during_insert:
+            self.during_insert()
+        if self.fail_next:
+            self.fail_next -= 1
+            raise AutoReconnect("connection lost")
+
+        written = [record for record in records if record["n"] not in self.duplicates]
+        self.batches.append(written)
+        super().insert_many(written, ordered)
+        if len(written) < len(records):
+            raise BulkWriteError({"nInserted": len(written), "writeErrors": [{"code": 11000}]})
+        return InsertResult(list(range(len(written))))
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_size_and_age_flush():
+    """Full batches go out at once; a partial batch waits for max_age"""
+    collection = FlakyCollection()
+    buffer = IngestionBuffer(collection, max_batch=10, max_age=0.3, max_pending=100)
+    buffer.start()
+    try:
+        buffer.add_many([{"n": n} for n in range(25)])
+        _wait_until(lambda: len(collection.docs) == 20)
+        assert [len(batch) for batch in collection.batches] == [10, 10]
+        assert buffer.pending_count() == 5
+
+        started = time.monotonic()
+        _wait_until(lambda: len(collection.docs) == 25)
+        assert time.monotonic() - started > 0.1
+    finally:
+        buffer.stop()
+
+    assert [doc["n"] for doc in collection.docs] == list(range(25))
+
+    # stop() writes out what is left
+    buffer.add_many([{"n": n} for n in range(25, 28)])
+    buffer.stop()
+    assert len(collection.docs) == 28 and buffer.pending_count() == 0
+
+    print("✅ Size and age flushes correct!\n")
+
+
+def test_drop_policies():
+    """A full buffer drops the oldest or the newest record"""
+    for policy, kept in (("drop_oldest", list(range(5, 15))), ("drop_newest", list(range(10)))):
+        collection = FlakyCollection()
+        buffer = IngestionBuffer(collection, max_batch=10, max_pending=10, policy=policy)
+        buffer.add_many([{"n": n} for n in range(15)])
+        assert buffer.pending_count() == 10
+        buffer.stop()
+        assert [doc["n"] for doc in collection.docs] == kept, policy
+        assert (buffer.records_added, buffer.records_dropped) == ((15, 5) if policy == "drop_oldest" else (10, 5))
+
+    try:
+        IngestionBuffer(FlakyCollection(), policy="spill")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+    print("✅ Drop policies correct!\n")
+
+
+def test_block_policy():
+    """Blocked producers wait for the flusher; without one they write a batch themselves"""
+    collection = FlakyCollection()
+    buffer = IngestionBuffer(collection, max_batch=5, max_age=10, max_pending=5, policy="block")
+    collection.gate.clear()
+    buffer.start()
+    try:
+        producer = threading.Thread(target=buffer.add_many, args=([{"n": n} for n in range(12)],), daemon=True)
+        producer.start()
+        producer.join(0.5)
+        assert producer.is_alive(), "producer must block while the insert stalls"
+        assert buffer.pending_count() <= 5
+
+        collection.gate.set()
+        producer.join(5)
+        assert not producer.is_alive()
+    finally:
+        buffer.stop()
+    assert [doc["n"] for doc in collection.docs] == list(range(12))
+    assert buffer.records_dropped == 0
+
+    # Not started: add() flushes inline and memory stays bounded
+    collection = FlakyCollection()
+    buffer = IngestionBuffer(collection, max_batch=5, max_pending=5, policy="block")
+    for n in range(23):
+        buffer.add({"n": n})
+        assert buffer.pending_count() <= 5
+    assert len(collection.docs) == 20 and buffer.records_dropped == 0
+
+    # A failing write rejects the record instead of growing past the bound
+    collection.fail_next = 10
+    for n in range(23, 30):
+        buffer.add({"n": n})
+    assert buffer.pending_count() == 5
+    assert len(collection.docs) == 20 and buffer.records_dropped == 5
+
+    print("✅ Block policy correct!\n")
+
+
+def test_requeue_and_metrics():
+    """Failed writes are requeued in order; duplicate-key errors count as failed records"""
+    collection = FlakyCollection()
+    buffer = IngestionBuffer(collection, max_batch=4, max_pending=6)
+    buffer.add_many([{"n": n} for n in range(6)])
+
+    collection.fail_next = 1
+    assert buffer.flush() == 0
+    assert buffer.pending_count() == 6
+
+    # Requeueing into a buffer that filled up during the write keeps the batch's newest records
+    collection.fail_next = 1
+    collection.during_insert = lambda: buffer.add_many([{"n": n} for n in (6, 7, 8)])
+    assert buffer.flush() == 0
+    collection.during_insert = None
+    assert buffer.pending_count() == 6
+    assert buffer.records_dropped == 3
+
+    collection.duplicates = {4}
+    buffer.stop()
+    assert [doc["n"] for doc in collection.docs] == [3, 5, 6, 7, 8]
+
+    metrics = buffer.get_metrics()
+    assert {key: metrics[key] for key in ("pending", "records_added", "records_inserted", "records_dropped",
+                                          "records_failed", "flush_errors", "policy")} == {
+        "pending": 0, "records_added": 9, "records_inserted": 5, "records_dropped": 3,
+        "records_failed": 1, "flush_errors": 2, "policy": "drop_oldest"
+    }
+    assert metrics["flush_latency"]["count"] == 2
+
+    print("✅ Requeue and metrics correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("INGESTION BUFFER TESTS")
+    print("=" * 60 + "\n")
+
+    test_size_and_age_flush()
+    test_drop_policies()
+    test_block_policy()
+    test_requeue_and_metrics()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
@@ -0,0 +1,113 @@
+"""
+Test script for the live scan buffer
+Validates delta coalescing, the flush interval and live_flush_ms parsing
+"""
+
+import time
+
+from services.live_scan_buffer import MAX_FLUSH_MS, MIN_FLUSH_MS, LiveScanBuffer, parse_flush_interval
+from services.network_scanner import NetworkScanner
+
+
+def _network(bssid: str, signal: int):
+    return {"bssid": bssid, "ssid": "Home", "channel": 6, "signal_strength": signal, "encryption": "WPA2",
+            "is_hidden": False, "timestamp": "2026-01-01T00:00:00", "vendor": "Cisco"}
+
+
+def test_coalescing():
+    """Deltas for one BSSID collapse into a single entry per flush"""
+    scanner = NetworkScanner("wlan0")
+    payloads = []
+    buffer = LiveScanBuffer(payloads.append, "scan-1", client_count=scanner.clients.count)
+    scanner.delta_listener = buffer
+
+    scanner.update_network(_network("aa:00:00:00:00:01", -70))
+    scanner.update_network(_network("aa:00:00:00:00:01", -65))
+    scanner.update_network(_network("aa:00:00:00:00:01", -65))
+    for station in range(3):
+        scanner.track_client("aa:00:00:00:00:01", f"02:00:00:00:00:0{station}")
+    scanner.track_client("aa:00:00:00:00:01", "02:00:00:00:00:00")
+
+    assert buffer.flush()
+    payload = payloads[-1]
+    assert (payload["scan_id"], payload["seq"]) == ("scan-1", 1)
+    assert [(n["bssid"], n["signal_strength"]) for n in payload["new_networks"]] == [("aa:00:00:00:00:01", -65)]
+    assert payload["rssi"] == {}
+    assert payload["clients"] == {"aa:00:00:00:00:01": 3}
+
+    # Known networks only report their latest RSSI; nothing pending, nothing emitted
+    for signal in (-60, -58, -55):
+        scanner.update_network(_network("aa:00:00:00:00:01", signal))
+    assert buffer.flush()
+    assert payloads[-1]["new_networks"] == [] and payloads[-1]["rssi"] == {"aa:00:00:00:00:01": -55}
+    assert not buffer.flush()
+
+    # A re-added network supersedes its pending RSSI update
+    buffer.rssi_updated("aa:00:00:00:00:02", -80)
+    buffer.network_added(_network("aa:00:00:00:00:02", -75))
+    assert buffer.flush()
+    assert payloads[-1]["rssi"] == {} and payloads[-1]["new_networks"][0]["signal_strength"] == -75
+
+    # Repeated RSSI values and known stations are not deltas
+    assert buffer.get_stats() == {"flushes": 3, "deltas_received": 10, "entries_emitted": 4}
+
+    print("✅ Delta coalescing correct!\n")
+
+
+def test_flush_interval():
+    """The flush thread emits once per interval and stop() publishes the rest"""
+    payloads = []
+    buffer = LiveScanBuffer(payloads.append, "scan-2", flush_interval_ms=100)
+    buffer.start()
+    try:
+        started = time.monotonic()
+        while time.monotonic() - started < 0.55:
+            buffer.rssi_updated("aa:00:00:00:00:01", -60)
+            time.sleep(0.005)
+    finally:
+        buffer.stop()
+
+    assert 4 <= len(payloads) <= 7, len(payloads)
+    assert [payload["seq"] for payload in payloads] == list(range(1, len(payloads) + 1))
+    assert all(payload["rssi"] == {"aa:00:00:00:00:01": -60} for payload in payloads)
+
+    buffer.rssi_updated("aa:00:00:00:00:01", -61)
+    buffer.stop()
+    assert payloads[-1]["rssi"] == {"aa:00:00:00:00:01": -61}
+
+    assert LiveScanBuffer(print, "x", flush_interval_ms=0).flush_interval == MIN_FLUSH_MS / 1000.0
+    assert LiveScanBuffer(print, "x", flush_interval_ms=10 ** 9).flush_interval == MAX_FLUSH_MS / 1000.0
+
+    print("✅ Flush interval correct!\n")
+
+
+def test_parse_flush_interval():
+    """live_flush_ms accepts numbers and numeric strings, clamped; anything else is rejected"""
+    assert parse_flush_interval(250) == 250
+    assert parse_flush_interval("750") == 750
+    assert parse_flush_interval(120.9) == 120
+    assert parse_flush_interval(1) == MIN_FLUSH_MS
+    assert parse_flush_interval("1e9") == MAX_FLUSH_MS
+
+    for value in (0, -5, "abc", None, True, [500], {"ms": 500}, "inf", float("nan")):
+        try:
+            parse_flush_interval(value)
+            assert False, f"expected ValueError for {value!r}"
+        except ValueError:
+            pass
+
+    print("✅ live_flush_ms parsing correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("LIVE SCAN BUFFER TESTS")
+    print("=" * 60 + "\n")
+
+    test_coalescing()
+    test_flush_interval()
+    test_parse_flush_interval()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
@@ -0,0 +1,84 @@
+"""
+Test script for the shared vendor lookup
+Validates registry loading, longest-prefix matching and fallback
+"""
+
+import os
+import tempfile
+
+from services.oui_lookup import UNKNOWN_VENDOR, VendorLookup
+
+
+def _write_registry(directory: str):
+    with open(os.path.join(directory, "oui.csv"), "w") as f:
+        f.write("Registry,Assignment,Organization Name,Organization Address\n")
+        f.write('MA-L,001A2B,"Apple, Inc.",1 Infinite Loop Cupertino CA US\n')
+        f.write("MA-L,70B3D5,IEEE Registration Authority,445 Hoes Lane Piscataway NJ US\n")
+        f.write("MA-L,8C1F64,IEEE Registration Authority,445 Hoes Lane Piscataway NJ US\n")
+    with open(os.path.join(directory, "mam.csv"), "w") as f:
+        f.write("Registry,Assignment,Organization Name,Organization Address\n")
+        f.write("MA-M,8C1F645,Acme Sensors Ltd,Somewhere\n")
+    with open(os.path.join(directory, "oui36.csv"), "w") as f:
+        f.write("Registry,Assignment,Organization Name,Organization Address\n")
+        f.write('MA-S,70B3D5F2A,"TP-LINK TECHNOLOGIES CO.,LTD.",Shenzhen CN\n')
+
+
+def test_longest_prefix_match():
+    """36-bit and 28-bit assignments win over their 24-bit parent block"""
+    with tempfile.TemporaryDirectory() as directory:
+        _write_registry(directory)
+        lookup = VendorLookup(directory)
+
+        assert lookup.registry_loaded
+        assert lookup.lookup("00:1a:2b:11:22:33") == "Apple"
+        assert lookup.lookup("8C:1F:64:51:22:33") == "Acme Sensors Ltd"
+        assert lookup.lookup("8C:1F:64:61:22:33") == "IEEE Registration Authority"
+        assert lookup.lookup("70-B3-D5-F2-A1-23") == "TP-Link"
+        assert lookup.lookup("70:B3:D5:F2:B1:23") == "IEEE Registration Authority"
+        assert lookup.lookup("12:34:56:78:9A:BC") == UNKNOWN_VENDOR
+
+    print("✅ Longest-prefix match correct!\n")
+
+
+def test_prefix_only_and_invalid_input():
+    """Bare OUIs resolve at 24 bits; garbage never raises"""
+    with tempfile.TemporaryDirectory() as directory:
+        _write_registry(directory)
+        lookup = VendorLookup(directory)
+
+        assert lookup.lookup("00:1A:2B") == "Apple"
+        assert lookup.lookup("") == UNKNOWN_VENDOR
+        assert lookup.lookup("zz:zz:zz") == UNKNOWN_VENDOR
+        assert lookup.lookup("00:1A:2B:11:22:33:44") == UNKNOWN_VENDOR
+
+    print("✅ Prefix and invalid input handling correct!\n")
+
+
+def test_builtin_fallback_and_memoization():
+    """Without registry files the built-in table is used, results are cached"""
+    lookup = VendorLookup(registry_dir=None)
+
+    assert not lookup.registry_loaded
+    assert lookup.lookup("00:23:6C:00:00:01") == "Apple"
+    assert lookup.lookup("00:23:6C:00:00:01") == "Apple"
+
+    stats = lookup.get_stats()
+    assert stats["cache_hits"] == 1
+    assert stats["cache_misses"] == 1
+
+    print("✅ Fallback and memoization correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Vendor Lookup - Validation Tests")
+    print("=" * 60)
+    print()
+
+    test_longest_prefix_match()
+    test_prefix_only_and_invalid_input()
+    test_builtin_fallback_and_memoization()
+
+    print("=" * 60)
+    print("🎉 ALL TESTS PASSED")
+    print("=" * 60)
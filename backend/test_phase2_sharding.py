@@ -0,0 +1,142 @@
+"""
+Test script for sharded Phase 2 execution
+Runs the shards in-process against in-memory collections and compares
+the baselines with a single-process run
+"""
+
+from datetime import datetime
+
+import services.baseline_windows as baseline_windows
+from fake_mongo import FakeCollection
+from services.baseline_windows import BaselineWindows
+from services.phase2_feature_extractor import Phase2FeatureExtractor, partition_keys, shard_of
+from services.scan_buckets import ScanBucketWriter
+from services.scan_normalizer import normalize_record
+from test_scan_buckets import _scans
+
+NOW = datetime(2026, 1, 5, 13, 0)
+
+
+def _extractor():
+    records = [normalize_record(r) for r in _scans(hours=1, interval=60, bssids=30)]
+    buckets = FakeCollection()
+    writer = ScanBucketWriter(buckets)
+    for record in records[1::2]:
+        writer.add(record)
+    writer.flush()
+
+    db = {
+        "raw_scans": FakeCollection(records[::2]),
+        "raw_scan_buckets": FakeCollection(buckets.docs),
+        "features_baseline": FakeCollection(),
+        "features_partials": FakeCollection(),
+        "pipeline_meta": FakeCollection()
+    }
+    extractor = Phase2FeatureExtractor.__new__(Phase2FeatureExtractor)
+    extractor.db = db
+    extractor.raw_collection = db["raw_scans"]
+    extractor.bucket_collection = db["raw_scan_buckets"]
+    extractor.features_collection = db["features_baseline"]
+    extractor.windows = BaselineWindows(db, ["1h"], 60, 24, 0)
+    return extractor
+
+
+def _baselines(extractor):
+    docs = {}
+    for doc in extractor.features_collection.docs:
+        doc = dict(doc)
+        doc.pop("updated_at")
+        docs[(doc["ssid"], doc["bssid"])] = doc
+    return docs
+
+
+def test_partitioning():
+    """Every key lands in exactly one shard, the same one on every run"""
+    keys = {(f"Net{n % 7}", f"aa:bb:cc:00:{n // 256:02x}:{n % 256:02x}") for n in range(2000)}
+    partitions = partition_keys(keys, 8)
+
+    assert sum(len(p) for p in partitions) == len(keys)
+    assert set().union(*partitions) == keys
+    assert all(150 < len(p) < 350 for p in partitions)
+    assert [set(p) for p in partitions] == [set(p) for p in partition_keys(sorted(keys), 8)]
+    assert shard_of("Net1", "aa:bb:cc:00:00:01", 8) == shard_of("Net1", "aa:bb:cc:00:00:01", 8)
+
+    print("✅ Key partitioning correct!\n")
+
+
+def test_sharded_matches_single():
+    """Shards plus the reduce step produce the single-process baselines"""
+    single = _extractor()
+    single.run_single(NOW)
+
+    sharded = _extractor()
+    keys = sharded.list_keys()
+    results = [sharded.run_shard(shard, shard_keys, NOW)
+               for shard, shard_keys in enumerate(partition_keys(keys, 3))]
+    totals = sharded.reduce_ssid_counts(results)
+
+    assert len(keys) == 30
+    assert sum(result["keys"] for result in results) == 30
+    assert totals["Net0"] == 3 and totals["Net11"] == 2
+    assert all(result["seconds"] >= result["write_seconds"] for result in results)
+    # One bulk write per shard plus the reduce, no per-document round trips
+    assert sharded.features_collection.bulk_writes == 4
+
+    expected = _baselines(single)
+    actual = _baselines(sharded)
+    assert expected.keys() == actual.keys()
+    for key in expected:
+        assert expected[key] == actual[key], (expected[key], actual[key])
+
+    print("✅ Sharded baselines match single-process run!\n")
+
+
+def _aliased():
+    """Every even BSSID also advertises SSID "Alias" (one AP, two SSIDs)"""
+    extractor = _extractor()
+    raw = extractor.raw_collection.docs
+    raw.extend(dict(doc, ssid="Alias") for doc in list(raw) if int(doc["bssid"][-2:], 16) % 2 == 0)
+
+    extractor.db["features_partials"] = FakeCollection()
+    extractor.db["pipeline_meta"] = FakeCollection()
+    extractor.windows = BaselineWindows(extractor.db, ["24h"], 60, 24, 0)
+    extractor.windows.update_partials(NOW)
+    return extractor
+
+
+def test_small_key_chunks():
+    """Keys matched by several $in chunk queries are still read once"""
+    single = _aliased()
+    single.run_single(NOW)
+
+    chunked = _aliased()
+    previous = baseline_windows.KEY_CHUNK
+    baseline_windows.KEY_CHUNK = 2
+    try:
+        chunked.run_shard(0, chunked.list_keys(), NOW)
+    finally:
+        baseline_windows.KEY_CHUNK = previous
+
+    expected = _baselines(single)
+    actual = _baselines(chunked)
+    assert expected.keys() == actual.keys()
+    for key in expected:
+        for field in ("observation_count", "avg_signal", "signal_variance", "windows", "decayed",
+                      "signal_sketch", "client_sketch", "signal_p50"):
+            assert expected[key].get(field) == actual[key].get(field), (key, field)
+
+    print("✅ Small key chunks correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("PHASE 2 SHARDING TESTS")
+    print("=" * 60 + "\n")
+
+    test_partitioning()
+    test_sharded_matches_single()
+    test_small_key_chunks()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
@@ -0,0 +1,144 @@
+"""
+Test script for chunked Phase 3 scoring
+Streams baselines from an in-memory collection and compares the signals
+with the in-memory run over the same baselines
+"""
+
+import numpy as np
+
+from config import Config
+from fake_mongo import FakeCollection
+from services.phase3_anomaly_engine import Phase3AnomalyEngine, chunk_by_ssid, reservoir_sample
+from test_anomaly_rules import _baselines
+
+
+def _sort_key(doc):
+    # MongoDB sorts null before strings
+    return (doc.get("ssid") is not None, doc.get("ssid") or "", doc.get("bssid") or "")
+
+
+def _engine(baselines):
+    engine = Phase3AnomalyEngine.__new__(Phase3AnomalyEngine)
+    engine.features_collection = FakeCollection(baselines)
+    engine.anomaly_collection = FakeCollection()
+    return engine
+
+
+def test_chunking_and_sampling():
+    """Chunks keep small SSIDs whole and split large ones; the reservoir is uniform and keeps small streams intact"""
+    baselines = sorted(_baselines(500, seed=3), key=_sort_key)
+    chunks = list(chunk_by_ssid(baselines, 40))
+
+    assert sum(len(chunk) for chunk in chunks) == len(baselines)
+    assert all(40 <= len(chunk) < 80 for chunk in chunks[:-1])
+    ssids = [{doc.get("ssid") for doc in chunk} for chunk in chunks]
+    assert all(not a & b for a, b in zip(ssids, ssids[1:]))
+
+    docs = [dict(doc, ssid="Big") for doc in baselines[:95]] + baselines[95:120]
+    chunks = list(chunk_by_ssid(sorted(docs, key=_sort_key), 20))
+    assert [doc for chunk in chunks for doc in chunk] == sorted(docs, key=_sort_key)
+    assert all(len(chunk) < 40 for chunk in chunks)
+    big = [chunk for chunk in chunks if any(doc["ssid"] == "Big" for doc in chunk)]
+    assert [len(chunk) for chunk in big] == [20, 20, 20, 20, 15]
+    assert all({doc["ssid"] for doc in chunk} == {"Big"} for chunk in big)
+
+    rows = np.arange(20000, dtype=np.float32).reshape(-1, 2)
+    matrices = [rows[start:start + 700] for start in range(0, len(rows), 700)]
+    assert np.array_equal(reservoir_sample(matrices, 50000), rows)
+
+    sample = reservoir_sample(matrices, 1000)
+    assert sample.shape == (1000, 2) and len(np.unique(sample[:, 0])) == 1000
+    assert abs(sample[:, 0].mean() - rows[:, 0].mean()) < 1000
+    assert reservoir_sample([], 10).shape == (0, 0)
+
+    print("✅ Chunking and reservoir sampling correct!\n")
+
+
+def test_chunked_matches_full():
+    """Chunked compact signals equal the in-memory run when the sample holds every baseline"""
+    baselines = sorted(
+        [b for b in _baselines(600, seed=7) if b.get("ssid") and b.get("bssid")], key=_sort_key
+    )
+    previous = Config.ANOMALY_SIGNAL_FORMAT
+    Config.ANOMALY_SIGNAL_FORMAT = "compact"
+    try:
+        engine = _engine(baselines)
+        engine.run_chunked(chunk_size=50, sample_size=10000, workers=3)
+    finally:
+        Config.ANOMALY_SIGNAL_FORMAT = previous
+
+    full = _engine(baselines)
+    expected = full.build_compact_signals(baselines, full.apply_rules(baselines), full.run_isolation_forest(baselines))
+
+    signals = engine.anomaly_collection.docs
+    assert engine.anomaly_collection.inserts > 1
+    assert len({doc["run_id"] for doc in signals}) == 1
+    chunked = {(doc["ssid"], doc["bssid"]): doc for doc in signals}
+    assert len(chunked) == len(signals) == len(expected)
+    for doc in expected:
+        actual = chunked[(doc["ssid"], doc["bssid"])]
+        assert (actual["mask"], actual["ml_score"]) == (doc["mask"], doc["ml_score"]), (actual, doc)
+
+    print("✅ Chunked signals match in-memory signals!\n")
+
+
+def test_large_ssids_split():
+    """SSIDs larger than a chunk are split, and the rules still see all of their BSSIDs"""
+    baselines = _baselines(600, seed=11)
+    for n, doc in enumerate(baselines):
+        if doc.get("ssid") and n % 4:
+            doc["ssid"] = f"Big{n % 3}"
+    baselines = sorted([b for b in baselines if b.get("ssid") and b.get("bssid")], key=_sort_key)
+
+    previous = Config.ANOMALY_SIGNAL_FORMAT
+    Config.ANOMALY_SIGNAL_FORMAT = "compact"
+    try:
+        engine = _engine(baselines)
+        summaries = engine.load_ssid_summaries(30)
+        engine.run_chunked(chunk_size=30, sample_size=10000, workers=2)
+    finally:
+        Config.ANOMALY_SIGNAL_FORMAT = previous
+
+    assert set(summaries) == {"Big0", "Big1", "Big2"}
+    assert sum(row["_members"] for row in summaries["Big0"]) == sum(b["ssid"] == "Big0" for b in baselines)
+
+    expected = dict(zip([(b["ssid"], b["bssid"]) for b in baselines], _engine(baselines).apply_rules(baselines)))
+    signals = engine.anomaly_collection.docs
+    assert len(signals) == len(expected)
+    assert all(doc["mask"] == int(expected[(doc["ssid"], doc["bssid"])]) for doc in signals)
+    assert any(int(mask) for mask in expected.values())
+    assert engine.anomaly_collection.inserts >= len(baselines) // 60
+
+    print("✅ Large SSIDs split without changing signals!\n")
+
+
+def test_chunked_sampled_layered():
+    """A small sample still scores every network; layered documents per chunk"""
+    baselines = _baselines(2000, seed=8)
+    engine = _engine(baselines)
+    engine.run_chunked(chunk_size=300, sample_size=256, workers=2)
+
+    signals = engine.anomaly_collection.docs
+    ml = [doc for doc in signals if doc["layer"] == "ml"]
+    networks = {(b["ssid"], b["bssid"]) for b in baselines if b.get("ssid") and b.get("bssid")}
+    assert {(doc["ssid"], doc["bssid"]) for doc in ml} == networks
+    assert all(doc["is_outlier"] == (doc["anomaly_score"] < 0) for doc in ml)
+    assert any(doc["is_outlier"] for doc in ml) and not all(doc["is_outlier"] for doc in ml)
+    assert engine.anomaly_collection.inserts >= 2000 // 300
+
+    print("✅ Sampled chunked scoring correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CHUNKED PHASE 3 TESTS")
+    print("=" * 60 + "\n")
+
+    test_chunking_and_sampling()
+    test_chunked_matches_full()
+    test_large_ssids_split()
+    test_chunked_sampled_layered()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
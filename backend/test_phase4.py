@@ -3,6 +3,7 @@ Test script for Phase 4 Decision Engine
 Validates logic without requiring MongoDB data
 """
 
+from services.anomaly_rules import RULE_BITS
 from services.phase4_decision_engine import Phase4DecisionEngine
 
 def test_layer_scores():
@@ -135,6 +136,57 @@ def test_explanation_generation():
     
     print("✅ Explanation generation correct!\n")
 
+def test_scores_stable_with_new_rules():
+    """Rules added to a layer do not lower the score of the same evidence; their weights are explicit"""
+    engine = Phase4DecisionEngine()
+    
+    test_signals = [
+        {
+            "layer": "signature",
+            "signals": {
+                "ssid_reuse": True,
+                "encryption_weak": True,
+                "vendor_mismatch": False,
+                "encryption_downgrade": False,
+                "channel_disagreement": False,
+                "channel_instability": False
+            }
+        },
+        {
+            "layer": "behavior",
+            "signals": {
+                "signal_variance_high": True,
+                "client_spike": False,
+                "unstable_presence": True,
+                "signal_spread_wide": False
+            }
+        }
+    ]
+    
+    scores = engine.compute_layer_scores(test_signals)
+    assert scores['signature'] == 0.5, f"Signature score incorrect: {scores['signature']}"
+    assert 0.66 < scores['behavior'] < 0.68, f"Behavior score incorrect: {scores['behavior']}"
+    
+    # Compact masks score the same evidence the same way
+    mask = sum(RULE_BITS[name] for name in ("ssid_reuse", "encryption_weak", "signal_variance_high", "unstable_presence"))
+    mask_scores = engine.compute_mask_scores({"mask": mask, "ml_score": None})
+    assert mask_scores == dict(scores, ml=0.0), mask_scores
+    
+    # Corroborating rules weigh half: four of the six signature rules do not saturate
+    corroborated = {"layer": "signature", "signals": {"ssid_reuse": True, "vendor_mismatch": True,
+                                                      "encryption_downgrade": True, "channel_disagreement": True}}
+    assert engine.compute_layer_scores([corroborated])['signature'] == 0.75
+    
+    # Every rule of a layer sums past 1.0 and is capped; retired rules add nothing
+    all_signature = {"layer": "signature", "signals": dict({name: True for name in test_signals[0]["signals"]},
+                                                           retired_rule=True)}
+    assert engine.compute_layer_scores([all_signature])['signature'] == 1.0
+    assert engine.compute_layer_scores([{"layer": "behavior", "signals": {"retired_rule": True}}])['behavior'] == 0.0
+    mask = sum(RULE_BITS[name] for name in ("signal_variance_high", "signal_spread_wide"))
+    assert engine.compute_mask_scores({"mask": mask, "ml_score": None})['behavior'] == 0.5
+    
+    print("✅ Layer scores stable with new rules!\n")
+
 def test_full_decision():
     """Test complete decision-making flow"""
     engine = Phase4DecisionEngine()
@@ -194,6 +246,7 @@ if __name__ == "__main__":
     
     try:
         test_layer_scores()
+        test_scores_stable_with_new_rules()
         test_confidence_computation()
         test_verdict_mapping()
         test_explanation_generation()
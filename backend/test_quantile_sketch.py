@@ -0,0 +1,125 @@
+"""
+Test script for baseline quantile sketches
+Checks t-digest accuracy, merging, incremental Phase 2 updates and the
+Phase 3 spread rule
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from fake_mongo import FakeCollection
+from services.baseline_windows import BaselineWindows
+from services.phase2_feature_extractor import Phase2FeatureExtractor
+from services.phase3_anomaly_engine import Phase3AnomalyEngine
+from services.quantile_sketch import TDigest, baseline_quantile
+
+START = datetime(2026, 2, 1, 8, 0)
+
+
+def _rank_error(data, digest, q):
+    return abs((data <= digest.quantile(q)).mean() - q)
+
+
+def test_accuracy_and_size():
+    """Tail quantiles within 1% rank error from a sub-kilobyte sketch"""
+    rng = np.random.default_rng(11)
+    data = np.concatenate([rng.normal(45, 4, 45000), rng.normal(85, 3, 5000)])
+
+    digest = TDigest(100)
+    for chunk in np.array_split(data, 40):
+        digest.update(chunk)
+    doc = digest.to_dict()
+    restored = TDigest.from_dict(doc)
+
+    assert doc["n"] == len(data)
+    assert len(doc["centroids"]) < 1024
+    for q in (0.01, 0.05, 0.5, 0.95, 0.99):
+        assert _rank_error(data, restored, q) < 0.01, q
+    assert restored.quantile(0) == data.min() and restored.quantile(1) == data.max()
+    assert TDigest().quantile(0.5) is None
+
+    print("✅ Sketch accuracy correct!\n")
+
+
+def test_merge():
+    """Merged digests answer like one digest over the union"""
+    rng = np.random.default_rng(12)
+    parts = [rng.integers(20, 100, 4000).astype(float) for _ in range(5)]
+
+    merged = TDigest(100)
+    for part in parts:
+        digest = TDigest(100)
+        digest.update(part)
+        merged.merge(TDigest.from_dict(digest.to_dict()))
+
+    data = np.concatenate(parts)
+    assert merged.count == len(data)
+    for q in (0.05, 0.5, 0.95):
+        assert _rank_error(data, merged, q) < 0.015, q
+
+    print("✅ Sketch merge correct!\n")
+
+
+def _observations(start, minutes, signal):
+    return [
+        {"ssid": "Cafe", "bssid": "aa:bb:cc:00:00:01", "observed_at": start + timedelta(minutes=m),
+         "signal_percent": signal(m), "stations_count": m % 6}
+        for m in range(minutes)
+    ]
+
+
+def test_incremental_phase2():
+    """Phase 2 folds only new observations into the stored sketches"""
+    raw = _observations(START, 600, lambda m: 40 + m % 10)
+    db = {
+        "raw_scans": FakeCollection(raw),
+        "raw_scan_buckets": FakeCollection(),
+        "features_baseline": FakeCollection(),
+        "features_partials": FakeCollection(),
+        "pipeline_meta": FakeCollection()
+    }
+    extractor = Phase2FeatureExtractor.__new__(Phase2FeatureExtractor)
+    extractor.db = db
+    extractor.raw_collection = db["raw_scans"]
+    extractor.bucket_collection = db["raw_scan_buckets"]
+    extractor.features_collection = db["features_baseline"]
+    extractor.windows = BaselineWindows(db, ["1h"], 60, 24, 0)
+
+    extractor.run_single(START + timedelta(minutes=600))
+    first = db["features_baseline"].docs[0]
+    assert first["signal_sketch"]["n"] == 600
+    assert 40 <= first["signal_p5"] < first["signal_p95"] <= 49
+
+    # An evil twin joins on the same BSSID with a much stronger signal
+    raw += _observations(START + timedelta(minutes=600), 200, lambda m: 90 + m % 3)
+    db["raw_scans"].docs = raw
+    extractor.run_single(START + timedelta(minutes=800))
+    extractor.run_single(START + timedelta(minutes=800))
+
+    baseline = db["features_baseline"].docs[0]
+    signals = np.array([obs["signal_percent"] for obs in raw], dtype=float)
+    assert baseline["signal_sketch"]["n"] == 800
+    assert abs(baseline["signal_p95"] - np.percentile(signals, 95)) <= 1
+    assert baseline_quantile(baseline, "signal", 0.99) >= 90
+    assert baseline["client_p95"] == 5
+
+    behavior = Phase3AnomalyEngine.__new__(Phase3AnomalyEngine).apply_behavior_rules(baseline)
+    assert behavior["signals"]["signal_spread_wide"] is True
+    assert behavior["signals"]["signal_variance_high"] is True
+
+    print("✅ Incremental sketches correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("QUANTILE SKETCH TESTS")
+    print("=" * 60 + "\n")
+
+    test_accuracy_and_size()
+    test_merge()
+    test_incremental_phase2()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
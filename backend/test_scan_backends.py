@@ -0,0 +1,180 @@
+"""
+Test script for the Phase 1 scan backends
+Parses recorded netsh / iw / nmcli output offline and checks the shared schema
+"""
+
+import os
+import time
+from datetime import datetime
+
+from services.phase2_feature_extractor import Phase2FeatureExtractor
+from services.scan_backends import (
+    IwBackend, NetshBackend, NmcliBackend, select_backend, split_terse
+)
+from services.scan_normalizer import BAND_5, BAND_6, normalize_record
+from services.wifi_scanner import WiFiScanner
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "scan_outputs")
+
+
+def _fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+def _by_bssid(records):
+    return {record["bssid"]: record for record in records}
+
+
+def test_netsh_parse():
+    """netsh output parses into one record per BSSID"""
+    records = _by_bssid(NetshBackend().parse(_fixture("netsh_networks.txt")))
+
+    assert len(records) == 3
+    home = records["aa:bb:cc:dd:ee:01"]
+    assert home["ssid"] == "HomeNet"
+    assert home["signal"] == "87%"
+    assert home["channel"] == "36"
+    assert home["band"] == "5 GHz"
+    assert home["connected_stations"] == "4"
+    assert home["channel_utilization"] == "12 (4 %)"
+    assert records["11:22:33:44:55:66"]["ssid"] == "CafeFree"
+
+    print("✅ netsh parsing correct!\n")
+
+
+def test_iw_parse():
+    """iw scan dump maps onto the netsh schema"""
+    records = _by_bssid(IwBackend("wlan0").parse(_fixture("iw_scan_dump.txt")))
+
+    assert len(records) == 4
+    home = records["aa:bb:cc:dd:ee:01"]
+    assert home["ssid"] == "HomeNet"
+    assert home["signal"] == "100%"
+    assert home["channel"] == "36"
+    assert home["band"] == "5 GHz"
+    assert home["authentication"] == "WPA2-Personal"
+    assert home["encryption"] == "CCMP"
+    assert home["radio_type"] == "802.11ac"
+    assert home["connected_stations"] == "4"
+
+    assert records["aa:bb:cc:dd:ee:02"]["authentication"] == "WPA3-Personal"
+    assert records["aa:bb:cc:dd:ee:02"]["signal"] == "60%"
+
+    cafe = records["11:22:33:44:55:66"]
+    assert cafe["authentication"] == "Open"
+    assert cafe["encryption"] == "None"
+    assert cafe["channel"] == "11"
+
+    hidden = records["66:55:44:33:22:11"]
+    assert hidden["ssid"] == ""
+    assert hidden["band"] == "6 GHz"
+    assert hidden["channel"] == "5"
+    assert hidden["authentication"] == "WPA2-Enterprise"
+    assert hidden["radio_type"] == "802.11ax"
+
+    print("✅ iw parsing correct!\n")
+
+
+def test_nmcli_parse():
+    """Terse nmcli output honours escaped separators"""
+    assert split_terse(r"a\:b:c\\d:") == ["a:b", "c\\d", ""]
+
+    records = _by_bssid(NmcliBackend().parse(_fixture("nmcli_terse.txt")))
+
+    assert len(records) == 5
+    assert records["aa:bb:cc:dd:ee:01"]["signal"] == "87%"
+    assert records["aa:bb:cc:dd:ee:01"]["band"] == "5 GHz"
+    assert records["aa:bb:cc:dd:ee:02"]["authentication"] == "WPA3-Personal"
+    assert records["11:22:33:44:55:66"]["authentication"] == "Open"
+    lab = records["66:55:44:33:22:11"]
+    assert lab["ssid"] == "Lab:5G\\Guest"
+    assert lab["authentication"] == "WPA2-Enterprise"
+
+    print("✅ nmcli parsing correct!\n")
+
+
+def test_wifi_scanner_nmcli():
+    """WiFiScanner keeps SSIDs with spaces and colons intact"""
+    networks = {n["bssid"]: n for n in WiFiScanner().parse_nmcli(_fixture("nmcli_terse.txt"))}
+
+    assert len(networks) == 5
+    guest = networks["12:34:56:78:9A:BC"]
+    assert guest["ssid"] == "Coffee Shop Guest"
+    assert guest["channel"] == 1
+    assert guest["frequency"] == 2412
+    assert guest["signal_percent"] == 38
+    assert guest["signal_strength"] == -81
+    assert guest["encryption"] == "Open" and not guest["is_encrypted"]
+    assert networks["66:55:44:33:22:11"]["ssid"] == "Lab:5G\\Guest"
+    assert networks["AA:BB:CC:DD:EE:02"]["encryption"] == "WPA2 WPA3"
+
+    print("✅ WiFiScanner nmcli parsing correct!\n")
+
+
+def test_parse_speed():
+    """All backends parse a large recorded scan quickly"""
+    for backend, name in ((NetshBackend(), "netsh_networks.txt"),
+                          (IwBackend("wlan0"), "iw_scan_dump.txt"),
+                          (NmcliBackend(), "nmcli_terse.txt")):
+        output = _fixture(name) * 500
+        started = time.perf_counter()
+        records = backend.parse(output)
+        elapsed = time.perf_counter() - started
+        print(f"   {backend.name}: {len(records)} records in {elapsed * 1000:.1f} ms")
+        assert records
+
+    print("✅ Parsing speed measured!\n")
+
+
+def test_select_backend():
+    """Explicit backend names are honoured"""
+    assert select_backend("wlan1", "iw").interface == "wlan1"
+    assert isinstance(select_backend(name="nmcli"), NmcliBackend)
+    assert select_backend().name in ("netsh", "iw", "nmcli")
+
+    print("✅ Backend selection correct!\n")
+
+
+def test_normalize_record():
+    """Typed fields are added next to the raw text and feed Phase 2"""
+    netsh = [normalize_record(r) for r in NetshBackend().parse(_fixture("netsh_networks.txt"))]
+    home = netsh[0]
+    assert home["signal"] == "87%" and home["signal_percent"] == 87
+    assert home["signal_dbm"] == -56
+    assert home["channel_number"] == 36
+    assert home["band_code"] == BAND_5
+    assert home["stations_count"] == 4
+    assert isinstance(home["observed_at"], datetime)
+    assert "stations_count" not in netsh[1]
+
+    iw = [normalize_record(r) for r in IwBackend("wlan0").parse(_fixture("iw_scan_dump.txt"))]
+    assert iw[0]["signal_dbm"] == -46
+    assert iw[3]["band_code"] == BAND_6
+
+    extractor = Phase2FeatureExtractor.__new__(Phase2FeatureExtractor)
+    features = extractor.calculate_features([home, dict(home, signal_percent=77)])
+    assert features["avg_signal"] == 82
+    assert features["avg_channel"] == 36
+    assert features["client_count_max"] == 4
+    assert features["first_seen"] == home["timestamp"]
+
+    print("✅ Typed normalization correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SCAN BACKEND TESTS")
+    print("=" * 60 + "\n")
+
+    test_netsh_parse()
+    test_iw_parse()
+    test_nmcli_parse()
+    test_wifi_scanner_nmcli()
+    test_parse_speed()
+    test_select_backend()
+    test_normalize_record()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
@@ -0,0 +1,110 @@
+"""
+Test script for delta-encoded raw scan storage
+Validates storage reduction and Phase 2 equivalence with full documents
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import bson
+
+from fake_mongo import FakeCollection
+from services.phase2_feature_extractor import Phase2FeatureExtractor
+from services.scan_buckets import ScanBucketWriter, expand_bucket
+from services.scan_normalizer import normalize_record
+
+
+def _scans(hours=1, interval=20, bssids=20, seed=7):
+    """Synthetic Phase 1 records, one scan every `interval` seconds"""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 5, 10, 0, 0)
+    for tick in range(hours * 3600 // interval):
+        ts = start + timedelta(seconds=tick * interval)
+        for n in range(bssids):
+            yield {
+                "ssid": f"Net{n % 12}",
+                "bssid": f"aa:bb:cc:00:00:{n:02x}",
+                "timestamp": ts.isoformat(),
+                "signal": f"{rng.randint(40, 90)}%",
+                "channel": "6" if tick < 90 or n % 2 else "11",
+                "band": "2.4 GHz",
+                "authentication": "WPA2-Personal",
+                "encryption": "CCMP",
+                "radio_type": "802.11n",
+                "connected_stations": str(rng.choice([2, 2, 2, 3])),
+            }
+
+
+def test_storage_reduction():
+    """Buckets cut documents and bytes by at least 10x"""
+    records = [normalize_record(r) for r in _scans()]
+    collection = FakeCollection()
+    writer = ScanBucketWriter(collection)
+    for i, record in enumerate(records):
+        writer.add(record)
+        if i % 20 == 19:
+            writer.flush()
+    writer.flush()
+
+    full_bytes = sum(len(bson.encode(r)) for r in records)
+    bucket_bytes = sum(len(bson.encode(d)) for d in collection.docs)
+    doc_ratio = len(records) / len(collection.docs)
+    byte_ratio = full_bytes / bucket_bytes
+    print(f"   documents: {len(records)} -> {len(collection.docs)} ({doc_ratio:.0f}x)")
+    print(f"   bytes:     {full_bytes} -> {bucket_bytes} ({byte_ratio:.1f}x)")
+
+    assert doc_ratio >= 10
+    assert byte_ratio >= 10
+    print("✅ Storage reduction correct!\n")
+
+
+def test_phase2_equivalence():
+    """Phase 2 features are identical from buckets and from full documents"""
+    records = [normalize_record(r) for r in _scans(hours=2)]
+    collection = FakeCollection()
+    writer = ScanBucketWriter(collection)
+    for i, record in enumerate(records):
+        writer.add(record)
+        if i % 97 == 0:
+            writer.flush()
+    writer.flush()
+
+    extractor = Phase2FeatureExtractor.__new__(Phase2FeatureExtractor)
+    grouped = extractor.process_data(records)
+
+    from_buckets = {}
+    for bucket in collection.docs:
+        key = (bucket["ssid"], bucket["bssid"])
+        columns = from_buckets.setdefault(key, extractor._new_columns())
+        extractor.add_bucket(columns, bucket)
+
+    assert from_buckets.keys() == grouped.keys()
+    for (ssid, bssid), observations in grouped.items():
+        expected = extractor.calculate_features(observations)
+        actual = extractor.features_from_columns(ssid, bssid, from_buckets[(ssid, bssid)])
+        expected.pop("updated_at")
+        actual.pop("updated_at")
+        assert expected == actual, (expected, actual)
+
+    # Per-observation view round-trips the typed fields
+    bucket = next(iter(collection.docs))
+    expanded = expand_bucket(bucket)
+    originals = [r for r in records if r["bssid"] == bucket["bssid"] and r["observed_at"] < bucket["hour"] + timedelta(hours=1)]
+    assert [r["observed_at"] for r in expanded] == [r["observed_at"] for r in originals]
+    assert [r["channel_number"] for r in expanded] == [r["channel_number"] for r in originals]
+    assert [r["stations_count"] for r in expanded] == [r["stations_count"] for r in originals]
+
+    print("✅ Phase 2 equivalence correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SCAN BUCKET TESTS")
+    print("=" * 60 + "\n")
+
+    test_storage_reduction()
+    test_phase2_equivalence()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
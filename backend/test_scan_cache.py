@@ -0,0 +1,134 @@
+"""
+Test script for the shared WiFi scan result cache
+Validates freshness window, request coalescing and hit ratio
+"""
+
+import threading
+import time
+
+from services.scan_cache import ScanResultCache
+from services.wifi_scanner import WiFiScanner
+
+
+def test_concurrent_callers_share_one_scan():
+    """Callers arriving during a rescan wait for it instead of rescanning"""
+    cache = ScanResultCache(ttl=5)
+    calls = []
+
+    def slow_scan():
+        calls.append(1)
+        time.sleep(0.3)
+        return [{"bssid": "AA:BB:CC:DD:EE:01", "ssid": "HomeNet"}]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_scan("wlan0", slow_scan)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8 and all(r[0]["ssid"] == "HomeNet" for r in results)
+
+    # Results are copies; callers cannot corrupt the cache
+    results[0][0]["ssid"] = "changed"
+    assert cache.get_or_scan("wlan0", slow_scan)[0]["ssid"] == "HomeNet"
+
+    stats = cache.get_stats()
+    assert stats["misses"] == 1
+    assert stats["coalesced"] + stats["hits"] == 8
+    assert stats["hit_ratio"] == round(8 / 9, 4)
+    print("✅ Request coalescing correct!\n")
+
+
+def test_freshness_window():
+    """Stale entries and max_age=0 trigger a new scan"""
+    cache = ScanResultCache(ttl=0.1)
+    calls = []
+
+    def scan():
+        calls.append(1)
+        return [{"n": len(calls)}]
+
+    assert cache.get_or_scan("k", scan)[0]["n"] == 1
+    assert cache.get_or_scan("k", scan)[0]["n"] == 1
+    assert cache.get_or_scan("k", scan, max_age=0)[0]["n"] == 2
+    time.sleep(0.15)
+    assert cache.get_or_scan("k", scan)[0]["n"] == 3
+    assert cache.get_or_scan("other", scan)[0]["n"] == 4
+    print("✅ Freshness window correct!\n")
+
+
+def test_scan_errors_reach_waiters():
+    """A failed scan is not cached and its error reaches every waiter"""
+    cache = ScanResultCache(ttl=5)
+
+    def failing_scan():
+        time.sleep(0.1)
+        raise RuntimeError("radio busy")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_scan("wlan0", failing_scan)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ["radio busy"] * 3
+    assert cache.get_or_scan("wlan0", lambda: []) == []
+    print("✅ Error propagation correct!\n")
+
+
+def test_wifi_scanner_uses_cache():
+    """WiFiScanner.scan goes through the cache"""
+    scanner = WiFiScanner(cache=ScanResultCache(ttl=5))
+    scanner.scan_method = "mock"
+
+    first = scanner.scan(interface="wlan9")
+    second = scanner.scan(interface="wlan9")
+    assert first == second
+    assert scanner.get_cache_stats()["hits"] == 1
+    print("✅ WiFiScanner cache integration correct!\n")
+
+
+def test_wifi_scanner_failures_not_cached():
+    """A failed tool run returns [] to the caller and is retried next time"""
+    scanner = WiFiScanner(cache=ScanResultCache(ttl=60))
+    scanner.scan_method = "iwlist"
+    calls = []
+
+    def failing_iwlist(interface):
+        calls.append(interface)
+        raise OSError("iwlist: Device or resource busy")
+
+    scanner._scan_iwlist = failing_iwlist
+
+    assert scanner.scan(interface="wlan9") == []
+    assert scanner.scan(interface="wlan9") == []
+    assert len(calls) == 2
+    assert scanner.get_cache_stats()["entries"] == 0
+    print("✅ Failed scans not cached!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SCAN CACHE TESTS")
+    print("=" * 60 + "\n")
+
+    test_concurrent_callers_share_one_scan()
+    test_freshness_window()
+    test_scan_errors_reach_waiters()
+    test_wifi_scanner_uses_cache()
+    test_wifi_scanner_failures_not_cached()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
@@ -0,0 +1,145 @@
+"""
+Test script for the single-pass scan output parser
+Regression against recorded outputs plus a seeded fuzz pass
+"""
+
+import json
+import os
+import random
+
+from services.scan_parser import parse_netsh, parse_scan_output
+from services.wifi_scanner import WiFiScanner
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "scan_outputs")
+
+# format -> recorded fixture (expected records in expected/<name>.json)
+RECORDED = {
+    "netsh": "netsh_networks",
+    "iw": "iw_scan_dump",
+    "iwlist": "iwlist_scan",
+}
+
+JUNK_LINES = [
+    "", "   ", ":", "BSSID", "BSSID 1 :", "SSID 1 :", "Signal : %", "Channel : abc",
+    "BSS zz:zz:zz:zz:zz:zz(on wlan0)", "\tfreq: ", "\tsignal: -dBm",
+    "Cell 01 - Address: ", "Quality=0/0  Signal level=-", "Frequency:.5 GHz",
+    "IE: Unknown: ", "IE: Unknown: FF", "Pairwise Ciphers (2) :", "\x00\x01\xff",
+    "ESSID:\"\\x00\\x00\"", "Encryption key:maybe",
+]
+
+
+def _fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+def _mutate(text: str, rng: random.Random) -> str:
+    lines = text.splitlines()
+    for _ in range(rng.randint(1, 8)):
+        choice = rng.random()
+        index = rng.randrange(len(lines) + 1)
+        if choice < 0.3:
+            lines.insert(index, rng.choice(JUNK_LINES))
+        elif choice < 0.5 and lines:
+            del lines[min(index, len(lines) - 1)]
+        elif choice < 0.7 and lines:
+            line = lines[min(index, len(lines) - 1)]
+            cut = rng.randrange(len(line) + 1)
+            lines[min(index, len(lines) - 1)] = line[:cut]
+        elif choice < 0.85:
+            rng.shuffle(lines)
+        else:
+            lines = lines[:index]
+    return "\n".join(lines)
+
+
+def test_regression():
+    """Recorded outputs still parse into the stored records"""
+    for format_name, name in RECORDED.items():
+        records = parse_scan_output(format_name, _fixture(f"{name}.txt"), timestamp="fixture")
+        for record in records:
+            assert record.pop("timestamp") == "fixture"
+
+        expected = json.loads(_fixture(os.path.join("expected", f"{name}.json")))
+        assert records == expected, f"{format_name} output changed"
+
+    print("✅ Regression fixtures correct!\n")
+
+
+def test_netsh_ssid_block():
+    """Authentication / encryption belong to every BSSID of their SSID block"""
+    records = {r["bssid"]: r for r in parse_netsh(_fixture("netsh_networks.txt"))}
+
+    assert records["aa:bb:cc:dd:ee:01"]["authentication"] == "WPA2-Personal"
+    assert records["aa:bb:cc:dd:ee:02"]["authentication"] == "WPA2-Personal"
+    assert records["aa:bb:cc:dd:ee:02"]["encryption"] == "CCMP"
+    assert records["11:22:33:44:55:66"]["authentication"] == "Open"
+    assert records["11:22:33:44:55:66"]["encryption"] == "None"
+
+    print("✅ netsh SSID blocks correct!\n")
+
+
+def test_fuzz():
+    """Mutated outputs never raise and only yield well-formed records"""
+    rng = random.Random(1337)
+    outputs = {fmt: _fixture(f"{name}.txt") for fmt, name in RECORDED.items()}
+
+    for _ in range(300):
+        for format_name, text in outputs.items():
+            for record in parse_scan_output(format_name, _mutate(text, rng)):
+                assert record["bssid"]
+                assert isinstance(record["timestamp"], str)
+                assert all(isinstance(v, (str, int)) or v is None for v in record.values())
+                if "signal_dbm" in record:
+                    assert isinstance(record["signal_dbm"], int)
+
+    try:
+        parse_scan_output("airport", "")
+        assert False, "unknown format accepted"
+    except ValueError:
+        pass
+
+    print("✅ Fuzzed outputs handled!\n")
+
+
+def test_wifi_scanner_iwlist():
+    """WiFiScanner's substring parser agrees with the tokenizer on the fields it keeps"""
+    scanner = WiFiScanner.__new__(WiFiScanner)
+    networks = scanner.parse_iwlist(_fixture("iwlist_scan.txt"))
+
+    assert len(networks) == 5
+    first = networks[0]
+    assert first["bssid"] == first["bssid"].upper()
+    assert first["scan_method"] == "iwlist"
+    assert isinstance(first["channel"], int)
+    assert isinstance(first["signal_strength"], int)
+    assert any(n["is_hidden"] and n["ssid"] == "Hidden" for n in networks)
+    assert {n["encryption"] for n in networks} == {"WPA/WPA2", "Open"}
+    assert all(n["is_encrypted"] == (n["encryption"] != "Open") for n in networks)
+
+    records = parse_scan_output("iwlist", _fixture("iwlist_scan.txt"))
+    assert [n["bssid"] for n in networks] == [r["bssid"].upper() for r in records]
+    assert [n["channel"] for n in networks] == [int(r["channel"]) for r in records]
+    assert [n.get("signal_strength") for n in networks] == [r.get("signal_dbm") for r in records]
+
+    rng = random.Random(7)
+    for _ in range(300):
+        for network in scanner.parse_iwlist(_mutate(_fixture("iwlist_scan.txt"), rng)):
+            assert network["bssid"] and isinstance(network["channel"], int)
+
+    print("✅ WiFiScanner iwlist parsing correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SCAN PARSER TESTS")
+    print("=" * 60 + "\n")
+
+    test_regression()
+    test_netsh_ssid_block()
+    test_fuzz()
+    test_wifi_scanner_iwlist()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
@@ -0,0 +1,183 @@
+"""
+Test script for scan sessions
+Validates the per-interface concurrency limit, FIFO queueing,
+cancellation while queued and the capture start race
+"""
+
+import threading
+import time
+
+from services import network_scanner
+from services.network_scanner import NetworkScanner
+from services.scan_session import ScanSessionManager
+
+
+def _waiter(manager, session, results):
+    thread = threading.Thread(target=lambda: results.append((session.scan_id, manager.acquire(session))),
+                              daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_interface_limit_and_queue():
+    """Sessions beyond the per-interface limit queue and start in request order"""
+    manager = ScanSessionManager(max_per_interface=2)
+    first, second, third, fourth = (manager.create(f"scan-{n}", "wlan0") for n in range(4))
+    other = manager.create("scan-other", "wlan1")
+
+    assert manager.try_acquire(first) and manager.try_acquire(second)
+    assert not manager.try_acquire(third)
+    assert manager.try_acquire(other), "other interfaces keep their own slots"
+    assert manager.queued() == ["scan-2"]
+
+    results = []
+    # `third` keeps the queue place try_acquire gave it
+    threads = [_waiter(manager, third, results)]
+    threads.append(_waiter(manager, fourth, results))
+    _wait_until(lambda: manager.queued() == ["scan-2", "scan-3"])
+    time.sleep(0.2)
+    assert results == []
+
+    manager.release(first)
+    threads[0].join(2)
+    assert results == [("scan-2", True)]
+    assert manager.queued() == ["scan-3"]
+
+    # Releasing twice, or a session that holds nothing, frees no extra slot
+    manager.release(first)
+    manager.release(fourth)
+    time.sleep(0.2)
+    assert results == [("scan-2", True)]
+
+    manager.release(second)
+    threads[1].join(2)
+    assert results == [("scan-2", True), ("scan-3", True)]
+    assert manager.queued() == []
+
+    print("✅ Interface limit and FIFO queue correct!\n")
+
+
+def test_cancel_while_queued():
+    """A cancelled queued session leaves the queue and lets the next one through"""
+    manager = ScanSessionManager(max_per_interface=1)
+    running, doomed, waiting = (manager.create(f"scan-{n}", "wlan0") for n in range(3))
+    assert manager.try_acquire(running)
+
+    results = []
+    doomed_thread = _waiter(manager, doomed, results)
+    _wait_until(lambda: manager.queued() == ["scan-1"])
+    waiting_thread = _waiter(manager, waiting, results)
+    _wait_until(lambda: manager.queued() == ["scan-1", "scan-2"])
+
+    assert manager.cancel("scan-1")
+    doomed_thread.join(2)
+    assert results == [("scan-1", False)]
+    assert manager.queued() == ["scan-2"]
+
+    manager.release(running)
+    waiting_thread.join(2)
+    assert results[-1] == ("scan-2", True)
+    assert not manager.cancel("missing")
+
+    # discard() frees the slot and forgets the session
+    manager.discard(waiting)
+    assert manager.get("scan-2") is None
+    late = manager.create("scan-3", "wlan0")
+    assert manager.try_acquire(late)
+
+    print("✅ Cancel while queued correct!\n")
+
+
+def test_try_acquire_is_atomic():
+    """Concurrent requests never take more slots than the limit"""
+    manager = ScanSessionManager(max_per_interface=3)
+    sessions = [manager.create(f"scan-{n}", "wlan0") for n in range(40)]
+    barrier = threading.Barrier(len(sessions))
+    granted = []
+
+    def request(session):
+        barrier.wait()
+        if manager.try_acquire(session):
+            granted.append(session.scan_id)
+
+    threads = [threading.Thread(target=request, args=(session,)) for session in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(granted) == 3
+    assert len(manager.queued()) == 37
+
+    print("✅ Atomic slot checks correct!\n")
+
+
+class FakeSniffer:
+    """AsyncSniffer whose capture loop needs a moment to open its sockets"""
+
+    instances = []
+
+    def __init__(self, timeout=None, stop_filter=None, **kwargs):
+        self.timeout = timeout
+        self.running = False
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        FakeSniffer.instances.append(self)
+
+    def _run(self):
+        time.sleep(0.3)
+        self.running = True
+        self.stopped.wait(self.timeout)
+        self.running = False
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self, join=True):
+        self.stopped.set()
+
+    def join(self, timeout=None):
+        self.thread.join(timeout)
+
+
+def test_cancel_before_sniffer_starts():
+    """A cancel that arrives before the sniffer is running still stops capture"""
+    original = network_scanner.scapy.AsyncSniffer
+    network_scanner.scapy.AsyncSniffer = FakeSniffer
+    try:
+        stop_event = threading.Event()
+        stop_event.set()
+        started = time.monotonic()
+        NetworkScanner("wlan0").capture("wlan0", 30, stop_event)
+        elapsed = time.monotonic() - started
+    finally:
+        network_scanner.scapy.AsyncSniffer = original
+
+    sniffer = FakeSniffer.instances[-1]
+    assert sniffer.stopped.is_set()
+    assert not sniffer.thread.is_alive()
+    assert elapsed < 2, elapsed
+
+    print("✅ Early cancel stops capture!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SCAN SESSION TESTS")
+    print("=" * 60 + "\n")
+
+    test_interface_limit_and_queue()
+    test_cancel_while_queued()
+    test_try_acquire_is_atomic()
+    test_cancel_before_sniffer_starts()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)
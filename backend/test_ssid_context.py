@@ -0,0 +1,131 @@
+"""
+Test script for the SSID context index
+Checks the cross-network signature rules against a pairwise reference
+"""
+
+import random
+import time
+
+from services.anomaly_rules import decode, evaluate_masks
+from services.phase3_anomaly_engine import Phase3AnomalyEngine
+from services.ssid_context import SSIDContextIndex, security_rank, vendor_key
+
+CROSS_RULES = ("vendor_mismatch", "encryption_downgrade", "channel_disagreement")
+
+
+def _baseline(ssid, bssid, vendor, channel, auth="WPA2-Personal", enc="CCMP", first_seen="2026-01-01T00:00:00"):
+    return {"ssid": ssid, "bssid": bssid, "vendor": vendor, "vendor_oui": bssid[:8].upper(),
+            "avg_channel": channel, "authentication": auth, "encryption": enc, "first_seen": first_seen}
+
+
+def _reference(baseline, baselines):
+    """Pairwise (O(N) per baseline) version of the three rules"""
+    siblings = [b for b in baselines if b["ssid"] == baseline["ssid"] and b["bssid"] != baseline["bssid"]]
+    members = siblings + [baseline]
+
+    vendors = {}
+    for b in members:
+        count, first = vendors.get(vendor_key(b), (0, None))
+        vendors[vendor_key(b)] = (count + 1, min(first or b["first_seen"], b["first_seen"]))
+    dominant = min(vendors, key=lambda v: (-vendors[v][0], vendors[v][1], v))
+    mismatch = len(vendors) > 1 and vendor_key(baseline) != dominant
+
+    own = security_rank(baseline["authentication"], baseline["encryption"])
+    downgrade = any(security_rank(b["authentication"], b["encryption"]) > own for b in siblings)
+
+    channels = {b["avg_channel"] for b in siblings}
+    disagreement = len(siblings) >= 2 and len(channels) == 1 and baseline["avg_channel"] not in channels
+    return mismatch, downgrade, disagreement
+
+
+def test_evil_twin_rules():
+    """A foreign AP joining a managed SSID trips all three rules"""
+    baselines = [
+        _baseline("Corp", f"00:1a:2b:00:00:0{i}", "Cisco", 6, "WPA2-Enterprise") for i in range(3)
+    ] + [
+        _baseline("Corp", "50:c7:bf:11:22:33", "TP-Link", 11, "WPA2-Personal", first_seen="2026-03-01T00:00:00"),
+        _baseline("Home", "aa:00:00:00:00:01", "Netgear", 1, first_seen="2025-06-01T00:00:00"),
+        _baseline("Home", "bb:00:00:00:00:01", "Asus", 1, first_seen="2026-02-01T00:00:00"),
+    ]
+    index = SSIDContextIndex(baselines)
+    engine = Phase3AnomalyEngine.__new__(Phase3AnomalyEngine)
+
+    twin = engine.apply_signature_rules(baselines[3], index)["signals"]
+    assert twin["vendor_mismatch"] and twin["encryption_downgrade"] and twin["channel_disagreement"]
+
+    legit = engine.apply_signature_rules(baselines[0], index)["signals"]
+    assert not (legit["vendor_mismatch"] or legit["encryption_downgrade"] or legit["channel_disagreement"])
+
+    # Two vendors, one BSSID each: the one seen first is trusted
+    assert not engine.apply_signature_rules(baselines[4], index)["signals"]["vendor_mismatch"]
+    assert engine.apply_signature_rules(baselines[5], index)["signals"]["vendor_mismatch"]
+
+    # A baseline from outside the indexed set is compared with the SSID's members
+    newcomer = _baseline("Corp", "50:c7:bf:11:22:44", "TP-Link", 1, "Open", "None")
+    assert engine.apply_signature_rules(newcomer, index)["signals"]["encryption_downgrade"]
+
+    # Without context the cross-network rules stay off
+    assert not engine.apply_signature_rules(baselines[3])["signals"]["vendor_mismatch"]
+
+    print("✅ Evil twin signature rules correct!\n")
+
+
+def test_matches_pairwise_reference():
+    """Registry rules (whole frame and per SSID group) agree with a pairwise scan"""
+    rng = random.Random(21)
+    security = [("WPA2-Personal", "CCMP"), ("WPA3-Personal", "CCMP"), ("Open", "None"),
+                ("WPA2-Enterprise", "CCMP"), ("WPA-Personal", "TKIP")]
+    baselines = []
+    for n in range(600):
+        auth, enc = rng.choice(security)
+        baselines.append(_baseline(
+            f"Net{rng.randrange(60)}", f"02:00:00:00:{n // 256:02x}:{n % 256:02x}",
+            rng.choice(["Cisco", "Aruba", "Unknown"]), rng.choice([1, 6, 6, 11]), auth, enc,
+            f"2026-01-{rng.randint(1, 28):02d}T00:00:00"
+        ))
+
+    index = SSIDContextIndex(baselines)
+    engine = Phase3AnomalyEngine.__new__(Phase3AnomalyEngine)
+    for n, (baseline, mask) in enumerate(zip(baselines, evaluate_masks(baselines))):
+        signals = decode(int(mask), "signature")
+        assert tuple(signals[name] for name in CROSS_RULES) == _reference(baseline, baselines), baseline
+        if n < 100:
+            assert engine.apply_signature_rules(baseline, index)["signals"] == signals
+
+    print("✅ Context index matches pairwise reference!\n")
+
+
+def test_scaling():
+    """Index build and per-baseline group lookups stay linear"""
+    baselines = [
+        _baseline(f"Net{n % 5000}", f"02:00:00:{n // 65536:02x}:{n // 256 % 256:02x}:{n % 256:02x}",
+                  "Cisco" if n % 7 else "Aruba", 6 if n % 3 else 11)
+        for n in range(100000)
+    ]
+    started = time.perf_counter()
+    index = SSIDContextIndex(baselines)
+    groups = [index.group(b) for b in baselines]
+    engine = Phase3AnomalyEngine.__new__(Phase3AnomalyEngine)
+    flagged = sum(engine.apply_signature_rules(b, index)["signals"]["vendor_mismatch"] for b in baselines[:2000])
+    elapsed = time.perf_counter() - started
+    print(f"   100k baselines: {elapsed:.2f}s, {flagged} vendor mismatches in 2k")
+
+    assert all(len(members) == 20 for members, _ in groups)
+    assert flagged > 0
+    assert elapsed < 5
+
+    print("✅ Context index scaling correct!\n")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SSID CONTEXT INDEX TESTS")
+    print("=" * 60 + "\n")
+
+    test_evil_twin_rules()
+    test_matches_pairwise_reference()
+    test_scaling()
+
+    print("=" * 60)
+    print("✅ ALL TESTS PASSED!")
+    print("=" * 60)